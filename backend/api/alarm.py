@@ -1,5 +1,16 @@
-from fastapi import APIRouter
-from core.alarm_logic import trigger_alarm, reset_alarm, check_sleep_mode_allowed
+from fastapi import APIRouter, Query
+from core.alarm_logic import (
+    trigger_alarm,
+    reset_alarm,
+    ack_alarm,
+    start_nap,
+    cancel_nap,
+    check_sleep_mode_allowed,
+    ALARM_TIMER,
+    NAP_TIMER,
+    NAP_RESPONSE_TIMER,
+)
+from core.escalation import get_scheduler
 
 router = APIRouter(
     prefix="/alarm",
@@ -7,21 +18,47 @@ router = APIRouter(
 )
 
 @router.get("/trigger")
-def alarm_trigger():
+def alarm_trigger(user_id: str = "default_user"):
     """
     알람/저주파기 시뮬레이션 호출
     - 최대 4번 알람 후 잠자기 권유
+    - 수면모드가 제한된 상태면 {"status": "sleep_mode_locked", ...} (제한 확인과 카운터 증가는 원자적)
     """
-    if not check_sleep_mode_allowed():
-        return {"status": "sleep_mode_locked", "message": "수면모드가 제한되어 알람 작동 불가"}
-    
-    result = trigger_alarm()
-    return result
+    return trigger_alarm(user_id)
 
 @router.get("/reset")
-def alarm_reset():
+def alarm_reset(user_id: str = "default_user"):
     """
     알람 카운터 초기화
     """
-    reset_alarm()
+    reset_alarm(user_id)
     return {"status": "reset", "message": "알람 초기화 완료"}
+
+@router.get("/ack")
+def alarm_ack(user_id: str = "default_user"):
+    """
+    알람 / 기상 알림 응답 → 서버 쪽 재시도, 강제 전환 타이머 취소
+    - 한 번 ack 한 사용자부터 서버가 ALARM_RETRY 초마다 알람 재시도 (그 전에는 호출할 때만 알람)
+    """
+    return {"status": "acked" if ack_alarm(user_id) else "nothing_pending"}
+
+@router.get("/nap/start")
+def nap_start(user_id: str = "default_user", minutes: float = Query(10, gt=0, le=30)):
+    """
+    낮잠 타이머 시작 (기상 알림 / 미응답 시 비수면 모드 전환은 서버가 실행)
+    """
+    if not check_sleep_mode_allowed(user_id):
+        return {"status": "sleep_mode_locked", "message": "수면모드가 제한되어 낮잠 불가"}
+    return {"status": "started", "wake_at": start_nap(user_id, minutes)}
+
+@router.get("/nap/cancel")
+def nap_cancel(user_id: str = "default_user"):
+    return {"status": "cancelled" if cancel_nap(user_id) else "nothing_pending"}
+
+@router.get("/timers")
+def alarm_timers(user_id: str = "default_user"):
+    """
+    사용자의 예약된 타이머 시각 (epoch 초, 없으면 null)
+    """
+    scheduler = get_scheduler()
+    return {kind: scheduler.deadline(user_id, kind) for kind in (ALARM_TIMER, NAP_TIMER, NAP_RESPONSE_TIMER)}
@@ -1,7 +1,27 @@
-from fastapi import APIRouter
-from pydantic import BaseModel
+import base64
+import json
+import zlib
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, TypeAdapter, ValidationError
 from datetime import datetime
-from storage.logger import log_drowsy_event
+from storage.logger import (
+    clock,
+    log_drowsy_event,
+    log_drowsy_events,
+    query_drowsy_logs,
+    query_drowsy_rollups,
+)
+from storage.event_store import BufferFull, ROLLUP_SIZES, STATES
+from core.notify_logic import get_dispatcher
+from core.scoring_engine import get_engine
+
+try:
+    import msgpack
+except ImportError:  # msgpack 은 선택 의존성
+    msgpack = None
 
 router = APIRouter()
 
@@ -11,6 +31,27 @@ class DrowsyData(BaseModel):
     state:str
     user_id:str = "default_user"
 
+#배치 전송용 샘플 (timestamp: 클라이언트 측정 시각, epoch 초)
+class DrowsySample(DrowsyData):
+    timestamp: Optional[float] = None
+
+#서버에서 점수를 계산할 프레임 특징값 (ear 가 없으면 얼굴 없음)
+class FrameSample(BaseModel):
+    user_id: str = "default_user"
+    ear: Optional[float] = None
+    eye_state: str = "OPEN"
+    pitch: float = 0.0
+    timestamp: Optional[float] = None
+
+# 배치 전체를 한 번에 검증
+_batch_adapter = TypeAdapter(List[DrowsySample])
+_frame_adapter = TypeAdapter(List[FrameSample])
+
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+MAX_BATCH = 10000
+MAX_BODY_BYTES = 16 * 1024 * 1024  # 압축 해제 후 본문 상한
+
 #프론트엔드가 졸음상태 post로 전송함
 @router.get("/drowsy")
 def get_drowsy_status(data:DrowsyData):
@@ -23,13 +64,19 @@ def get_drowsy_status(data:DrowsyData):
     timestamp = datetime.now().isoformat()
   #프론트엔드에서측정한졸음상태를받아서저장
 
-     # 로그 저장 (backend/storage/logger.py 사용)
-    log_drowsy_event(
-        timestamp=timestamp,
-        drowsy_level=data.drowsy_level,
-        state=data.state,
-        user_id=data.user_id
-    )
+     # 로그 저장 (backend/storage/logger.py 사용, 디스크 기록은 백그라운드)
+    try:
+        log_drowsy_event(
+            timestamp=timestamp,
+            drowsy_level=data.drowsy_level,
+            state=data.state,
+            user_id=data.user_id
+        )
+    except BufferFull:
+        raise _busy()
+
+    # WARNING / DROWSY 알림 (백그라운드 발송)
+    get_dispatcher().submit(data.user_id, data.state)
     
     # 응답
     return {
@@ -42,7 +89,231 @@ def get_drowsy_status(data:DrowsyData):
         }
     }
    
+def _busy():
+    # 저장 버퍼가 가득 참 → 클라이언트가 잠시 후 재전송
+    return HTTPException(status_code=503, detail="저장 대기열이 가득 참", headers={"Retry-After": "1"})
+
+
+def _parse_batch(body: bytes, content_type: str, adapter=_batch_adapter):
+    """요청 본문 → 샘플 목록 (NDJSON / JSON 배열 / msgpack)"""
+    if content_type in NDJSON_TYPES:
+        lines = [line for line in body.split(b"\n") if line.strip()]
+        return adapter.validate_json(b"[" + b",".join(lines) + b"]")
+
+    if content_type in MSGPACK_TYPES:
+        if msgpack is None:
+            raise HTTPException(status_code=415, detail="msgpack 미설치")
+        return adapter.validate_python(msgpack.unpackb(body))
+
+    return adapter.validate_json(body)
+
+
+def _decode_body(body: bytes, encoding: str):
+    """Content-Encoding: gzip / deflate 해제 (MAX_BODY_BYTES 까지만)"""
+    if encoding in ("", "identity"):
+        return body
+    if encoding not in ("gzip", "deflate"):
+        raise HTTPException(status_code=415, detail=f"지원하지 않는 Content-Encoding: {encoding}")
+
+    wbits = 16 + zlib.MAX_WBITS if encoding == "gzip" else zlib.MAX_WBITS
+    decoder = zlib.decompressobj(wbits)
+    try:
+        data = decoder.decompress(body, MAX_BODY_BYTES)
+    except zlib.error as e:
+        raise HTTPException(status_code=400, detail=f"압축 해제 실패: {e}")
+    if decoder.unconsumed_tail:
+        raise HTTPException(status_code=413, detail="압축 해제한 본문이 너무 큼")
+    return data
+
+
+async def _read_batch(request: Request, adapter):
+    """요청 본문 검증 (422 / 400 / 413 처리 포함, gzip 본문 허용)"""
+    body = _decode_body(
+        await request.body(),
+        request.headers.get("content-encoding", "").strip().lower(),
+    )
+    content_type = request.headers.get("content-type", "application/json").split(";")[0].strip()
+
+    try:
+        samples = _parse_batch(body, content_type, adapter)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=json.loads(e.json(include_url=False)))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if len(samples) > MAX_BATCH:
+        raise HTTPException(status_code=413, detail=f"최대 {MAX_BATCH}개까지 전송 가능")
+    return samples
+
+
+#프론트엔드가 여러 샘플을 한 번에 전송 (NDJSON / JSON 배열 / msgpack)
+@router.post("/drowsy/batch")
+async def post_drowsy_batch(request: Request):
+    """
+    졸음 샘플 배치 저장
+    - Content-Type: application/x-ndjson (한 줄에 샘플 하나), application/json (배열),
+      application/msgpack (배열)
+    - Content-Encoding: gzip 가능
+    - 응답은 저장 개수만 담은 짧은 확인 메시지
+    """
+    samples = await _read_batch(request, _batch_adapter)
+
+    received_at = datetime.now()
+    now = received_at.timestamp()
+    try:
+        log_drowsy_events([
+            (
+                s.timestamp if s.timestamp is not None else now,
+                s.user_id,
+                s.state,
+                s.drowsy_level,
+            )
+            for s in samples
+        ])
+    except BufferFull:
+        raise _busy()
+
+    dispatcher = get_dispatcher()
+    for s in samples:
+        dispatcher.submit(s.user_id, s.state)
+
+    return {"status": "success", "accepted": len(samples), "timestamp": received_at.isoformat()}
+
+
+#얇은 클라이언트: 프레임 특징값만 보내고 점수는 서버에서 계산
+@router.post("/drowsy/frames")
+async def post_drowsy_frames(request: Request):
+    """
+    프레임 특징값 (ear, eye_state, pitch, timestamp) 배치 → 서버 측 DrowsinessDetector 로 점수 계산
+    - 사용자마다 윈도우 상태를 서버에 유지 (일정 시간 프레임이 없으면 삭제)
+    - 계산된 state / score 는 /drowsy/batch 와 같이 저장 + 알림
+    - 응답: 사용자별 마지막 프레임의 detector 출력
+    """
+    frames = await _read_batch(request, _frame_adapter)
+
+    now = datetime.now().timestamp()
+    rows = [
+        (
+            f.user_id,
+            f.ear,
+            f.eye_state,
+            f.pitch,
+            f.timestamp if f.timestamp is not None else now,
+        )
+        for f in frames
+    ]
+    results = await run_in_threadpool(get_engine().score, rows)
+
+    try:
+        log_drowsy_events([
+            (row[4], row[0], out["state"], out["score"]) for row, out in zip(rows, results)
+        ])
+    except BufferFull:
+        raise _busy()
+
+    dispatcher = get_dispatcher()
+    latest = {}
+    for row, out in zip(rows, results):
+        dispatcher.submit(row[0], out["state"])
+        latest[row[0]] = out
+
+    return {"status": "success", "accepted": len(rows), "results": latest}
+
+
+def _encode_cursor(ts, event_id):
+    # 마지막 행의 (ts, id) → 불투명 문자열 (repr 로 float 를 정확히 보존)
+    return base64.urlsafe_b64encode(f"{ts!r}:{event_id}".encode()).decode()
+
+
+def _decode_cursor(cursor):
+    try:
+        ts, event_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        return float(ts), int(event_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="잘못된 cursor")
+
+
+def _iso(ts):
+    # 롤업 버킷과 같은 시간대, UTC 오프셋 포함
+    return clock.iso(ts)
+
+
+#사용자별 졸음 기록 조회 (시간순, cursor 페이지네이션)
 @router.get("/drowsy/logs")
-def get_drowsy_logs():
-    return{"message":"로그 조회 기능 (구현 필요)"}
+def get_drowsy_logs(
+    user_id: str = "default_user",
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+):
+    """
+    졸음 기록 조회
+    - start / end: ISO 시각 또는 epoch 초 (start <= 시각 < end)
+    - 응답의 next_cursor 를 다음 요청의 cursor 로 넘기면 이어서 조회 (없으면 마지막 페이지)
+    """
+    after = _decode_cursor(cursor) if cursor else None
+    try:
+        # 한 개 더 읽어서 다음 페이지가 있는지 확인
+        rows = query_drowsy_logs(user_id, start, end, after, limit + 1)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1][1], rows[-1][0])
+
+    return {
+        "user_id": user_id,
+        "items": [
+            {
+                "id": event_id,
+                "timestamp": _iso(ts),
+                "state": state,
+                "drowsy_level": level,
+            }
+            for event_id, ts, _, state, level in rows
+        ],
+        "next_cursor": next_cursor,
+    }
+
+
+#대시보드용 분/시/일 집계 (저장할 때 미리 계산해 둔 값)
+@router.get("/drowsy/logs/rollups")
+def get_drowsy_rollups(
+    user_id: str = "default_user",
+    granularity: str = "hour",
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+):
+    """
+    구간별 졸음 집계
+    - granularity: minute / hour / day
+    - mean_level / max_level: drowsy_level 평균 / 최대
+    - seconds: 상태별 머문 시간(초)
+    """
+    if granularity not in ROLLUP_SIZES:
+        raise HTTPException(
+            status_code=400, detail=f"granularity 는 {', '.join(ROLLUP_SIZES)} 중 하나"
+        )
+    try:
+        rows = query_drowsy_rollups(user_id, granularity, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "user_id": user_id,
+        "granularity": granularity,
+        "buckets": [
+            {
+                "start": _iso(bucket),
+                "count": count,
+                "mean_level": level_sum / count,
+                "max_level": level_max,
+                "seconds": dict(zip(STATES, seconds)),
+            }
+            for bucket, count, level_sum, level_max, *seconds in rows
+        ],
+    }
 
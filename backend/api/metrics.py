@@ -0,0 +1,98 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from core import metrics
+from core.escalation import current_scheduler
+from core.notify_logic import current_dispatcher
+from core.scoring_engine import current_engine
+from core.session_store import current_session_store
+from core.stream_logic import hub
+from storage.logger import current_store
+
+router = APIRouter(tags=["metrics"])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _read(current, fn):
+    """
+    이미 만들어진 객체에서만 값을 읽음 (/metrics 조회가 저장소 / 엔진을 새로 만들지 않게)
+    - current: current_store 등 (없으면 None), 없으면 None → 이번 수집에서 생략
+    """
+    def read():
+        obj = current()
+        return None if obj is None else fn(obj)
+    return read
+
+
+def _dispatcher_counts(dispatcher):
+    stats = dispatcher.stats()
+    return {(key,): stats[key] for key in ("sent", "failed", "coalesced", "suppressed", "dropped", "retries")}
+
+
+# 다른 모듈이 이미 세고 있는 값은 수집할 때 읽기만 함 (기록 경로에 추가 비용 없음)
+metrics.register_callback(
+    "drowsy_ingested_events_total", "Events accepted into the store buffer",
+    _read(current_store, lambda store: store.accepted), kind="counter",
+)
+metrics.register_callback(
+    "drowsy_rejected_events_total", "Events rejected because the buffer was full",
+    _read(current_store, lambda store: store.rejected), kind="counter",
+)
+metrics.register_callback(
+    "drowsy_store_flushed_events_total", "Events written to SQLite",
+    _read(current_store, lambda store: store.flushed), kind="counter",
+)
+metrics.register_callback(
+    "drowsy_store_failed_events_total", "Events dropped after SQLite write retries were exhausted",
+    _read(current_store, lambda store: store.failed), kind="counter",
+)
+metrics.register_callback(
+    "drowsy_store_write_retries_total", "Event batches re-queued after a SQLite write error",
+    _read(current_store, lambda store: store.retries), kind="counter",
+)
+metrics.register_callback(
+    "drowsy_store_buffer_depth", "Events waiting to be flushed",
+    _read(current_store, lambda store: store.buffer_depth),
+)
+metrics.register_callback(
+    "drowsy_ws_connections", "Open /ws/drowsy connections", lambda: len(hub),
+)
+metrics.register_callback(
+    "drowsy_scoring_sessions", "Sessions held by the server-side scoring engine",
+    _read(current_engine, len),
+)
+metrics.register_callback(
+    "drowsy_scoring_frames_total", "Frames scored server-side",
+    _read(current_engine, lambda engine: engine.frames), kind="counter",
+)
+metrics.register_callback(
+    "drowsy_alarm_sessions", "Users with alarm session state", _read(current_session_store, len),
+)
+metrics.register_callback(
+    "drowsy_notifications_total", "Notification dispatcher outcomes",
+    _read(current_dispatcher, _dispatcher_counts), kind="counter", labelnames=("outcome",),
+)
+metrics.register_callback(
+    "drowsy_notifications_pending", "Notifications waiting to be sent",
+    _read(current_dispatcher, lambda dispatcher: dispatcher.stats()["pending"]),
+)
+
+metrics.register_callback(
+    "drowsy_escalation_timers_pending", "Alarm retry / nap timers waiting in the scheduler",
+    _read(current_scheduler, len),
+)
+metrics.register_callback(
+    "drowsy_escalation_timers_fired_total", "Escalation timers fired by the server",
+    _read(current_scheduler, lambda scheduler: scheduler.fired), kind="counter",
+)
+metrics.register_callback(
+    "drowsy_escalation_standby", "1 if this worker only records timers and another worker runs them",
+    _read(current_scheduler, lambda scheduler: int(scheduler.standby)),
+)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus text 형식 metric"""
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,34 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+
+from core.notify_logic import get_dispatcher, PRIORITY
+
+router = APIRouter(
+    prefix="/notify",
+    tags=["notify"]
+)
+
+
+class NotifyRequest(BaseModel):
+    user_id: str = "default_user"
+    level: str
+    message: Optional[str] = None
+
+
+@router.post("")
+def notify(data: NotifyRequest):
+    """
+    알림 요청 (발송은 백그라운드, 같은 사용자 알림은 합쳐지거나 debounce 될 수 있음)
+    """
+    if data.level not in PRIORITY:
+        raise HTTPException(status_code=400, detail=f"level 은 {', '.join(PRIORITY)} 중 하나")
+    get_dispatcher().submit(data.user_id, data.level, data.message)
+    return {"status": "queued"}
+
+
+@router.get("/stats")
+def notify_stats():
+    """발송 / 합치기 / debounce 통계"""
+    return get_dispatcher().stats()
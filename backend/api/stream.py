@@ -0,0 +1,157 @@
+import asyncio
+import json
+import time
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from pydantic import TypeAdapter, ValidationError
+
+from api.drowsy import DrowsySample, FrameSample, _batch_adapter, _frame_adapter
+from core.alarm_logic import ack_alarm
+from core.notify_logic import get_dispatcher
+from core.scoring_engine import get_engine
+from core.stream_logic import LiveSession, hub, HEARTBEAT_INTERVAL, HEARTBEAT_TIMEOUT
+from storage.event_store import BufferFull
+from storage.logger import log_drowsy_events
+
+router = APIRouter(tags=["stream"])
+
+_sample_adapter = TypeAdapter(DrowsySample)
+_single_frame_adapter = TypeAdapter(FrameSample)
+
+
+#실시간 졸음 점수 스트리밍 (샘플 수신 + 알람 push 를 한 연결로)
+@router.websocket("/ws/drowsy")
+async def drowsy_stream(websocket: WebSocket, user_id: str = "default_user"):
+    """
+    클라이언트 → 서버 (JSON 텍스트)
+    - {"type": "sample", "drowsy_level": 0.7, "state": "DROWSY", "timestamp": 1700000000.0}
+    - {"type": "batch", "samples": [...]}
+    - {"type": "frame", "ear": 0.25, "eye_state": "OPEN", "pitch": 3.0, "timestamp": ...}
+    - {"type": "frames", "frames": [...]}  (점수는 서버에서 계산)
+    - {"type": "pong"}
+    - {"type": "ack"}  (알람 / 기상 알림 응답, /alarm/ack 와 같음 → 이후 알람은 서버가 재시도)
+    서버 → 클라이언트
+    - score: frame / frames 메시지의 마지막 프레임 detector 출력
+    - alarm / warning / clear: 상태 변화에 따른 알람 결정
+    - ack: ack 처리 결과 (status: acked / nothing_pending)
+    - ping: 하트비트 (HEARTBEAT_INTERVAL 초마다, 응답 pong 이 HEARTBEAT_TIMEOUT 초 동안 없으면 종료)
+    - busy: 저장 대기열이 가득 참 (잠시 후 재전송)
+    - error: 잘못된 메시지
+    """
+    await websocket.accept()
+    session = LiveSession(user_id)
+    hub.register(session)
+    sender = asyncio.create_task(_send_loop(websocket, session))
+
+    try:
+        while True:
+            text = await websocket.receive_text()
+            session.touch()
+            await _handle(session, text)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        session.close()
+        hub.unregister(session)
+
+
+async def _handle(session, text):
+    try:
+        message = json.loads(text)
+        kind = message.get("type", "sample")
+        if kind == "pong":
+            return
+        if kind == "ack":
+            acked = await asyncio.to_thread(ack_alarm, session.user_id)
+            session.outbox.put({"type": "ack", "status": "acked" if acked else "nothing_pending"})
+            return
+        if kind == "sample":
+            samples = [_sample_adapter.validate_python(message)]
+        elif kind == "batch":
+            samples = _batch_adapter.validate_python(message.get("samples", []))
+        elif kind == "frame":
+            samples = await _score(session, [_single_frame_adapter.validate_python(message)])
+        elif kind == "frames":
+            samples = await _score(session, _frame_adapter.validate_python(message.get("frames", [])))
+        else:
+            session.outbox.put({"type": "error", "detail": f"unknown type: {kind}"})
+            return
+    except ValidationError as e:
+        session.outbox.put({"type": "error", "detail": json.loads(e.json(include_url=False))})
+        return
+    except (ValueError, AttributeError):
+        session.outbox.put({"type": "error", "detail": "잘못된 JSON 메시지"})
+        return
+
+    if not samples:
+        return
+
+    now = time.time()
+    try:
+        log_drowsy_events([
+            (
+                s.timestamp if s.timestamp is not None else now,
+                session.user_id,
+                s.state,
+                s.drowsy_level,
+            )
+            for s in samples
+        ])
+    except BufferFull:
+        session.outbox.put({"type": "busy", "retry_after": 1})
+
+    dispatcher = get_dispatcher()
+    for s in samples:
+        dispatcher.submit(session.user_id, s.state)
+
+    # 알람 결정은 가장 최근 샘플 기준
+    session.on_sample(samples[-1].state)
+
+
+async def _score(session, frames):
+    """
+    프레임 특징값 → 서버 측 점수 계산, 결과를 DrowsySample 목록으로 (저장 / 알림용)
+    - 엔진 잠금을 기다리는 동안 이벤트 루프가 막히지 않게 스레드에서 계산
+    """
+    if not frames:
+        return []
+
+    now = time.time()
+    rows = [
+        (session.user_id, f.ear, f.eye_state, f.pitch, f.timestamp if f.timestamp is not None else now)
+        for f in frames
+    ]
+    results = await asyncio.to_thread(get_engine().score, rows)
+    session.outbox.put({"type": "score", **results[-1]})
+
+    return [
+        DrowsySample(drowsy_level=out["score"], state=out["state"], user_id=row[0], timestamp=row[4])
+        for row, out in zip(rows, results)
+    ]
+
+
+async def _send_loop(websocket, session):
+    """
+    outbox → 소켓
+    - HEARTBEAT_INTERVAL 초마다 ping (보낼 메시지가 계속 있어도)
+    - 매 반복마다 클라이언트 응답을 확인, HEARTBEAT_TIMEOUT 초 동안 없으면 연결 종료
+      (알람 / publish 가 계속 오는 죽은 연결도 닫힘)
+    """
+    next_ping = time.monotonic() + HEARTBEAT_INTERVAL
+    try:
+        while True:
+            now = time.monotonic()
+            if session.idle_for(now) > HEARTBEAT_TIMEOUT:
+                await websocket.close(code=1001)
+                return
+            if now >= next_ping:
+                next_ping = now + HEARTBEAT_INTERVAL
+                await websocket.send_text(json.dumps({"type": "ping", "time": time.time()}))
+
+            message = await session.outbox.get(max(0.0, next_ping - time.monotonic()))
+            if message is not None:
+                await websocket.send_text(json.dumps(message))
+    except (WebSocketDisconnect, RuntimeError):
+        # 이미 닫힌 연결
+        pass
@@ -0,0 +1,281 @@
+"""
+백엔드 부하 / 지연 시간 벤치마크
+
+    cd backend
+    export PYTHONPATH=..                             # 공용 모듈 drowsy_common (main.py 참고)
+    python bench.py                                  # 앱을 같은 프로세스에서 (ASGI transport)
+    python bench.py --uvicorn --concurrency 64       # uvicorn 을 띄워서 HTTP 로
+    python bench.py --url http://localhost:8000      # 이미 떠 있는 서버
+    python bench.py --mix dashboard --json out.json
+    python bench.py --baseline base.json             # 느려지면 exit 1
+    python bench.py --max-errors 10                  # 실패한 요청이 10개를 넘으면 exit 1 (기본 0)
+
+저장소는 임시 DB 를 사용 (DROWSY_DB_PATH), 알림은 stub sink 로 보냄
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+import numpy as np
+
+from drowsy_common.bench_gate import compare, report
+
+STATES = ("NORMAL", "WARNING", "DROWSY")
+STATE_WEIGHTS = (0.8, 0.15, 0.05)
+BATCH_SIZE = 100
+
+# 요청 종류 → (가중치) 조합
+MIXES = {
+    # 클라이언트 여러 대가 상태를 보내는 평상시
+    "ingest": {"drowsy": 70, "batch": 10, "logs": 10, "alarm_trigger": 5, "alarm_reset": 5},
+    # 대시보드 조회 위주
+    "dashboard": {"drowsy": 30, "logs": 40, "rollups": 30},
+    # 알람 상태 변경 위주 (세션 저장소 경합)
+    "alarm": {"drowsy": 40, "alarm_trigger": 40, "alarm_reset": 20},
+}
+
+
+def _sample(rng, user_id, with_timestamp=False):
+    sample = {
+        "drowsy_level": round(rng.random(), 3),
+        "state": rng.choices(STATES, STATE_WEIGHTS)[0],
+        "user_id": user_id,
+    }
+    if with_timestamp:
+        sample["timestamp"] = time.time()
+    return sample
+
+
+def build_request(kind, rng, user_id):
+    """요청 종류 → httpx.Client.request 인자"""
+    if kind == "drowsy":
+        return {"method": "GET", "url": "/drowsy", "json": _sample(rng, user_id)}
+    if kind == "batch":
+        body = "\n".join(json.dumps(_sample(rng, user_id, True)) for _ in range(BATCH_SIZE))
+        return {
+            "method": "POST",
+            "url": "/drowsy/batch",
+            "content": body,
+            "headers": {"content-type": "application/x-ndjson"},
+        }
+    if kind == "logs":
+        return {"method": "GET", "url": "/drowsy/logs", "params": {"user_id": user_id, "limit": 100}}
+    if kind == "rollups":
+        granularity = rng.choice(("minute", "hour", "day"))
+        return {
+            "method": "GET",
+            "url": "/drowsy/logs/rollups",
+            "params": {"user_id": user_id, "granularity": granularity},
+        }
+    if kind == "alarm_trigger":
+        return {"method": "GET", "url": "/alarm/trigger", "params": {"user_id": user_id}}
+    if kind == "alarm_reset":
+        return {"method": "GET", "url": "/alarm/reset", "params": {"user_id": user_id}}
+    raise ValueError(f"unknown request kind: {kind}")
+
+
+async def _worker(client, mix, users, deadline, remaining, latencies, errors, seed):
+    rng = random.Random(seed)
+    kinds = list(mix)
+    weights = [mix[k] for k in kinds]
+    while time.perf_counter() < deadline and remaining[0] > 0:
+        remaining[0] -= 1
+        kind = rng.choices(kinds, weights)[0]
+        request = build_request(kind, rng, rng.choice(users))
+
+        t0 = time.perf_counter()
+        try:
+            response = await client.request(**request)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        latencies[kind].append(time.perf_counter() - t0)
+        if not ok:
+            errors[kind] = errors.get(kind, 0) + 1
+
+
+async def run_load(client, mix="ingest", concurrency=32, duration=10.0, requests=None,
+                   users=100, seed=0, warmup=1.0):
+    """
+    concurrency 개 작업이 duration 초 (또는 총 requests 개) 동안 mix 비율로 요청
+    - 반환: 평평한 결과 dict ({종류}_p50_ms ..., total_rps)
+    """
+    mix = MIXES[mix] if isinstance(mix, str) else mix
+    user_ids = [f"bench-{i}" for i in range(users)]
+
+    # 워밍업 (연결 / 첫 요청 비용 제외)
+    if warmup > 0:
+        await asyncio.gather(*(
+            _worker(client, mix, user_ids, time.perf_counter() + warmup, [1 << 62],
+                    {k: [] for k in mix}, {}, seed + 10_000 + i)
+            for i in range(concurrency)
+        ))
+
+    latencies = {kind: [] for kind in mix}
+    errors = {}
+    remaining = [requests if requests else 1 << 62]
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        _worker(client, mix, user_ids, started + duration, remaining, latencies, errors, seed + i)
+        for i in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - started
+
+    total = sum(len(v) for v in latencies.values())
+    results = {
+        "requests": total,
+        "errors": sum(errors.values()),
+        "total_rps": total / elapsed,
+    }
+    everything = []
+    for kind, values in latencies.items():
+        if not values:
+            continue
+        everything.extend(values)
+        p50, p95, p99 = np.percentile(np.array(values) * 1000.0, (50, 95, 99))
+        results[f"{kind}_count"] = len(values)
+        results[f"{kind}_errors"] = errors.get(kind, 0)
+        results[f"{kind}_p50_ms"] = float(p50)
+        results[f"{kind}_p95_ms"] = float(p95)
+        results[f"{kind}_p99_ms"] = float(p99)
+    if everything:
+        p50, p95, p99 = np.percentile(np.array(everything) * 1000.0, (50, 95, 99))
+        results.update(all_p50_ms=float(p50), all_p95_ms=float(p95), all_p99_ms=float(p99))
+    return results
+
+
+@contextlib.asynccontextmanager
+async def asgi_client():
+    """같은 프로세스의 앱 (lifespan 포함) 에 붙는 클라이언트"""
+    from main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            yield client
+
+
+@contextlib.asynccontextmanager
+async def http_client(url, concurrency):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30.0) as client:
+        yield client
+
+
+@contextlib.contextmanager
+def launch_uvicorn(env, workers=1, port=None, timeout=20.0):
+    """uvicorn 서버를 자식 프로세스로 띄우고 응답할 때까지 대기 → base url"""
+    if port is None:
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers), "--log-level", "warning",
+         "--no-access-log"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {proc.returncode}")
+            try:
+                httpx.get(url + "/", timeout=1.0)
+                break
+            except httpx.HTTPError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError("uvicorn did not start in time")
+                time.sleep(0.1)
+        yield url
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+async def _run(args, env):
+    kwargs = dict(
+        mix=args.mix, concurrency=args.concurrency, duration=args.duration,
+        requests=args.requests, users=args.users, seed=args.seed, warmup=args.warmup,
+    )
+    if args.url:
+        async with http_client(args.url, args.concurrency) as client:
+            return await run_load(client, **kwargs)
+    if args.uvicorn:
+        with launch_uvicorn(env, workers=args.workers) as url:
+            async with http_client(url, args.concurrency) as client:
+                return await run_load(client, **kwargs)
+
+    # 같은 프로세스: 알람 / 알림 print 는 버림
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        async with asgi_client() as client:
+            return await run_load(client, **kwargs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="backend load test")
+    parser.add_argument("--mix", choices=sorted(MIXES), default="ingest")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="측정 시간(초)")
+    parser.add_argument("--requests", type=int, help="총 요청 수 (duration 보다 먼저 끝나면 종료)")
+    parser.add_argument("--warmup", type=float, default=1.0, help="워밍업 시간(초)")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--uvicorn", action="store_true", help="uvicorn 을 띄워서 HTTP 로 측정")
+    parser.add_argument("--workers", type=int, default=1, help="--uvicorn 워커 프로세스 수")
+    parser.add_argument("--url", help="이미 떠 있는 서버 주소")
+    parser.add_argument("--json", help="결과를 JSON 으로 저장")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="허용 성능 저하 비율")
+    parser.add_argument("--max-errors", type=int, default=0, help="허용 실패 요청 수 (넘으면 exit 1)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # 앱을 import 하기 전에 설정 (logger / session_store 가 import 시점에 읽음)
+        os.environ["DROWSY_DB_PATH"] = os.path.join(tmp, "events.db")
+        os.environ["ALARM_SESSION_DB"] = os.path.join(tmp, "sessions.db")
+        os.environ["ESCALATION_DB"] = os.path.join(tmp, "escalation.db")
+        os.environ.setdefault("NOTIFY_SINKS", "stub")
+        if args.workers > 1:
+            # 워커가 여러 개면 알람 상태를 프로세스끼리 공유
+            # (알람 타이머는 같은 ESCALATION_DB 로 워커 하나가 실행, 나머지는 standby)
+            os.environ.setdefault("ALARM_SESSION_BACKEND", "sqlite")
+
+        results = asyncio.run(_run(args, dict(os.environ)))
+
+    for key, value in results.items():
+        print(f"{key:28s} {value:12.2f}" if isinstance(value, float) else f"{key:28s} {value:12d}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    # 실패한 요청이 많으면 지연 시간이 좋아 보여도 실패 (빠른 4xx / 5xx 응답)
+    status = 0
+    if results["errors"] > args.max_errors:
+        print(f"ERRORS {results['errors']} > {args.max_errors}")
+        status = 1
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        status |= report(compare(results, baseline, args.tolerance))
+
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,39 +1,168 @@
 from datetime import datetime, timedelta
 
-# 알람 상태 관리용 전역 변수
-alarm_counter = 0  # 최대 4번까지 알람
-sleep_mode_locked = False  # 수면모드 제한 여부
+from core.escalation import get_scheduler
+from core.metrics import ALARMS, ESCALATIONS
+from core.notify_logic import get_dispatcher
+from core.session_store import get_session_store
 
-def check_sleep_mode_allowed():
+MAX_ALARMS = 4  # 최대 4번까지 알람
+ALARM_RETRY = 30.0  # 초, 알람 후 이 시간 안에 응답(ack)이 없으면 서버가 다음 알람 실행
+# (ack 를 보내는 클라이언트만: 한 번이라도 ack 한 사용자부터 재시도 타이머 사용)
+NAP_RESPONSE_TIMEOUT = 60.0  # 초, 낮잠이 끝난 뒤 이 시간 안에 응답이 없으면 비수면 모드로 강제 전환
+
+# 스케줄러 타이머 종류
+ALARM_TIMER = "alarm"
+NAP_TIMER = "nap"
+NAP_RESPONSE_TIMER = "nap_response"
+
+
+def check_sleep_mode_allowed(user_id="default_user"):
     """
     수면모드 사용 가능 여부 체크
     - 비수면 모드로 강제 이동했으면 수면모드 제한
     """
-    return not sleep_mode_locked
+    return not get_session_store().get(user_id)["sleep_mode_locked"]
+
+
+SLEEP_MODE_LOCKED = {
+    "status": "sleep_mode_locked",
+    "alarm_triggered": False,
+    "message": "수면모드가 제한되어 알람 작동 불가",
+}
 
-def trigger_alarm():
+
+def _trigger(state):
+    # 수면모드 제한 확인 + 증가를 한 번의 update 안에서 (동시 호출이 둘 다 통과하지 않게)
+    if state["sleep_mode_locked"]:
+        return None, False
+    state["alarm_counter"] += 1
+    if state["alarm_counter"] > MAX_ALARMS:
+        state["sleep_mode_locked"] = True
+    return state["alarm_counter"], state["alarm_retry"]
+
+
+def trigger_alarm(user_id="default_user", retry_after=None):
     """
     알람/저주파기 시뮬레이션
-    - 최대 4번 알람 후 잠자기 권유
+    - 사용자별로 최대 4번 알람 후 잠자기 권유
+    - 이미 수면모드가 제한됐으면 카운터를 올리지 않고 SLEEP_MODE_LOCKED 반환
+    - ack 하는 클라이언트면 알람마다 ALARM_RETRY 초 뒤 재시도 타이머를 (재)예약
+      → 응답이 없으면 클라이언트가 다시 호출하지 않아도 단계 상승
+      (ack 를 한 번도 안 보낸 클라이언트는 응답할 방법이 없으므로 재시도 없음, 기존처럼 호출할 때만 알람)
+    - retry_after: 재시도 간격 (초), 주면 ack 여부와 상관없이 이 간격으로 재시도
+      (WebSocket 스트림: 연결이 열려 있는 동안은 알람을 받고 ack 할 수 있음, stream_logic.LiveSession)
     """
-    global alarm_counter, sleep_mode_locked
-    alarm_counter += 1
+    alarm_counter, retry = get_session_store().update(user_id, _trigger)
 
-    if alarm_counter <= 4:
+    if alarm_counter is None:
+        return dict(SLEEP_MODE_LOCKED)
+    if alarm_counter <= MAX_ALARMS:
+        ALARMS.inc()
+        if retry_after is None and retry:
+            retry_after = ALARM_RETRY
+        if retry_after is not None:
+            # 다음 재시도도 같은 간격으로 (payload 는 재시작해도 타이머와 함께 복원)
+            get_scheduler().schedule_in(user_id, ALARM_TIMER, retry_after, {"retry_after": retry_after})
         # 알람 또는 저주파기 작동 시뮬레이션
-        print(f"[{datetime.now().isoformat()}] 알람 {alarm_counter}번 작동")
+        print(f"[{datetime.now().isoformat()}] {user_id}: 알람 {alarm_counter}번 작동")
         return {"alarm_triggered": True, "count": alarm_counter}
     else:
         # 최대 횟수 초과 → 수면 권유, 수면모드 제한
-        sleep_mode_locked = True
-        print(f"[{datetime.now().isoformat()}] 최대 알람 초과, 잠자기 권유")
+        ESCALATIONS.inc()
+        get_scheduler().cancel(user_id, ALARM_TIMER)
+        print(f"[{datetime.now().isoformat()}] {user_id}: 최대 알람 초과, 잠자기 권유")
         return {"alarm_triggered": False, "message": "잠자기 권유", "count": alarm_counter}
 
-def reset_alarm():
+
+def _reset(state):
+    state["alarm_counter"] = 0
+    state["sleep_mode_locked"] = False
+
+
+def reset_alarm(user_id="default_user"):
     """
-    알람 카운터 초기화 (새로운 세션 시작 등)
+    알람 카운터 초기화 (새로운 세션 시작 등), 예약된 재시도 / 낮잠 타이머도 취소
     """
-    global alarm_counter, sleep_mode_locked
-    alarm_counter = 0
-    sleep_mode_locked = False
-    print(f"[{datetime.now().isoformat()}] 알람 초기화 완료")
+    get_session_store().update(user_id, _reset)
+    scheduler = get_scheduler()
+    for kind in (ALARM_TIMER, NAP_TIMER, NAP_RESPONSE_TIMER):
+        scheduler.cancel(user_id, kind)
+    print(f"[{datetime.now().isoformat()}] {user_id}: 알람 초기화 완료")
+
+
+def _enable_retry(state):
+    state["alarm_retry"] = True
+
+
+def ack_alarm(user_id="default_user"):
+    """
+    사용자가 알람 / 기상 알림에 응답 → 대기 중인 재시도, 강제 전환 타이머 취소 (카운터는 유지)
+    - 응답할 수 있는 클라이언트로 기록 → 이후 알람부터 서버 쪽 재시도 사용
+    """
+    get_session_store().update(user_id, _enable_retry)
+    scheduler = get_scheduler()
+    acked = scheduler.cancel(user_id, ALARM_TIMER)
+    acked = scheduler.cancel(user_id, NAP_RESPONSE_TIMER) or acked
+    return acked
+
+
+def start_nap(user_id="default_user", minutes=10):
+    """
+    낮잠 시작 → minutes 분 뒤 서버가 기상 알림, 이후 NAP_RESPONSE_TIMEOUT 초 미응답이면 강제 전환
+    - 반환: 기상 시각 (epoch 초)
+    """
+    deadline = (datetime.now() + timedelta(minutes=minutes)).timestamp()
+    scheduler = get_scheduler()
+    scheduler.cancel(user_id, NAP_RESPONSE_TIMER)
+    scheduler.schedule(user_id, NAP_TIMER, deadline, {"minutes": minutes})
+    return deadline
+
+
+def cancel_nap(user_id="default_user"):
+    scheduler = get_scheduler()
+    cancelled = scheduler.cancel(user_id, NAP_TIMER)
+    return scheduler.cancel(user_id, NAP_RESPONSE_TIMER) or cancelled
+
+
+# ===== 스케줄러 handler (스레드에서 실행) =====
+
+def _on_alarm_timer(user_id, payload):
+    # 응답 없이 재시도 간격이 지남 → 다음 단계 알람
+    from core.stream_logic import hub
+
+    result = trigger_alarm(user_id, (payload or {}).get("retry_after"))
+    if result.get("status") == "sleep_mode_locked":
+        return
+    # 열려 있는 스트림 연결에는 LiveSession 이 직접 보내던 것과 같은 alarm 메시지
+    hub.publish(user_id, {"type": "alarm", **result})
+    message = f"알람 {result['count']}번" if result["alarm_triggered"] else result["message"]
+    # 스케줄러 알림은 직전 샘플 알림의 debounce 에 막히지 않게 force
+    get_dispatcher().submit(user_id, "DROWSY", message, force=True)
+
+
+def _on_nap_end(user_id, payload):
+    print(f"[{datetime.now().isoformat()}] {user_id}: 일어날 시각입니다")
+    get_dispatcher().submit(
+        user_id, "WARNING", f"일어날 시각입니다! {NAP_RESPONSE_TIMEOUT:.0f}초 내 반응 없으면 비수면 모드 전환",
+        force=True,
+    )
+    get_scheduler().schedule_in(user_id, NAP_RESPONSE_TIMER, NAP_RESPONSE_TIMEOUT)
+
+
+def _force_non_sleep(state):
+    state["sleep_mode_locked"] = True
+
+
+def _on_nap_response_timeout(user_id, payload):
+    # 앱의 NapTimerButton.force_wakeup 과 같은 동작: 비수면 모드로 전환만 (알람 횟수는 그대로)
+    print(f"[{datetime.now().isoformat()}] {user_id}: 반응 없음 → 비수면 모드 전환")
+    get_session_store().update(user_id, _force_non_sleep)
+    get_dispatcher().submit(user_id, "DROWSY", "반응 없음 → 비수면 모드 전환", force=True)
+
+
+def register_timers(scheduler=None):
+    """알람 타이머 handler 등록 (서버 시작 시)"""
+    scheduler = get_scheduler() if scheduler is None else scheduler
+    scheduler.register(ALARM_TIMER, _on_alarm_timer)
+    scheduler.register(NAP_TIMER, _on_nap_end)
+    scheduler.register(NAP_RESPONSE_TIMER, _on_nap_response_timeout)
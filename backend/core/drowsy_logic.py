@@ -1,12 +1,15 @@
 # core/drowsy_logic.py
+from drowsy_common.scoring import WARNING_SCORE, DROWSY_SCORE
+
 
 def 판단하기(drowsy_level: float):
-    # 졸음 수치가 0.8 이상이면 위험 상태
-    if drowsy_level >= 0.8:
+    # 클라이언트 DrowsinessDetector 와 같은 임계값 / 상태 이름
+    # 0.7 이상이면 졸음
+    if drowsy_level >= DROWSY_SCORE:
+        return "DROWSY"
+    # 0.4 이상이면 주의
+    elif drowsy_level >= WARNING_SCORE:
         return "WARNING"
-    # 0.5 이상이면 주의
-    elif drowsy_level >= 0.5:
-        return "CAUTION"
     # 그 외는 정상
     else:
         return "NORMAL"
@@ -0,0 +1,491 @@
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+from core.timer_wheel import TimerWheel
+
+TICK = 0.1  # 초, timer wheel 해상도 (타이머는 deadline 이후 최대 이만큼 늦게 실행)
+PERSIST_INTERVAL = 1.0  # 초, 바뀐 deadline 을 모아서 저장하는 주기
+LEASE_TTL = 10.0  # 초, 이 시간 동안 갱신이 없으면 다른 프로세스가 타이머 소유권을 가져갈 수 있음
+LEASE_RENEW = 3.0  # 초, 소유권 갱신 주기
+
+
+class EscalationScheduler:
+    """
+    서버 쪽 알람 재시도 / 낮잠 만료 타이머 (클라이언트 polling 없이 서버가 직접 실행)
+    - 타이머 key = (user_id, kind), 사용자마다 종류별로 하나 (다시 schedule 하면 재예약)
+    - schedule / cancel 은 O(1) (core.timer_wheel.TimerWheel), 요청 스레드에서 호출 가능
+    - 이벤트 루프 task 하나가 다음 타이머 시각까지 잠들었다가 만료된 타이머의 handler 실행
+      (타이머가 없으면 새 타이머가 올 때까지 대기 → 한가할 때는 CPU 사용 없음)
+    - handler(user_id, payload) 는 kind 별로 register, 스레드에서 실행 (세션 저장소 I/O)
+    - path 가 있으면 deadline 을 SQLite 에 저장 (PERSIST_INTERVAL 마다 변경분만)
+      → 재시작하면 남은 타이머를 다시 불러오고, 그 사이 지난 타이머는 바로 실행
+    - 타이머 실행은 한 프로세스만 (path 의 lease, LEASE_RENEW 마다 갱신) → uvicorn --workers N 가능
+      owner: lease 를 가진 워커, 타이머 wheel 로 실행
+      standby: 나머지 워커, 타이머를 실행하지 않고 schedule / cancel 을 바로 SQLite 에 기록
+        (escalation_timers + owner 에게 넘길 변경 기록 escalation_changes)
+        owner 는 PERSIST_INTERVAL 마다, 그리고 타이머를 실행하기 직전에 변경 기록을 wheel 에 반영
+        → standby 에서 예약한 타이머는 최대 PERSIST_INTERVAL 늦게 실행될 수 있음
+        LEASE_RENEW 마다 lease 를 다시 시도, owner 가 멈추면 (LEASE_TTL) 이어받아 owner 로
+      lease 갱신이 안 되면 (다른 프로세스가 이어받음) 타이머 실행을 멈추고 standby 로
+      path 가 없으면 lease 를 확인할 수 없으므로 워커 하나로만 실행할 것
+    """
+
+    def __init__(self, path=None, tick=TICK, persist_interval=PERSIST_INTERVAL):
+        self.path = path
+        self.tick = tick
+        self.persist_interval = persist_interval
+        self.standby = False
+        self._wheel = TimerWheel(tick, time.time())
+        self._handlers = {}
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()  # SQLite 연결 하나를 요청 스레드 / task 가 같이 씀
+        self._dirty = {}  # key → (deadline, payload) 또는 None (삭제)
+        self._last_change = 0  # 반영한 escalation_changes 의 마지막 seq
+        self._wakeup_at = None  # task 가 깨어나기로 한 시각
+        self._wake = None
+        self._loop = None
+        self._task = None
+        self._conn = None
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+
+        # 통계
+        self.scheduled = 0
+        self.cancelled = 0
+        self.fired = 0
+        self.failed = 0
+        self.restored = 0
+        self.synced = 0  # standby 워커에서 받은 변경 수
+
+    def __len__(self):
+        return len(self._wheel)
+
+    def stats(self):
+        return {
+            "pending": len(self._wheel),
+            "standby": self.standby,
+            "scheduled": self.scheduled,
+            "cancelled": self.cancelled,
+            "fired": self.fired,
+            "failed": self.failed,
+            "restored": self.restored,
+            "synced": self.synced,
+        }
+
+    def register(self, kind, handler):
+        self._handlers[kind] = handler
+
+    # ===== 요청 쪽 (아무 스레드) =====
+
+    def schedule(self, user_id, kind, deadline, payload=None):
+        key = (user_id, kind)
+        with self._lock:
+            standby = self.standby
+            if not standby:
+                self._wheel.schedule(key, deadline, payload)
+                self._dirty[key] = (deadline, payload)
+            self.scheduled += 1
+            wake = not standby and (self._wakeup_at is None or deadline < self._wakeup_at)
+        if standby:
+            self._write({key: (deadline, payload)})
+        elif wake:
+            self._notify()
+
+    def schedule_in(self, user_id, kind, delay, payload=None):
+        self.schedule(user_id, kind, time.time() + delay, payload)
+
+    def cancel(self, user_id, kind):
+        key = (user_id, kind)
+        with self._lock:
+            standby = self.standby
+            if not standby:
+                cancelled = self._wheel.cancel(key)
+                if cancelled:
+                    self._dirty[key] = None
+        if standby:
+            # owner 가 아직 저장하지 않은 타이머일 수 있으므로 취소 기록은 항상 남김
+            cancelled = self._write({key: None}) > 0
+        if cancelled:
+            with self._lock:
+                self.cancelled += 1
+        return cancelled
+
+    def deadline(self, user_id, kind):
+        with self._lock:
+            if not self.standby:
+                return self._wheel.deadline((user_id, kind))
+        with self._db_lock:
+            row = self._connect().execute(
+                "SELECT deadline FROM escalation_timers WHERE user_id = ? AND kind = ?", (user_id, kind)
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def _notify(self):
+        loop = self._loop
+        if loop is None:
+            return
+        try:
+            in_loop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            in_loop = False
+        if in_loop:
+            self._wake.set()
+        else:
+            loop.call_soon_threadsafe(self._wake.set)
+
+    # ===== 시작 / 종료 =====
+
+    async def start(self):
+        """타이머 실행 시작 (path 가 있으면 lease 를 얻고 남은 타이머 복원, 못 얻으면 standby)"""
+        if self.path is not None:
+            if await asyncio.to_thread(self._acquire_lease):
+                await asyncio.to_thread(self._promote)
+            else:
+                await asyncio.to_thread(self._demote)
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self._loop = None
+        if self.path is not None and self._conn is not None:
+            if not self.standby:
+                await asyncio.to_thread(self._persist)
+                await asyncio.to_thread(self._release_lease)
+            with self._db_lock:
+                self._conn.close()
+                self._conn = None
+
+    # ===== 실행 task =====
+
+    async def _run(self):
+        while True:
+            if self.standby:
+                await self._wait_for_lease()
+            await self._run_timers()
+
+    async def _wait_for_lease(self):
+        """standby: LEASE_RENEW 마다 lease 를 시도, 얻으면 남은 타이머를 불러오고 반환"""
+        while True:
+            await asyncio.sleep(LEASE_RENEW)
+            if await asyncio.to_thread(self._acquire_lease):
+                await asyncio.to_thread(self._promote)
+                print(f"[escalation] {self.owner}: 타이머 소유권을 이어받음")
+                return
+
+    async def _run_timers(self):
+        """owner: 타이머 실행 (lease 를 잃으면 standby 로 바꾸고 반환)"""
+        next_sync = time.monotonic() + self.persist_interval
+        next_renew = time.monotonic() + LEASE_RENEW
+        while True:
+            # 여기서부터 들어온 schedule 은 아래 대기를 바로 깨움
+            self._wake.clear()
+
+            if self.path is not None:
+                # standby 워커의 변경은 주기마다, 그리고 타이머를 실행하기 직전에 반영 (다른 워커의 cancel 을 놓치지 않게)
+                with self._lock:
+                    next_at = self._wheel.next_tick_time()
+                synced = time.monotonic() >= next_sync
+                if synced or (next_at is not None and next_at <= time.time()):
+                    await asyncio.to_thread(self._sync)
+                if synced:
+                    next_sync = time.monotonic() + self.persist_interval
+                    if self._dirty:
+                        await asyncio.to_thread(self._persist)
+
+            now = time.time()
+            with self._lock:
+                due = self._wheel.advance(now)
+                next_at = self._wheel.next_tick_time()
+                self._wakeup_at = next_at
+                for key, _, _ in due:
+                    self._dirty[key] = None
+
+            if due:
+                await asyncio.to_thread(self._fire, due)
+
+            if self.path is not None and time.monotonic() >= next_renew:
+                next_renew = time.monotonic() + LEASE_RENEW
+                if not await asyncio.to_thread(self._renew_lease):
+                    print(f"[escalation] {self.owner}: lease 를 잃음 → 타이머 실행 중단, standby 로")
+                    await asyncio.to_thread(self._demote)
+                    return
+
+            # 다음 타이머 (없으면 새 타이머) 까지 대기
+            # path 가 있으면 변경 반영 / lease 갱신 주기보다 오래 잠들지 않음
+            timeout = None if next_at is None else max(0.0, next_at - time.time())
+            if self.path is not None:
+                wait = max(0.0, min(next_sync, next_renew) - time.monotonic())
+                timeout = wait if timeout is None else min(timeout, wait)
+
+            # wait_for 는 wake 와 stop() 의 cancel 이 겹치면 cancel 을 삼키므로 (Python 3.11) 시간이 되면 wake 를 set
+            timer = None if timeout is None else self._loop.call_later(timeout, self._wake.set)
+            try:
+                await self._wake.wait()
+            finally:
+                if timer is not None:
+                    timer.cancel()
+
+    def _fire(self, due):
+        for (user_id, kind), _, payload in due:
+            handler = self._handlers.get(kind)
+            if handler is None:
+                continue
+            try:
+                handler(user_id, payload)
+                self.fired += 1
+            except Exception as e:
+                self.failed += 1
+                print(f"[escalation] {user_id} {kind} 실행 실패: {e}")
+
+    # ===== SQLite =====
+
+    def _connect(self):
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS escalation_timers (
+                    user_id TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    deadline REAL NOT NULL,
+                    payload TEXT,
+                    PRIMARY KEY (user_id, kind)
+                ) WITHOUT ROWID
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS escalation_lease (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    owner TEXT NOT NULL,
+                    expires REAL NOT NULL
+                )
+                """
+            )
+            # standby 워커의 schedule (deadline) / cancel (deadline NULL) → owner 가 읽고 지움
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS escalation_changes (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    deadline REAL,
+                    payload TEXT
+                )
+                """
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    # ===== 소유권 (lease) =====
+
+    def _acquire_lease(self):
+        """lease 를 얻으면 True (살아 있는 다른 소유자가 있으면 False)"""
+        with self._db_lock:
+            conn = self._connect()
+            with conn:
+                # 확인 + 기록을 한 트랜잭션으로 (동시에 뜬 워커 둘이 모두 가져가지 않게)
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute("SELECT owner, expires FROM escalation_lease WHERE id = 1").fetchone()
+                if row is not None and row[0] != self.owner and row[1] > time.time() and _alive(row[0]):
+                    return False
+                conn.execute(
+                    "INSERT OR REPLACE INTO escalation_lease VALUES (1, ?, ?)",
+                    (self.owner, time.time() + LEASE_TTL),
+                )
+        return True
+
+    def _renew_lease(self):
+        """lease 연장, 다른 프로세스가 이어받았으면 False"""
+        try:
+            with self._db_lock, self._connect() as conn:
+                cur = conn.execute(
+                    "UPDATE escalation_lease SET expires = ? WHERE id = 1 AND owner = ?",
+                    (time.time() + LEASE_TTL, self.owner),
+                )
+        except sqlite3.Error as e:
+            # 일시적인 오류는 다음 주기에 다시 (만료 전까지는 아직 소유자)
+            print(f"[escalation] lease 갱신 실패: {e}")
+            return True
+        return cur.rowcount > 0
+
+    def _release_lease(self):
+        try:
+            with self._db_lock, self._connect() as conn:
+                conn.execute("DELETE FROM escalation_lease WHERE id = 1 AND owner = ?", (self.owner,))
+        except sqlite3.Error as e:
+            print(f"[escalation] lease 해제 실패: {e}")
+
+    def _promote(self):
+        """standby → owner: 저장된 타이머를 불러옴 (그 전까지의 변경 기록은 이미 escalation_timers 에 있음)"""
+        with self._db_lock:
+            conn = self._connect()
+            with conn:
+                self._last_change = conn.execute("SELECT MAX(seq) FROM escalation_changes").fetchone()[0] or 0
+                conn.execute("DELETE FROM escalation_changes WHERE seq <= ?", (self._last_change,))
+        self._restore()
+        with self._lock:
+            self.standby = False
+
+    def _demote(self):
+        """owner → standby: 아직 저장하지 않은 변경은 owner 에게 넘기고 wheel 비움"""
+        with self._lock:
+            self.standby = True
+            dirty, self._dirty = self._dirty, {}
+            self._wheel = TimerWheel(self.tick, time.time())
+            self._wakeup_at = None
+        if dirty:
+            try:
+                self._write(dirty)
+            except sqlite3.Error as e:
+                print(f"[escalation] 타이머 {len(dirty)}개 넘기기 실패: {e}")
+
+    # ===== 복원 / 저장 =====
+
+    def _restore(self):
+        with self._db_lock:
+            rows = self._connect().execute(
+                "SELECT user_id, kind, deadline, payload FROM escalation_timers"
+            ).fetchall()
+        with self._lock:
+            for user_id, kind, deadline, payload in rows:
+                key = (user_id, kind)
+                # 이번 실행 중에 이미 다시 예약된 타이머는 그대로 둠
+                if key in self._wheel:
+                    continue
+                self._wheel.schedule(key, deadline, json.loads(payload) if payload else None)
+                self.restored += 1
+
+    def _sync(self):
+        """owner: standby 워커가 남긴 변경 기록을 wheel 에 반영하고 지움"""
+        try:
+            with self._db_lock:
+                conn = self._connect()
+                rows = conn.execute(
+                    "SELECT seq, user_id, kind, deadline, payload FROM escalation_changes"
+                    " WHERE seq > ? ORDER BY seq",
+                    (self._last_change,),
+                ).fetchall()
+                if not rows:
+                    return
+                with conn:
+                    conn.execute("DELETE FROM escalation_changes WHERE seq <= ?", (rows[-1][0],))
+        except sqlite3.Error as e:
+            print(f"[escalation] 변경 기록 읽기 실패: {e}")
+            return
+
+        self._last_change = rows[-1][0]
+        with self._lock:
+            for _, user_id, kind, deadline, payload in rows:
+                key = (user_id, kind)
+                if deadline is None:
+                    if self._wheel.cancel(key):
+                        self.cancelled += 1
+                    self._dirty[key] = None
+                else:
+                    payload = json.loads(payload) if payload else None
+                    self._wheel.schedule(key, deadline, payload)
+                    self._dirty[key] = (deadline, payload)
+                self.synced += 1
+
+    def _persist(self):
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+        if not dirty:
+            return
+        try:
+            self._store(dirty, owner=True)
+        except sqlite3.Error as e:
+            print(f"[escalation] 타이머 {len(dirty)}개 저장 실패: {e}")
+            # 다음 주기에 다시 시도 (그 사이 바뀐 값이 우선)
+            with self._lock:
+                for key, value in dirty.items():
+                    self._dirty.setdefault(key, value)
+
+    def _write(self, changes):
+        """standby: 변경을 바로 저장하고 owner 에게 넘김 → 지운 타이머 수"""
+        return self._store(changes, owner=False)
+
+    def _store(self, changes, owner):
+        upserts = [
+            (user_id, kind, value[0], json.dumps(value[1]) if value[1] is not None else None)
+            for (user_id, kind), value in changes.items() if value is not None
+        ]
+        deletes = [key for key, value in changes.items() if value is None]
+        with self._db_lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                if owner:
+                    # 그 사이 다른 프로세스가 이어받았으면 (이미 복원을 마쳤으므로) standby 처럼 변경 기록도 남김
+                    row = conn.execute("SELECT owner FROM escalation_lease WHERE id = 1").fetchone()
+                    owner = row is not None and row[0] == self.owner
+                conn.executemany("INSERT OR REPLACE INTO escalation_timers VALUES (?, ?, ?, ?)", upserts)
+                removed = sum(
+                    conn.execute("DELETE FROM escalation_timers WHERE user_id = ? AND kind = ?", key).rowcount
+                    for key in deletes
+                )
+                if not owner:
+                    conn.executemany(
+                        "INSERT INTO escalation_changes (user_id, kind, deadline, payload) VALUES (?, ?, ?, ?)",
+                        upserts + [(user_id, kind, None, None) for user_id, kind in deletes],
+                    )
+        return removed
+
+
+def _alive(owner):
+    """lease 소유자 ("host:pid") 가 살아 있는지 (다른 호스트는 알 수 없으므로 살아 있다고 봄)"""
+    host, _, pid = owner.rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+# ESCALATION_DB="" 이면 저장하지 않음 (재시작 시 타이머 유실, 워커 사이 공유도 안 됨 → uvicorn --workers 1)
+# 저장하면 uvicorn --workers N: 타이머는 lease 를 가진 워커 하나가 실행, 나머지는 standby (같은 파일을 공유)
+ESCALATION_DB = os.environ.get(
+    "ESCALATION_DB",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "storage", "escalation.db"),
+)
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """기본 scheduler (처음 호출할 때 생성, 시작은 서버 lifespan 에서)"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = EscalationScheduler(ESCALATION_DB or None)
+    return _scheduler
+
+
+def current_scheduler():
+    """이미 만들어진 scheduler (없으면 None, 새로 만들지 않음 - metric 수집용)"""
+    return _scheduler
+
+
+def set_scheduler(scheduler):
+    global _scheduler
+    with _scheduler_lock:
+        _scheduler = scheduler
@@ -0,0 +1,226 @@
+import threading
+import time
+from bisect import bisect_left
+
+# 초 단위 지연 시간 버킷
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class Counter:
+    """증가만 하는 값 (잠금은 값 하나당 하나, 경합이 거의 없어 비용이 작음)"""
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, n=1):
+        with self._lock:
+            self.value += n
+
+    def samples(self, name, labels):
+        yield name, labels, self.value
+
+
+class Histogram:
+    """고정 버킷 히스토그램 (버킷 배열은 생성 시 미리 할당)"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # 마지막 = +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def samples(self, name, labels):
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        cumulative = 0
+        for bound, n in zip(self.buckets + (float("inf"),), counts):
+            cumulative += n
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            yield f"{name}_bucket", labels + (("le", le),), cumulative
+        yield f"{name}_sum", labels, total
+        yield f"{name}_count", labels, count
+
+
+class Family:
+    """
+    같은 이름의 metric 묶음 (라벨 값 조합마다 하나)
+    - 라벨 조합은 가능하면 labels() 로 미리 만들어 둠 → 기록 경로에서는 dict 조회만
+    """
+
+    def __init__(self, name, help, kind, labelnames=(), factory=Counter):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self._factory = factory
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = factory()
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._factory())
+        return child
+
+    # 라벨 없는 metric 용
+    def inc(self, n=1):
+        self._children[()].inc(n)
+
+    def observe(self, value):
+        self._children[()].observe(value)
+
+    def render(self, lines):
+        lines.append(f"# HELP {self.name} {self.help}")
+        lines.append(f"# TYPE {self.name} {self.kind}")
+        for values, child in list(self._children.items()):
+            labels = tuple(zip(self.labelnames, values))
+            for name, sample_labels, value in child.samples(self.name, labels):
+                lines.append(_sample_line(name, sample_labels, value))
+
+
+class Callback:
+    """
+    수집 시점에 값을 읽는 metric (fn 은 숫자 또는 {라벨 값 튜플: 숫자} 반환)
+    - fn 이 None 을 반환하면 (아직 생성되지 않은 저장소 등) 이번 수집에서는 생략
+    """
+
+    def __init__(self, name, help, kind, fn, labelnames=()):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.fn = fn
+        self.labelnames = tuple(labelnames)
+
+    def render(self, lines):
+        try:
+            value = self.fn()
+        except Exception:
+            # 값을 읽다 실패 → 이번 수집에서는 생략
+            return
+        if value is None:
+            return
+        lines.append(f"# HELP {self.name} {self.help}")
+        lines.append(f"# TYPE {self.name} {self.kind}")
+        if isinstance(value, dict):
+            for values, v in value.items():
+                lines.append(_sample_line(self.name, tuple(zip(self.labelnames, values)), v))
+        else:
+            lines.append(_sample_line(self.name, (), value))
+
+
+def _sample_line(name, labels, value):
+    if labels:
+        inner = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+        return f"{name}{{{inner}}} {float(value)!r}"
+    return f"{name} {float(value)!r}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+# ===== registry =====
+
+_registry = []
+
+
+def counter(name, help, labelnames=()):
+    family = Family(name, help, "counter", labelnames, Counter)
+    _registry.append(family)
+    return family
+
+
+def histogram(name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+    family = Family(name, help, "histogram", labelnames, lambda: Histogram(buckets))
+    _registry.append(family)
+    return family
+
+
+def register_callback(name, help, fn, kind="gauge", labelnames=()):
+    _registry.append(Callback(name, help, kind, fn, labelnames))
+
+
+def render():
+    """Prometheus text 형식 (text/plain; version=0.0.4)"""
+    lines = []
+    for metric in _registry:
+        metric.render(lines)
+    return "\n".join(lines) + "\n"
+
+
+# ===== 공통 metric =====
+
+HTTP_REQUESTS = counter(
+    "drowsy_http_requests_total", "HTTP requests by route and status class", ("route", "status")
+)
+HTTP_LATENCY = histogram(
+    "drowsy_http_request_duration_seconds", "HTTP request latency by route", ("route",)
+)
+STORE_FLUSH_SECONDS = histogram(
+    "drowsy_store_flush_duration_seconds", "Event store flush (group commit) latency",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+ALARMS = counter("drowsy_alarms_total", "Alarms triggered")
+ESCALATIONS = counter(
+    "drowsy_alarm_escalations_total", "Alarm limit exceeded (sleep recommended, sleep mode locked)"
+)
+
+STATUS_CLASSES = ("2xx", "3xx", "4xx", "5xx")
+OTHER_ROUTE = "other"
+
+
+class MetricsMiddleware:
+    """
+    요청 수 / 지연 시간 수집 (순수 ASGI 미들웨어, 응답 본문은 건드리지 않음)
+    - 라벨은 경로 템플릿 (route.path) → 라벨 수가 라우트 수로 고정, 매칭 안 된 요청은 "other"
+    - 라우트별 metric 묶음은 라우트마다 처음 한 번만 만들고 이후에는 dict 조회만
+    - 이벤트 루프에서만 실행되므로 _routes 에는 잠금 불필요
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._routes = {}
+
+    def _entry(self, path):
+        entry = self._routes.get(path)
+        if entry is None:
+            entry = (
+                HTTP_LATENCY.labels(path),
+                {s: HTTP_REQUESTS.labels(path, s) for s in STATUS_CLASSES},
+            )
+            self._routes[path] = entry
+        return entry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            latency, requests = self._entry(getattr(scope.get("route"), "path", OTHER_ROUTE))
+            latency.observe(elapsed)
+            requests.get(f"{status // 100}xx", requests["5xx"]).inc()
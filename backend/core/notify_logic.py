@@ -0,0 +1,316 @@
+import asyncio
+import heapq
+import os
+import random
+import time
+from collections import deque
+from datetime import datetime
+
+# 숫자가 작을수록 먼저 보냄
+PRIORITY = {"DROWSY": 0, "WARNING": 1}
+
+DEBOUNCE_WINDOW = 30.0  # 초, 같은(또는 더 낮은) 단계 알림은 이 시간 안에 다시 보내지 않음
+MAX_CONCURRENCY = 8  # 동시에 sink 로 보내는 알림 수
+MAX_RETRIES = 3
+RETRY_BASE = 0.5  # 초, 재시도 대기 = uniform(0, RETRY_BASE * 2**시도)
+MAX_PENDING = 10_000  # 대기 중인 사용자 수 상한 (넘으면 새 알림 버림)
+STUB_KEEP = 1000  # StubSink 가 보관하는 최근 알림 수
+
+
+class Notification:
+    """보낼 알림 하나 (같은 사용자의 알림은 보내기 전까지 하나로 합쳐짐)"""
+
+    __slots__ = ("user_id", "level", "message", "created", "count")
+
+    def __init__(self, user_id, level, message=None, created=None):
+        self.user_id = user_id
+        self.level = level
+        self.message = message
+        self.created = time.time() if created is None else created
+        self.count = 1  # 합쳐진 알림 수
+
+    @property
+    def priority(self):
+        return PRIORITY[self.level]
+
+    def to_dict(self):
+        return {
+            "user_id": self.user_id,
+            "level": self.level,
+            "message": self.message,
+            "created": datetime.fromtimestamp(self.created).isoformat(),
+            "count": self.count,
+        }
+
+
+# ===== sink =====
+
+class StubSink:
+    """
+    테스트용 로컬 sink: 받은 알림을 목록에 저장
+    - fail_times: 처음 이 횟수만큼은 일부러 실패 (재시도 확인용)
+    - 최근 keep 개만 보관 (벤치마크처럼 오래 돌아도 메모리가 늘지 않게), 전체 개수는 delivered
+    """
+
+    name = "stub"
+
+    def __init__(self, fail_times=0, delay=0.0, keep=STUB_KEEP):
+        self.sent = deque(maxlen=keep)
+        self.delivered = 0
+        self.fail_times = fail_times
+        self.delay = delay
+        self.attempts = 0
+
+    async def send(self, notification):
+        self.attempts += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.attempts <= self.fail_times:
+            raise ConnectionError("stub sink failure")
+        self.sent.append(notification.to_dict())
+        self.delivered += 1
+
+
+class LogSink:
+    """콘솔 출력 (기존 print 알림과 같은 형식)"""
+
+    name = "log"
+
+    async def send(self, notification):
+        n = notification
+        print(f"[{datetime.now().isoformat()}] {n.user_id}: {n.level} 알림 ({n.count}건) {n.message or ''}")
+
+
+class WebSocketSink:
+    """열려 있는 /ws/drowsy 연결로 push"""
+
+    name = "websocket"
+
+    async def send(self, notification):
+        from core.stream_logic import hub
+
+        hub.publish(notification.user_id, {"type": "notify", **notification.to_dict()})
+
+
+SINKS = {"stub": StubSink, "log": LogSink, "websocket": WebSocketSink}
+
+
+# ===== dispatcher =====
+
+class NotificationDispatcher:
+    """
+    asyncio 알림 발송기
+    - submit(): 대기열에 넣기만 하고 바로 반환 (요청 핸들러를 막지 않음, 다른 스레드에서도 호출 가능)
+    - 합치기: 사용자별로 아직 안 보낸 알림은 하나만 유지 (더 높은 단계가 오면 단계만 올림)
+    - debounce: 같은 단계 이상을 debounce 초 안에 보냈으면 버림 (WARNING → DROWSY 상승은 바로 보냄)
+    - 우선순위: DROWSY 를 WARNING 보다 먼저 보냄
+    - force: 합치기 / debounce 없이 따로 보냄 (스케줄러 알람 재시도 / 낮잠 만료처럼 서버가 정한 시각의 알림
+      → 직전 샘플 알림 때문에 버려지거나 합쳐지면 안 됨)
+    - max_concurrency 개 worker 가 sink 로 전송, 실패하면 지터를 준 지수 백오프로 재시도
+    """
+
+    def __init__(
+        self,
+        sinks,
+        debounce=DEBOUNCE_WINDOW,
+        max_concurrency=MAX_CONCURRENCY,
+        max_retries=MAX_RETRIES,
+        retry_base=RETRY_BASE,
+        max_pending=MAX_PENDING,
+    ):
+        self.sinks = list(sinks)
+        self.debounce = debounce
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.retry_base = retry_base
+        self.max_pending = max_pending
+
+        self._pending = {}  # user_id → Notification
+        self._heap = []  # (priority, seq, user_id, force 알림 또는 None), 단계가 바뀌면 새로 넣고 오래된 항목은 꺼낼 때 무시
+        self._forced = 0  # heap 에 있는 force 알림 수
+        self._seq = 0
+        self._last_sent = {}  # user_id → (priority, 보낸 시각)
+        self._ready = None
+        self._loop = None
+        self._workers = []
+        self._active = 0
+
+        # 통계
+        self.submitted = 0
+        self.coalesced = 0
+        self.suppressed = 0
+        self.dropped = 0
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+
+    def stats(self):
+        return {
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "suppressed": self.suppressed,
+            "dropped": self.dropped,
+            "sent": self.sent,
+            "failed": self.failed,
+            "retries": self.retries,
+            "pending": len(self._pending) + self._forced,
+            "active": self._active,
+            "sinks": [sink.name for sink in self.sinks],
+        }
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._ready = asyncio.Event()
+        if self._heap:
+            self._ready.set()
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.max_concurrency)
+        ]
+
+    async def stop(self, timeout=5.0):
+        """남은 알림을 timeout 초 동안 보내고 worker 종료"""
+        deadline = time.monotonic() + timeout
+        while (self._pending or self._forced or self._active) and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._loop = None
+
+    def submit(self, user_id, level, message=None, force=False):
+        """알림 요청 (PRIORITY 에 없는 단계는 무시, force 면 합치기 / debounce 없이 보냄)"""
+        if level not in PRIORITY:
+            return
+        loop = self._loop
+        if loop is not None:
+            try:
+                in_loop = asyncio.get_running_loop() is loop
+            except RuntimeError:
+                in_loop = False
+            if not in_loop:
+                loop.call_soon_threadsafe(self._submit, user_id, level, message, time.time(), force)
+                return
+        self._submit(user_id, level, message, time.time(), force)
+
+    def _submit(self, user_id, level, message, created, force=False):
+        self.submitted += 1
+        priority = PRIORITY[level]
+
+        if force:
+            if len(self._pending) + self._forced >= self.max_pending:
+                self.dropped += 1
+                return
+            self._forced += 1
+            self._push(priority, user_id, Notification(user_id, level, message, created))
+            return
+
+        last = self._last_sent.get(user_id)
+        if last is not None and last[0] <= priority and created - last[1] < self.debounce:
+            self.suppressed += 1
+            return
+
+        pending = self._pending.get(user_id)
+        if pending is not None:
+            pending.count += 1
+            self.coalesced += 1
+            if priority < pending.priority:
+                pending.level = level
+                pending.message = message
+                self._push(priority, user_id)
+            return
+
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            return
+
+        self._pending[user_id] = Notification(user_id, level, message, created)
+        self._push(priority, user_id)
+
+    def _push(self, priority, user_id, forced=None):
+        self._seq += 1
+        heapq.heappush(self._heap, (priority, self._seq, user_id, forced))
+        if self._ready is not None:
+            self._ready.set()
+
+    def _pop(self):
+        """우선순위가 가장 높은 대기 알림 (없으면 None)"""
+        while self._heap:
+            priority, _, user_id, forced = heapq.heappop(self._heap)
+            if forced is not None:
+                self._forced -= 1
+                self._last_sent[user_id] = (priority, time.time())
+                return forced
+            pending = self._pending.get(user_id)
+            # 단계가 올라가서 다시 넣은 경우 예전 항목은 무시
+            if pending is not None and pending.priority == priority:
+                del self._pending[user_id]
+                self._last_sent[user_id] = (priority, time.time())
+                return pending
+        return None
+
+    async def _worker(self):
+        while True:
+            notification = self._pop()
+            if notification is None:
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+
+            self._active += 1
+            try:
+                results = await asyncio.gather(
+                    *(self._deliver(sink, notification) for sink in self.sinks)
+                )
+                if all(results):
+                    self.sent += 1
+                else:
+                    self.failed += 1
+            finally:
+                self._active -= 1
+
+            self._expire_last_sent()
+
+    async def _deliver(self, sink, notification):
+        for attempt in range(self.max_retries + 1):
+            try:
+                await sink.send(notification)
+                return True
+            except Exception as e:
+                if attempt == self.max_retries:
+                    print(f"[notify] {sink.name} 전송 실패 ({notification.user_id}): {e}")
+                    return False
+                self.retries += 1
+                await asyncio.sleep(random.uniform(0, self.retry_base * 2 ** attempt))
+
+    def _expire_last_sent(self):
+        # debounce 기록이 사용자 수만큼 계속 쌓이지 않도록 가끔 정리
+        if len(self._last_sent) <= 2 * self.max_pending:
+            return
+        cutoff = time.time() - self.debounce
+        self._last_sent = {u: v for u, v in self._last_sent.items() if v[1] >= cutoff}
+
+
+# 사용할 sink: NOTIFY_SINKS=log,websocket (쉼표로 구분)
+NOTIFY_SINKS = os.environ.get("NOTIFY_SINKS", "log")
+
+_dispatcher = None
+
+
+def get_dispatcher():
+    """기본 dispatcher (처음 호출할 때 생성, 시작은 서버 lifespan 에서)"""
+    global _dispatcher
+    if _dispatcher is None:
+        sinks = [SINKS[name.strip()]() for name in NOTIFY_SINKS.split(",") if name.strip()]
+        _dispatcher = NotificationDispatcher(sinks)
+    return _dispatcher
+
+
+def current_dispatcher():
+    """이미 만들어진 dispatcher (없으면 None, 새로 만들지 않음 - metric 수집용)"""
+    return _dispatcher
+
+
+def set_dispatcher(dispatcher):
+    global _dispatcher
+    _dispatcher = dispatcher
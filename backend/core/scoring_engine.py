@@ -0,0 +1,138 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from drowsy_common.detector_bank import DrowsinessDetectorBank
+
+# 세션당 링버퍼 약 106KB (bounded bank 라 입력이 몰려도 늘지 않음)
+# bank 행은 두 배씩 늘리므로 2000 세션이면 2048행 ≈ 217MB (늘리는 동안은 복사본까지 잠깐 두 배)
+MAX_SESSIONS = 2000
+IDLE_TTL = 300.0  # 초, 이 시간 동안 프레임이 없는 세션은 삭제
+
+# 응답에 담을 detector 출력 항목
+RESULT_KEYS = (
+    "state", "score", "ear", "avg_ear", "perclos", "blink_count", "blink_drop", "pitch",
+    "ear_score", "perclos_score", "blink_score", "head_score",
+)
+
+
+def _json_value(value):
+    # NaN (얼굴 없음 ear, 아직 없는 avg_ear 등) → None (DrowsinessDetector 와 같게, JSON 으로 보낼 수 있게)
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+class ScoringEngine:
+    """
+    서버 측 졸음 점수 계산 (세션마다 DrowsinessDetector 와 같은 윈도우 상태 유지)
+    - 세션 상태는 DrowsinessDetectorBank 한 곳에 모아 두고, 여러 세션의 프레임을 한 번에 벡터 계산
+    - 세션 수 상한 (넘으면 가장 오래 안 쓴 세션부터) + idle_ttl 초 동안 프레임이 없으면 삭제
+    - 스레드 안전 (점수 계산은 잠금 안에서)
+    """
+
+    def __init__(self, max_sessions=MAX_SESSIONS, idle_ttl=IDLE_TTL, capacity=64):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        # bounded: timestamp 없는 프레임을 한꺼번에 보내는 등 한 세션이 MAX_FPS 보다 빠르게 보내도
+        # 그 세션의 최근 윈도우 항목만 버리고 bank 전체 용량은 그대로 (세션 하나가 서버 메모리를 키우지 못하게)
+        self.bank = DrowsinessDetectorBank(capacity=capacity, bounded=True)
+        self._last_seen = OrderedDict()  # session_id → 마지막 프레임 시각 (오래된 순)
+        self._lock = threading.Lock()
+
+        # 통계
+        self.frames = 0
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self._last_seen)
+
+    def stats(self):
+        return {"sessions": len(self), "frames": self.frames, "evicted": self.evicted}
+
+    def score(self, frames):
+        """
+        frames: (session_id, ear, eye_state, pitch, timestamp) 목록 (세션별로 시간 순서)
+        - ear 가 None 이면 얼굴 없음, timestamp 가 None 이면 현재 시각
+        - 반환: 프레임마다 DrowsinessDetector.update 와 같은 키의 dict (NaN 값은 None)
+        """
+        now = time.time()
+
+        # 한 번의 update_batch 에는 세션당 한 프레임만 → 세션별 n 번째 프레임끼리 묶음
+        rounds = []
+        seen = {}
+        first_ts = {}
+        for i, frame in enumerate(frames):
+            k = seen.get(frame[0], 0)
+            seen[frame[0]] = k + 1
+            if k == len(rounds):
+                rounds.append([])
+            rounds[k].append(i)
+            if k == 0:
+                first_ts[frame[0]] = now if frame[4] is None else frame[4]
+
+        results = [None] * len(frames)
+        with self._lock:
+            self._evict(seen)
+            # 새 세션의 베이스라인은 첫 프레임 시각부터
+            for session_id, ts in first_ts.items():
+                if session_id not in self.bank:
+                    self.bank.add_session(session_id, start_time=ts)
+            for indices in rounds:
+                batch = [frames[i] for i in indices]
+                out = self.bank.update_batch(
+                    [f[0] for f in batch],
+                    [float("nan") if f[1] is None else f[1] for f in batch],
+                    [f[2] == "CLOSED" for f in batch],
+                    [f[3] for f in batch],
+                    [now if f[4] is None else f[4] for f in batch],
+                )
+                columns = [[_json_value(v) for v in out[key].tolist()] for key in RESULT_KEYS]
+                for j, i in enumerate(indices):
+                    results[i] = {key: col[j] for key, col in zip(RESULT_KEYS, columns)}
+            self.frames += len(frames)
+
+        return results
+
+    def remove(self, session_id):
+        with self._lock:
+            if self._last_seen.pop(session_id, None) is not None:
+                self.bank.remove_session(session_id)
+
+    def _evict(self, incoming):
+        """incoming 세션 갱신 + 오래된 / 넘치는 세션 삭제 (잠금 안에서 호출)"""
+        now = time.monotonic()
+        last_seen = self._last_seen
+        for session_id in incoming:
+            last_seen[session_id] = now
+            last_seen.move_to_end(session_id)
+
+        while last_seen:
+            session_id, seen = next(iter(last_seen.items()))
+            if session_id in incoming:
+                break
+            if now - seen <= self.idle_ttl and len(last_seen) <= self.max_sessions:
+                break
+            del last_seen[session_id]
+            self.bank.remove_session(session_id)
+            self.evicted += 1
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """기본 ScoringEngine (처음 호출할 때 생성)"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = ScoringEngine()
+    return _engine
+
+
+def current_engine():
+    """이미 만들어진 ScoringEngine (없으면 None, 새로 만들지 않음 - metric 수집용)"""
+    return _engine
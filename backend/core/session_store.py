@@ -0,0 +1,220 @@
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+SESSION_TTL = 6 * 3600  # 초, 이 시간 동안 변경이 없는 세션은 삭제
+SWEEP_EVERY = 256  # 샤드(또는 프로세스)별로 이 횟수만큼 접근할 때마다 만료 세션 정리
+
+
+def new_session():
+    # alarm_retry: 클라이언트가 알람에 응답(ack)할 수 있음을 확인 → 서버 쪽 재시도 타이머 사용
+    return {"alarm_counter": 0, "sleep_mode_locked": False, "alarm_retry": False}
+
+
+class MemorySessionStore:
+    """
+    프로세스 내 사용자별 세션 저장소
+    - user_id 해시로 샤드를 나누고 샤드마다 잠금 → 다른 사용자끼리는 서로 기다리지 않음
+    - update(user_id, fn): 잠금을 잡은 채로 fn(state) 실행 (읽기-수정-쓰기 원자적)
+    - 마지막 변경 후 ttl 초가 지난 세션은 접근 시점에 조금씩 정리
+    """
+
+    def __init__(self, shards=16, ttl=SESSION_TTL):
+        self.ttl = ttl
+        self._shards = [{} for _ in range(shards)]
+        self._locks = [threading.Lock() for _ in range(shards)]
+        self._ops = [0] * shards
+
+    def __len__(self):
+        return sum(len(shard) for shard in self._shards)
+
+    def _index(self, user_id):
+        # hash() 는 프로세스마다 달라서 crc32 사용
+        return zlib.crc32(user_id.encode()) % len(self._shards)
+
+    def update(self, user_id, fn):
+        i = self._index(user_id)
+        now = time.time()
+        with self._locks[i]:
+            shard = self._shards[i]
+            entry = shard.get(user_id)
+            if entry is None or now - entry[0] > self.ttl:
+                entry = [now, new_session()]
+                shard[user_id] = entry
+            result = fn(entry[1])
+            entry[0] = now
+
+            self._ops[i] += 1
+            if self._ops[i] % SWEEP_EVERY == 0:
+                self._sweep(shard, now)
+        return result
+
+    def get(self, user_id):
+        """현재 세션 상태 복사본 (없거나 만료면 초기 상태, 만료 시각은 그대로)"""
+        i = self._index(user_id)
+        with self._locks[i]:
+            entry = self._shards[i].get(user_id)
+            if entry is None or time.time() - entry[0] > self.ttl:
+                return new_session()
+            return dict(entry[1])
+
+    def delete(self, user_id):
+        i = self._index(user_id)
+        with self._locks[i]:
+            self._shards[i].pop(user_id, None)
+
+    def evict_expired(self):
+        now = time.time()
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                self._sweep(shard, now)
+
+    def _sweep(self, shard, now):
+        expired = [uid for uid, (ts, _) in shard.items() if now - ts > self.ttl]
+        for uid in expired:
+            del shard[uid]
+
+
+class SQLiteSessionStore:
+    """
+    여러 프로세스가 공유하는 세션 저장소 (uvicorn --workers N 용)
+    - 같은 SQLite 파일(WAL) 을 공유, update 는 BEGIN IMMEDIATE 트랜잭션 안에서 실행
+      → 프로세스 / 스레드가 달라도 같은 사용자의 읽기-수정-쓰기가 섞이지 않음
+    - 연결은 스레드마다 하나
+    """
+
+    def __init__(self, path, ttl=SESSION_TTL, timeout=5.0):
+        self.path = path
+        self.ttl = ttl
+        self.timeout = timeout
+        self._local = threading.local()
+        self._ops = 0
+
+        conn = self._conn()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS alarm_sessions (
+                user_id TEXT PRIMARY KEY,
+                alarm_counter INTEGER NOT NULL,
+                sleep_mode_locked INTEGER NOT NULL,
+                updated REAL NOT NULL,
+                alarm_retry INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        # alarm_retry 가 없던 파일 (컬럼 추가 전)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(alarm_sessions)")}
+        if "alarm_retry" not in columns:
+            try:
+                conn.execute("ALTER TABLE alarm_sessions ADD COLUMN alarm_retry INTEGER NOT NULL DEFAULT 0")
+            except sqlite3.OperationalError:
+                pass  # 동시에 시작한 다른 프로세스가 먼저 추가
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # isolation_level=None: 트랜잭션을 직접 BEGIN / COMMIT
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def __len__(self):
+        return self._conn().execute("SELECT count(*) FROM alarm_sessions").fetchone()[0]
+
+    def update(self, user_id, fn):
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT alarm_counter, sleep_mode_locked, updated, alarm_retry FROM alarm_sessions "
+                "WHERE user_id = ?",
+                (user_id,),
+            ).fetchone()
+            if row is None or now - row[2] > self.ttl:
+                state = new_session()
+            else:
+                state = _row_state(row)
+
+            result = fn(state)
+            conn.execute(
+                "INSERT OR REPLACE INTO alarm_sessions VALUES (?, ?, ?, ?, ?)",
+                (
+                    user_id, state["alarm_counter"], int(state["sleep_mode_locked"]), now,
+                    int(state["alarm_retry"]),
+                ),
+            )
+
+            self._ops += 1
+            if self._ops % SWEEP_EVERY == 0:
+                conn.execute("DELETE FROM alarm_sessions WHERE updated < ?", (now - self.ttl,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return result
+
+    def get(self, user_id):
+        row = self._conn().execute(
+            "SELECT alarm_counter, sleep_mode_locked, updated, alarm_retry FROM alarm_sessions "
+            "WHERE user_id = ?",
+            (user_id,),
+        ).fetchone()
+        if row is None or time.time() - row[2] > self.ttl:
+            return new_session()
+        return _row_state(row)
+
+    def delete(self, user_id):
+        self._conn().execute("DELETE FROM alarm_sessions WHERE user_id = ?", (user_id,))
+
+    def evict_expired(self):
+        self._conn().execute(
+            "DELETE FROM alarm_sessions WHERE updated < ?", (time.time() - self.ttl,)
+        )
+
+
+def _row_state(row):
+    # (alarm_counter, sleep_mode_locked, updated, alarm_retry) → 세션 dict
+    return {"alarm_counter": row[0], "sleep_mode_locked": bool(row[1]), "alarm_retry": bool(row[3])}
+
+
+# 저장소 선택: ALARM_SESSION_BACKEND=memory (기본) / sqlite
+BACKEND = os.environ.get("ALARM_SESSION_BACKEND", "memory")
+SESSION_DB_PATH = os.environ.get(
+    "ALARM_SESSION_DB",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "storage", "sessions.db"),
+)
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_session_store():
+    """설정된 세션 저장소 (처음 호출할 때 생성)"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if BACKEND == "sqlite":
+                    _store = SQLiteSessionStore(SESSION_DB_PATH)
+                elif BACKEND == "memory":
+                    _store = MemorySessionStore()
+                else:
+                    raise ValueError(f"unknown ALARM_SESSION_BACKEND: {BACKEND}")
+    return _store
+
+
+def current_session_store():
+    """이미 만들어진 세션 저장소 (없으면 None, 새로 만들지 않음 - metric 수집용)"""
+    return _store
+
+
+def set_session_store(store):
+    """저장소 교체 (테스트 / 다른 백엔드 연결용)"""
+    global _store
+    with _store_lock:
+        _store = store
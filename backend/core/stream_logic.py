@@ -0,0 +1,152 @@
+import asyncio
+import time
+from collections import deque
+
+from core.alarm_logic import ALARM_TIMER, trigger_alarm
+from core.escalation import get_scheduler
+
+HEARTBEAT_INTERVAL = 15.0  # 초, 보낼 메시지가 없으면 이 주기로 ping
+HEARTBEAT_TIMEOUT = 45.0  # 초, 이 시간 동안 클라이언트 메시지가 없으면 연결 종료
+OUTBOX_SIZE = 64  # 연결별 송신 대기열 크기
+ALARM_REPEAT = 5.0  # 초, DROWSY 가 계속되면 이 주기로 알람 재발동 (스케줄러 ALARM_TIMER 재시도 간격)
+
+
+class Outbox:
+    """
+    연결별 송신 대기열
+    - 크기 제한: 가득 차면 가장 오래된 메시지를 버림 (느린 클라이언트가 서버 메모리를 잡지 않도록)
+    - 이벤트 루프 스레드에서만 사용
+    """
+
+    def __init__(self, maxsize=OUTBOX_SIZE):
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._items = deque()
+        self._ready = asyncio.Event()
+
+    def __len__(self):
+        return len(self._items)
+
+    def put(self, message):
+        if len(self._items) >= self.maxsize:
+            self._items.popleft()
+            self.dropped += 1
+        self._items.append(message)
+        self._ready.set()
+
+    async def get(self, timeout):
+        """다음 메시지 (timeout 초 동안 없으면 None)"""
+        if not self._items:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self._items.popleft()
+
+
+class LiveSession:
+    """
+    WebSocket 연결 하나의 상태
+    - 받은 샘플의 state 로 알람 / 경고 결정을 만들어 outbox 에 넣음
+    - 알람 발동은 세션 저장소 I/O (SQLite 는 BEGIN IMMEDIATE 대기) 라 스레드에서 실행 후 outbox 에 넣음
+    - DROWSY 진입 때 한 번만 직접 발동, 계속되면 단계 상승은 스케줄러 ALARM_TIMER 가 ALARM_REPEAT 초마다
+      (REST / ack 재시도와 같은 타이머 하나 → 두 경로가 따로 단계를 올리지 않음)
+      DROWSY 에서 벗어나면 (또는 ack 하면) 재시도 타이머 취소
+    """
+
+    def __init__(self, user_id, outbox_size=OUTBOX_SIZE):
+        self.user_id = user_id
+        self.outbox = Outbox(outbox_size)
+        self.state = "NORMAL"
+        self.last_seen = time.monotonic()
+        self.received = 0
+        self._tasks = set()
+
+    def touch(self):
+        self.last_seen = time.monotonic()
+
+    def idle_for(self, now=None):
+        return (time.monotonic() if now is None else now) - self.last_seen
+
+    def on_sample(self, state):
+        """샘플 state → 필요하면 alarm / warning 메시지 push"""
+        self.received += 1
+        previous, self.state = self.state, state
+
+        if state == "DROWSY":
+            # DROWSY 진입 즉시 알람, 이후 단계 상승은 스케줄러 재시도 타이머
+            if previous != "DROWSY":
+                task = asyncio.get_running_loop().create_task(self._alarm())
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            return
+
+        if previous == "DROWSY":
+            get_scheduler().cancel(self.user_id, ALARM_TIMER)
+        if state == "WARNING" and previous == "NORMAL":
+            self.outbox.put({"type": "warning", "state": state})
+        elif state == "NORMAL" and previous != "NORMAL":
+            self.outbox.put({"type": "clear", "state": state})
+
+    async def _alarm(self):
+        result = await asyncio.to_thread(trigger_alarm, self.user_id, ALARM_REPEAT)
+        # 알람을 발동하는 사이 DROWSY 에서 벗어났으면 방금 예약된 재시도도 취소
+        if self.state != "DROWSY":
+            get_scheduler().cancel(self.user_id, ALARM_TIMER)
+        self.outbox.put({"type": "alarm", **result})
+
+    def close(self):
+        """진행 중인 알람 작업 취소 (연결 종료 시), DROWSY 였으면 받을 연결이 없으니 재시도 타이머도 취소"""
+        for task in self._tasks:
+            task.cancel()
+        if self.state == "DROWSY":
+            get_scheduler().cancel(self.user_id, ALARM_TIMER)
+
+
+class LiveHub:
+    """
+    사용자별 열린 세션 목록
+    - publish: 다른 모듈(REST 핸들러 등)에서 특정 사용자 연결로 메시지 push
+      이벤트 루프 밖의 스레드에서 호출해도 됨
+    """
+
+    def __init__(self):
+        self._sessions = {}
+        self._loop = None
+
+    def __len__(self):
+        return sum(len(s) for s in self._sessions.values())
+
+    def register(self, session):
+        self._loop = asyncio.get_running_loop()
+        self._sessions.setdefault(session.user_id, set()).add(session)
+
+    def unregister(self, session):
+        sessions = self._sessions.get(session.user_id)
+        if sessions is not None:
+            sessions.discard(session)
+            if not sessions:
+                del self._sessions[session.user_id]
+
+    def publish(self, user_id, message):
+        """user_id 의 모든 연결에 message push, 보낸 연결 수 반환 (다른 스레드에서는 0)"""
+        try:
+            in_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            in_loop = False
+
+        if not in_loop:
+            if self._loop is not None and not self._loop.is_closed():
+                self._loop.call_soon_threadsafe(self._deliver, user_id, message)
+            return 0
+        return self._deliver(user_id, message)
+
+    def _deliver(self, user_id, message):
+        sessions = self._sessions.get(user_id, ())
+        for session in sessions:
+            session.outbox.put(message)
+        return len(sessions)
+
+
+hub = LiveHub()
@@ -0,0 +1,153 @@
+import math
+
+# 단계별 슬롯 수 (0단계 한 칸 = resolution 초)
+# resolution=0.1 이면 0단계 25.6초, 1단계 27분, 2단계 29시간, 3단계 77일
+LEVEL_SLOTS = (256, 64, 64, 64)
+
+
+class TimerWheel:
+    """
+    계층형 timer wheel (deadline 은 epoch 초)
+    - schedule / cancel / 재예약은 타이머 수와 상관없이 O(1) (key 로 슬롯 dict 에서 바로 삭제)
+    - key 당 타이머 하나: 같은 key 로 다시 schedule 하면 기존 타이머를 대체
+    - advance(now): 지난 tick 들을 처리하며 만료된 (key, deadline, payload) 목록 반환
+      상위 단계 슬롯은 하위 단계가 한 바퀴 돌 때마다 한 칸씩 아래로 내려감 (cascade)
+    - 맨 위 단계 범위를 넘는 타이머는 overflow 에 두고 맨 위 단계가 한 바퀴 돌 때 다시 배치
+    - 잠금 없음 (호출하는 쪽에서 보호)
+    """
+
+    def __init__(self, resolution=0.1, now=0.0, slots=LEVEL_SLOTS):
+        self.resolution = resolution
+        self._sizes = tuple(slots)
+        # 단계별 한 칸의 tick 수
+        self._spans = [math.prod(self._sizes[:level]) for level in range(len(self._sizes))]
+        self._levels = [[{} for _ in range(n)] for n in self._sizes]
+        self._counts = [0] * len(self._sizes)
+        self._overflow = {}
+        self._where = {}  # key → (단계 (-1 = overflow), 슬롯 dict)
+        self._tick = self._to_tick(now) - 1  # 마지막으로 처리한 tick
+
+    def __len__(self):
+        return len(self._where)
+
+    def __contains__(self, key):
+        return key in self._where
+
+    def _to_tick(self, t):
+        return math.floor(t / self.resolution)
+
+    def _tick_time(self, tick):
+        # tick * resolution 이 부동소수점 오차로 이전 tick 으로 내려가면 (예: 43 * 0.1 / 0.1 < 43)
+        # 그 시각의 advance 가 아무것도 하지 않음 → 해당 tick 에 속하는 가장 작은 시각으로 올림
+        t = tick * self.resolution
+        while self._to_tick(t) < tick:
+            t = math.nextafter(t, math.inf)
+        return t
+
+    def deadline(self, key):
+        where = self._where.get(key)
+        if where is None:
+            return None
+        return where[1][key][1]
+
+    def schedule(self, key, deadline, payload=None):
+        self.cancel(key)
+        # deadline 이 속한 tick 이 끝나면 만료 (이미 지난 시각이면 다음 tick)
+        tick = max(self._to_tick(deadline) + 1, self._tick + 1)
+        self._place(key, (tick, deadline, payload))
+
+    def cancel(self, key):
+        """취소했으면 True"""
+        where = self._where.pop(key, None)
+        if where is None:
+            return False
+        level, slot = where
+        del slot[key]
+        if level >= 0:
+            self._counts[level] -= 1
+        return True
+
+    def items(self):
+        """(key, deadline, payload) 전체 (저장 / 디버그용, O(n))"""
+        for key, (_, slot) in self._where.items():
+            _, deadline, payload = slot[key]
+            yield key, deadline, payload
+
+    def _place(self, key, entry):
+        tick = entry[0]
+        delta = tick - self._tick
+        for level, (size, span) in enumerate(zip(self._sizes, self._spans)):
+            if delta < size * span:
+                slot = self._levels[level][(tick // span) % size]
+                self._counts[level] += 1
+                break
+        else:
+            level, slot = -1, self._overflow
+        slot[key] = entry
+        self._where[key] = (level, slot)
+
+    def advance(self, now):
+        """now 까지의 tick 처리 → 만료된 (key, deadline, payload) 목록 (deadline 순)"""
+        target = self._to_tick(now)
+        due = []
+        size0 = self._sizes[0]
+        while self._tick < target:
+            if not self._where:
+                self._tick = target
+                break
+            if not self._counts[0]:
+                # 0단계가 비어 있으면 다음 cascade 직전 tick 으로 건너뜀
+                boundary = (self._tick // size0 + 1) * size0 - 1
+                if boundary > self._tick:
+                    self._tick = min(boundary, target)
+                    continue
+
+            self._tick += 1
+            tick = self._tick
+            if tick % size0 == 0:
+                self._cascade(1, tick)
+
+            slot = self._levels[0][tick % size0]
+            if slot:
+                for key, entry in slot.items():
+                    del self._where[key]
+                    due.append((entry[1], key, entry[2]))
+                self._counts[0] -= len(slot)
+                slot.clear()
+
+        due.sort(key=lambda item: item[0])
+        return [(key, deadline, payload) for deadline, key, payload in due]
+
+    def _cascade(self, level, tick):
+        if level == len(self._sizes):
+            entries = list(self._overflow.items())
+            self._overflow.clear()
+        else:
+            span = self._spans[level]
+            size = self._sizes[level]
+            index = (tick // span) % size
+            if index == 0:
+                self._cascade(level + 1, tick)
+            slot = self._levels[level][index]
+            entries = list(slot.items())
+            self._counts[level] -= len(entries)
+            slot.clear()
+
+        for key, entry in entries:
+            self._place(key, entry)
+
+    def next_tick_time(self):
+        """
+        다음에 advance 가 필요한 시각 (타이머가 없으면 None)
+        - 0단계에 타이머가 있으면 가장 가까운 칸, 없으면 다음 cascade 시각
+        """
+        if not self._where:
+            return None
+        size0 = self._sizes[0]
+        if self._counts[0]:
+            slots = self._levels[0]
+            for step in range(1, size0 + 1):
+                tick = self._tick + step
+                if slots[tick % size0]:
+                    return self._tick_time(tick)
+        return self._tick_time((self._tick // size0 + 1) * size0)
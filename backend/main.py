@@ -1,9 +1,38 @@
+# 실행: backend/ 에서, 공용 점수 계산 모듈 (저장소 루트의 drowsy_common) 을 import 경로에 두고
+#   cd backend && PYTHONPATH=.. uvicorn main:app
+# 워커 여러 개 (uvicorn --workers N) 도 가능: 알람 상태는 ALARM_SESSION_BACKEND=sqlite 로 공유,
+# 알람 타이머는 ESCALATION_DB 의 lease 를 가진 워커 하나가 실행하고 나머지는 standby (core.escalation)
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from api.drowsy import router as drowsy_router
 from api.alarm import router as alarm_router
+from api.stream import router as stream_router
+from api.notify import router as notify_router
+from api.metrics import router as metrics_router
+from core.alarm_logic import register_timers
+from core.escalation import get_scheduler
+from core.metrics import MetricsMiddleware
+from core.notify_logic import get_dispatcher
+from storage.logger import get_store, close_store
+
+
+@asynccontextmanager
+async def lifespan(app):
+    get_store()
+    await get_dispatcher().start()
+    register_timers()
+    # lease 를 얻으면 타이머 실행, 다른 워커가 실행 중이면 standby (예약 / 취소만 공유 DB 에 기록)
+    await get_scheduler().start()
+    yield
+    # 종료 시 남은 타이머 저장, 남은 알림 발송, 버퍼에 남은 이벤트 기록
+    await get_scheduler().stop()
+    await get_dispatcher().stop()
+    close_store()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -12,6 +41,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
 
 @app.get("/")
@@ -19,4 +49,7 @@ def root():
     return {"status": "server running"}
 
 app.include_router(drowsy_router)
-app.include_router(alarm_router)
\ No newline at end of file
+app.include_router(alarm_router)
+app.include_router(stream_router)
+app.include_router(notify_router)
+app.include_router(metrics_router)
\ No newline at end of file
@@ -0,0 +1,412 @@
+import math
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+from core.metrics import STORE_FLUSH_SECONDS
+
+# 롤업 단위 → 버킷 크기(초)
+ROLLUP_SIZES = {"minute": 60, "hour": 3600, "day": 86400}
+STATES = ("NORMAL", "WARNING", "DROWSY")
+# 샘플 간격이 이보다 길면 그 사이는 상태 시간에 넣지 않음 (연결 끊김 등)
+MAX_STATE_GAP = 5.0
+# 기록에 실패한 배치를 다시 시도하는 횟수 (넘으면 버리고 failed 로 집계)
+MAX_WRITE_RETRIES = 5
+# 롤업을 다시 만들 때 한 번에 읽는 이벤트 수
+REBUILD_CHUNK = 50_000
+
+
+class RollupClock:
+    """
+    롤업 버킷 경계 (분/시/일 시작 시각, epoch 초)
+    - 시/일 경계는 tz 의 현지 시각 기준 (서머타임이 있으면 그날은 23/25시간)
+    - 분 단위 결과를 캐시 → 배치 기록 경로에서는 대부분 dict 조회만
+    """
+
+    def __init__(self, tz=timezone.utc):
+        self.tz = tz
+        self._cache = {}
+
+    @property
+    def name(self):
+        return str(self.tz)
+
+    def buckets(self, ts):
+        """ts → {"minute": 시작, "hour": 시작, "day": 시작}"""
+        # 실제 시간대 오프셋은 모두 분 단위라 분 경계는 UTC 와 같음
+        minute = math.floor(ts / 60) * 60
+        cached = self._cache.get(minute)
+        if cached is None:
+            local = datetime.fromtimestamp(minute, self.tz)
+            cached = {
+                "minute": minute,
+                "hour": local.replace(minute=0).timestamp(),
+                "day": local.replace(hour=0, minute=0).timestamp(),
+            }
+            if len(self._cache) >= 4096:
+                self._cache.clear()
+            self._cache[minute] = cached
+        return cached
+
+    def floor(self, ts, granularity):
+        return self.buckets(ts)[granularity]
+
+    def iso(self, ts):
+        return datetime.fromtimestamp(ts, self.tz).isoformat()
+
+
+class BufferFull(Exception):
+    """버퍼가 가득 차서 이벤트를 받을 수 없음 (잠시 후 재시도)"""
+
+
+class EventStore:
+    """
+    졸음 이벤트 write-behind 저장소
+    - put(): 메모리 버퍼에 추가만 하고 바로 반환 (디스크 I/O 없음)
+    - 백그라운드 스레드가 flush_size 개가 모이거나 flush_interval 초가 지나면
+      한 트랜잭션으로 묶어서 SQLite(WAL) 에 기록 (group commit)
+    - 버퍼가 max_buffer 를 넘으면 BufferFull (block_timeout 동안은 자리가 나길 기다림)
+    - 기록 실패 (디스크 가득 참, 잠금 등) 시 배치를 다시 시도 (flush_interval 간격, 최대 MAX_WRITE_RETRIES 번)
+    - close(): 남은 이벤트를 모두 기록하고 종료
+    - 기록할 때 같은 트랜잭션에서 분/시/일 롤업(평균/최대 drowsy_level, 상태별 시간)도 갱신
+      버킷 경계는 clock (RollupClock) 의 시간대 기준, 시간대가 바뀌면 시작할 때 이벤트로 롤업을 다시 만듦
+      상태별 시간의 직전 샘플은 DB 에 기록된 마지막 이벤트 (재시작 / 여러 프로세스에서도 이어짐)
+    - 조회는 스레드별 읽기 전용 연결 사용 (WAL 이라 기록과 동시에 읽기 가능)
+    """
+
+    def __init__(self, path, flush_size=1000, flush_interval=0.5,
+                 max_buffer=100_000, block_timeout=0.0, clock=None):
+        self.path = path
+        self.clock = clock if clock is not None else RollupClock()
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.block_timeout = block_timeout
+
+        self._buffer = []
+        self._cond = threading.Condition()
+        self._closed = False
+        self._flushing = 0  # flusher 가 기록 중인 이벤트 수
+
+        # 통계
+        self.accepted = 0
+        self.flushed = 0
+        self.rejected = 0
+        self.failed = 0  # 재시도 후에도 기록하지 못하고 버린 이벤트 수
+        self.retries = 0
+        self.last_flush_seconds = 0.0
+
+        self._local = threading.local()
+
+        self._conn = self._connect()
+        self._init_schema(self._conn)
+        self._check_rollup_clock(self._conn)
+
+        self._thread = threading.Thread(target=self._run, name="event-store-flusher", daemon=True)
+        self._thread.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # WAL 에서는 NORMAL 이면 커밋마다 fsync 하지 않음 (체크포인트 때만)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _init_schema(self, conn):
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS drowsy_events (
+                id INTEGER PRIMARY KEY,
+                ts REAL NOT NULL,
+                user_id TEXT NOT NULL,
+                state TEXT NOT NULL,
+                drowsy_level REAL NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_drowsy_events_user_ts "
+            "ON drowsy_events (user_id, ts, id)"
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS drowsy_rollups (
+                granularity TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                bucket REAL NOT NULL,
+                count INTEGER NOT NULL,
+                level_sum REAL NOT NULL,
+                level_max REAL NOT NULL,
+                normal_seconds REAL NOT NULL,
+                warning_seconds REAL NOT NULL,
+                drowsy_seconds REAL NOT NULL,
+                PRIMARY KEY (granularity, user_id, bucket)
+            ) WITHOUT ROWID
+            """
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        conn.commit()
+
+    def _check_rollup_clock(self, conn):
+        """롤업이 다른 시간대로 만들어져 있으면 저장된 이벤트로 다시 집계"""
+        row = conn.execute("SELECT value FROM store_meta WHERE key = 'rollup_tz'").fetchone()
+        if row is not None and row[0] == self.clock.name:
+            return
+        has_events = conn.execute("SELECT 1 FROM drowsy_events LIMIT 1").fetchone() is not None
+        with conn:
+            if has_events:
+                print(f"[event_store] 롤업 시간대 {row[0] if row else 'UTC'} → {self.clock.name}, 다시 집계")
+                self._rebuild_rollups(conn)
+            conn.execute(
+                "INSERT OR REPLACE INTO store_meta VALUES ('rollup_tz', ?)", (self.clock.name,)
+            )
+
+    def _rebuild_rollups(self, conn):
+        conn.execute("DELETE FROM drowsy_rollups")
+        last = {}
+        sql = "SELECT user_id, ts, id, state, drowsy_level FROM drowsy_events"
+        order = " ORDER BY user_id, ts, id LIMIT ?"
+        rows = conn.execute(sql + order, (REBUILD_CHUNK,)).fetchall()
+        while rows:
+            # 사용자 / 시간 순서로 (user_id, ts, id) 인덱스를 따라 keyset 페이지
+            after = rows[-1][:3]
+            batch = [(ts, user_id, state, level) for user_id, ts, _, state, level in rows]
+            self._upsert_rollups(conn, self._aggregate(batch, last))
+            rows = conn.execute(
+                sql + " WHERE (user_id, ts, id) > (?, ?, ?)" + order, after + (REBUILD_CHUNK,)
+            ).fetchall()
+
+    @property
+    def buffer_depth(self):
+        return len(self._buffer)
+
+    def put(self, events):
+        """
+        events: (ts, user_id, state, drowsy_level) 튜플 목록 (ts 는 epoch 초)
+        """
+        n = len(events)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("event store is closed")
+
+            if len(self._buffer) + n > self.max_buffer:
+                deadline = time.monotonic() + self.block_timeout
+                while len(self._buffer) + n > self.max_buffer:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or self._closed:
+                        self.rejected += n
+                        raise BufferFull(f"event buffer full ({len(self._buffer)} pending)")
+                    self._cond.notify_all()
+                    self._cond.wait(remaining)
+
+            self._buffer.extend(events)
+            self.accepted += n
+            if len(self._buffer) >= self.flush_size:
+                self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """지금까지 받은 이벤트가 디스크에 기록될 때까지 대기"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._cond.notify_all()
+            while self._buffer or self._flushing:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining if remaining is not None else 0.05)
+                self._cond.notify_all()
+        return True
+
+    def close(self):
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        self._conn.close()
+
+    def _run(self):
+        retry = []  # 기록에 실패해서 다시 시도할 이벤트 (새 이벤트보다 먼저)
+        attempts = 0
+        while True:
+            with self._cond:
+                if retry:
+                    # 재시도는 닫는 중에도 flush_interval 만큼 기다렸다가 (flush() 의 notify 로 앞당기지 않음)
+                    deadline = time.monotonic() + self.flush_interval
+                    remaining = self.flush_interval
+                    while remaining > 0:
+                        self._cond.wait(remaining)
+                        remaining = deadline - time.monotonic()
+                elif not self._closed and len(self._buffer) < self.flush_size:
+                    self._cond.wait(self.flush_interval)
+                batch, self._buffer = retry + self._buffer, []
+                self._flushing = len(batch)
+                closed = self._closed
+                # 버퍼를 비웠으니 대기 중인 put 을 깨움
+                self._cond.notify_all()
+
+            retry = []
+            if batch and not self._write(batch):
+                attempts += 1
+                if attempts > MAX_WRITE_RETRIES:
+                    self.failed += len(batch)
+                    print(f"[event_store] {len(batch)}개 기록 실패, {MAX_WRITE_RETRIES}번 재시도 후 버림")
+                    attempts = 0
+                else:
+                    self.retries += 1
+                    retry = batch
+            elif batch:
+                attempts = 0
+
+            with self._cond:
+                # 재시도할 이벤트가 남아 있으면 flush() 는 계속 대기
+                self._flushing = len(retry)
+                self._cond.notify_all()
+
+            if closed and not self._buffer and not retry:
+                return
+
+    def _write(self, batch):
+        """배치 하나를 한 트랜잭션으로 기록, 성공하면 True"""
+        started = time.perf_counter()
+        try:
+            with self._conn:
+                self._write_batch(self._conn, batch)
+            self.flushed += len(batch)
+            ok = True
+        except sqlite3.Error as e:
+            print(f"[event_store] {len(batch)}개 기록 실패: {e}")
+            ok = False
+        self.last_flush_seconds = time.perf_counter() - started
+        STORE_FLUSH_SECONDS.observe(self.last_flush_seconds)
+        return ok
+
+    def _write_batch(self, conn, batch):
+        # 마지막 이벤트 조회 ~ 기록 사이에 다른 프로세스가 끼어들지 않게 처음부터 쓰기 잠금
+        conn.execute("BEGIN IMMEDIATE")
+        last = {}
+        for user_id in {event[1] for event in batch}:
+            row = conn.execute(
+                "SELECT ts, state FROM drowsy_events WHERE user_id = ? "
+                "ORDER BY ts DESC, id DESC LIMIT 1",
+                (user_id,),
+            ).fetchone()
+            if row is not None:
+                last[user_id] = row
+        rollups = self._aggregate(batch, last)
+
+        conn.executemany(
+            "INSERT INTO drowsy_events (ts, user_id, state, drowsy_level) VALUES (?, ?, ?, ?)",
+            batch,
+        )
+        self._upsert_rollups(conn, rollups)
+
+    def _upsert_rollups(self, conn, rollups):
+        conn.executemany(
+            """
+            INSERT INTO drowsy_rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (granularity, user_id, bucket) DO UPDATE SET
+                count = count + excluded.count,
+                level_sum = level_sum + excluded.level_sum,
+                level_max = max(level_max, excluded.level_max),
+                normal_seconds = normal_seconds + excluded.normal_seconds,
+                warning_seconds = warning_seconds + excluded.warning_seconds,
+                drowsy_seconds = drowsy_seconds + excluded.drowsy_seconds
+            """,
+            rollups,
+        )
+
+    def _aggregate(self, batch, last):
+        """
+        배치를 (단위, 사용자, 버킷) 별로 미리 합쳐서 롤업 upsert 행으로
+        - last: 사용자별 직전 (ts, state) (배치 순서대로 갱신됨)
+        """
+        acc = {}
+        buckets = self.clock.buckets
+        for ts, user_id, state, level in batch:
+            # 직전 샘플의 상태가 지금까지 유지됐다고 보고 그 시간을 더함
+            seconds = [0.0, 0.0, 0.0]
+            prev = last.get(user_id)
+            if prev is not None and prev[1] in STATES:
+                gap = ts - prev[0]
+                if 0 < gap <= MAX_STATE_GAP:
+                    seconds[STATES.index(prev[1])] = gap
+            if prev is None or ts >= prev[0]:
+                last[user_id] = (ts, state)
+
+            for name, bucket in buckets(ts).items():
+                key = (name, user_id, bucket)
+                row = acc.get(key)
+                if row is None:
+                    acc[key] = [1, level, level, seconds[0], seconds[1], seconds[2]]
+                else:
+                    row[0] += 1
+                    row[1] += level
+                    row[2] = max(row[2], level)
+                    row[3] += seconds[0]
+                    row[4] += seconds[1]
+                    row[5] += seconds[2]
+
+        return [key + tuple(row) for key, row in acc.items()]
+
+    # ===== 조회 =====
+
+    def _reader(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA query_only=ON")
+            self._local.conn = conn
+        return conn
+
+    def query_events(self, user_id, start=None, end=None, after=None, limit=100):
+        """
+        사용자 이벤트를 (ts, id) 순서로 조회 (idx_drowsy_events_user_ts 인덱스 사용)
+        - start <= ts < end
+        - after: 이전 페이지 마지막 (ts, id) → 그 다음부터 (cursor 페이지네이션)
+        - 반환: (id, ts, user_id, state, drowsy_level) 튜플 목록
+        """
+        sql = "SELECT id, ts, user_id, state, drowsy_level FROM drowsy_events WHERE user_id = ?"
+        params = [user_id]
+        if start is not None:
+            sql += " AND ts >= ?"
+            params.append(start)
+        if end is not None:
+            sql += " AND ts < ?"
+            params.append(end)
+        if after is not None:
+            sql += " AND (ts, id) > (?, ?)"
+            params.extend(after)
+        sql += " ORDER BY ts, id LIMIT ?"
+        params.append(limit)
+
+        return self._reader().execute(sql, params).fetchall()
+
+    def query_rollups(self, user_id, granularity, start=None, end=None):
+        """
+        미리 집계된 롤업 조회
+        - 반환: (bucket, count, level_sum, level_max, normal_s, warning_s, drowsy_s) 목록
+        """
+        if granularity not in ROLLUP_SIZES:
+            raise ValueError(f"unknown granularity: {granularity}")
+
+        sql = (
+            "SELECT bucket, count, level_sum, level_max, "
+            "normal_seconds, warning_seconds, drowsy_seconds "
+            "FROM drowsy_rollups WHERE granularity = ? AND user_id = ?"
+        )
+        params = [granularity, user_id]
+        if start is not None:
+            # start 가 버킷 중간이면 그 버킷도 포함
+            sql += " AND bucket >= ?"
+            params.append(self.clock.floor(start, granularity))
+        if end is not None:
+            sql += " AND bucket < ?"
+            params.append(end)
+        sql += " ORDER BY bucket"
+
+        return self._reader().execute(sql, params).fetchall()
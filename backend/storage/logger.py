@@ -0,0 +1,112 @@
+import atexit
+import os
+import threading
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from storage.event_store import EventStore, RollupClock
+
+DB_PATH = os.environ.get(
+    "DROWSY_DB_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "events.db"),
+)
+
+# write-behind 설정
+FLUSH_SIZE = 1000  # 이만큼 모이면 바로 기록
+FLUSH_INTERVAL = 0.5  # 초, 덜 모여도 이 주기로 기록
+MAX_BUFFER = 100_000  # 메모리 버퍼 상한 (넘으면 BufferFull)
+
+# 시/일 롤업 경계와 조회 응답 시각의 시간대 (IANA 이름, 예: Asia/Seoul)
+# 비우면 서버의 현재 UTC 오프셋 (서머타임이 있는 지역은 이름으로 지정해야 경계가 맞음)
+TIMEZONE = os.environ.get("DROWSY_TZ", "")
+
+
+def _timezone(name):
+    return ZoneInfo(name) if name else datetime.now().astimezone().tzinfo
+
+
+clock = RollupClock(_timezone(TIMEZONE))
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """기본 EventStore (처음 호출할 때 생성)"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = EventStore(
+                    DB_PATH,
+                    flush_size=FLUSH_SIZE,
+                    flush_interval=FLUSH_INTERVAL,
+                    max_buffer=MAX_BUFFER,
+                    clock=clock,
+                )
+    return _store
+
+
+def current_store():
+    """이미 만들어진 EventStore (없으면 None, 새로 만들지 않음 - metric 수집용)"""
+    return _store
+
+
+def close_store():
+    """남은 이벤트를 모두 기록하고 저장소 종료 (서버 종료 시)"""
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+            _store = None
+
+
+atexit.register(close_store)
+
+
+def _to_epoch(timestamp):
+    """ISO 문자열 또는 epoch 초 (숫자 / 숫자 문자열) → epoch 초"""
+    if isinstance(timestamp, str):
+        try:
+            return float(timestamp)
+        except ValueError:
+            return datetime.fromisoformat(timestamp).timestamp()
+    return float(timestamp)
+
+
+def log_drowsy_events(events):
+    """
+    졸음 이벤트 여러 개를 버퍼에 추가 (디스크 기록은 백그라운드)
+    - events: (timestamp, user_id, state, drowsy_level) 튜플 목록, timestamp 는 epoch 초
+    - 버퍼가 가득 차면 BufferFull
+    """
+    get_store().put(events)
+
+
+def log_drowsy_event(timestamp, drowsy_level, state, user_id="default_user"):
+    """졸음 이벤트 한 개 저장 (timestamp: ISO 문자열 또는 epoch 초)"""
+    log_drowsy_events([(_to_epoch(timestamp), user_id, state, drowsy_level)])
+
+
+def query_drowsy_logs(user_id, start=None, end=None, after=None, limit=100):
+    """
+    사용자 이벤트 조회 (start / end: ISO 문자열 또는 epoch 초, after: 이전 페이지 마지막 (ts, id))
+    - 아직 버퍼에 있는 (디스크에 기록되기 전) 이벤트는 보이지 않음
+    """
+    return get_store().query_events(
+        user_id,
+        start=None if start is None else _to_epoch(start),
+        end=None if end is None else _to_epoch(end),
+        after=after,
+        limit=limit,
+    )
+
+
+def query_drowsy_rollups(user_id, granularity="hour", start=None, end=None):
+    """분/시/일 롤업 조회 (granularity: minute / hour / day)"""
+    return get_store().query_rollups(
+        user_id,
+        granularity,
+        start=None if start is None else _to_epoch(start),
+        end=None if end is None else _to_epoch(end),
+    )
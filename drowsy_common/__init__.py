@@ -0,0 +1,9 @@
+"""
+클라이언트 (my_frontend) 와 서버 (backend) 가 함께 쓰는 졸음 점수 계산 모듈
+- scoring: 점수 계산 상수 / 윈도우 설정
+- window_stats: 링버퍼 시간 윈도우 (DrowsinessDetector)
+- detector_bank: 여러 세션의 detector 상태를 배열로 (multi_face, 서버 ScoringEngine)
+- bench_gate: 벤치마크 결과 비교 (backend/bench.py, my_frontend/algorithm/bench.py)
+
+저장소 루트가 import 경로에 있어야 함 (프론트엔드는 루트에서 실행, 백엔드는 PYTHONPATH=..)
+"""
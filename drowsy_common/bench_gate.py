@@ -0,0 +1,32 @@
+"""
+벤치마크 결과 비교 (backend/bench.py, my_frontend/algorithm/bench.py 공용)
+"""
+
+# 키 접미사 → 클수록 좋은 값 / 작을수록 좋은 값
+HIGHER_IS_BETTER = ("_fps", "_rps")
+LOWER_IS_BETTER = ("_us", "_ms", "_per_session")
+
+
+def compare(results, baseline, tolerance):
+    """baseline 대비 tolerance 이상 나빠진 항목 목록 [(key, base, value)]"""
+    regressions = []
+    for key, base in baseline.items():
+        value = results.get(key)
+        if value is None or not base:
+            continue
+        if key.endswith(HIGHER_IS_BETTER):
+            worse = value < base * (1 - tolerance)
+        elif key.endswith(LOWER_IS_BETTER):
+            worse = value > base * (1 + tolerance)
+        else:
+            continue
+        if worse:
+            regressions.append((key, base, value))
+    return regressions
+
+
+def report(regressions):
+    """비교 결과 출력 → 종료 코드 (나빠진 항목이 있으면 1)"""
+    for key, base, value in regressions:
+        print(f"REGRESSION {key}: {base:.2f} → {value:.2f}")
+    return 1 if regressions else 0
@@ -0,0 +1,313 @@
+import math
+import time
+
+import numpy as np
+
+from drowsy_common.scoring import (
+    PERCLOS_LIMIT,
+    PITCH_OFFSET,
+    PITCH_RANGE,
+    EAR_WEIGHT,
+    PERCLOS_WEIGHT,
+    BLINK_WEIGHT,
+    HEAD_WEIGHT,
+    WARNING_SCORE,
+    DROWSY_SCORE,
+    BLINK_WINDOW,
+    EAR_BASELINE_WINDOW,
+    PERCLOS_WINDOW,
+    BASELINE_TIME,
+    EAR_MIN_SAMPLES,
+    MAX_FPS,
+)
+from drowsy_common.window_stats import RESYNC_POPS
+
+STATES = np.array(["NORMAL", "WARNING", "DROWSY"])
+
+
+class _RingBank:
+    """
+    세션(행)마다 하나씩 있는 window_stats.TimeWindow 를 (세션, 용량) 배열로 묶은 것
+    - 합계 누적 / 재계산 시점이 TimeWindow 와 같아서 결과가 비트 단위로 일치
+    - 어떤 행이든 윈도우 안의 항목으로 가득 차면 모든 행의 용량을 두 배로 늘림
+    - bounded 면 늘리지 않고 그 행의 가장 오래된 항목을 밀어냄 (행마다 최근 capacity 개만)
+    """
+
+    def __init__(self, rows, window, capacity, dtype=np.float64, bounded=False):
+        self.window = window
+        self.capacity = capacity
+        self.bounded = bounded
+
+        self.ts = np.zeros((rows, capacity))
+        self.values = np.zeros((rows, capacity), dtype=dtype)
+        self.head = np.zeros(rows, dtype=np.int64)
+        self.size = np.zeros(rows, dtype=np.int64)
+        self.pops = np.zeros(rows, dtype=np.int64)
+        self.sum = np.zeros(rows)
+
+    def grow(self, rows):
+        extra = rows - len(self.head)
+        self.ts = np.concatenate([self.ts, np.zeros((extra, self.capacity))])
+        self.values = np.concatenate([self.values, np.zeros((extra, self.capacity), dtype=self.values.dtype)])
+        self.head = np.concatenate([self.head, np.zeros(extra, dtype=np.int64)])
+        self.size = np.concatenate([self.size, np.zeros(extra, dtype=np.int64)])
+        self.pops = np.concatenate([self.pops, np.zeros(extra, dtype=np.int64)])
+        self.sum = np.concatenate([self.sum, np.zeros(extra)])
+
+    def reset(self, row):
+        self.head[row] = 0
+        self.size[row] = 0
+        self.pops[row] = 0
+        self.sum[row] = 0.0
+
+    def push(self, rows, timestamps, values):
+        full = self.size[rows] == self.capacity
+        if full.any():
+            stale = full & (timestamps - self.ts[rows, self.head[rows]] > self.window)
+            if stale.any():
+                self._pop(rows[stale])
+            crowded = full & ~stale
+            if crowded.any():
+                if self.bounded:
+                    self._pop(rows[crowded])
+                else:
+                    self._widen()
+
+        tail = (self.head[rows] + self.size[rows]) % self.capacity
+        self.ts[rows, tail] = timestamps
+        self.values[rows, tail] = values
+        self.size[rows] += 1
+        self.sum[rows] += values
+
+    def expire(self, rows, now):
+        # 한 틱에 보통 0~1개만 만료되므로 몇 번 안 돈다
+        while rows.size:
+            old = (self.size[rows] > 0) & (now - self.ts[rows, self.head[rows]] > self.window)
+            if not old.any():
+                break
+            rows, now = rows[old], now[old]
+            self._pop(rows)
+
+    def _pop(self, rows):
+        head = self.head[rows]
+        self.sum[rows] -= self.values[rows, head]
+        self.head[rows] = (head + 1) % self.capacity
+        self.size[rows] -= 1
+
+        self.pops[rows] += 1
+        empty = self.size[rows] == 0
+        if empty.any():
+            self.sum[rows[empty]] = 0.0
+            self.pops[rows[empty]] = 0
+        resync = ~empty & (self.pops[rows] >= RESYNC_POPS)
+        for row in rows[resync]:
+            self.pops[row] = 0
+            self._resync(row)
+
+    def _resync(self, row):
+        index = (self.head[row] + np.arange(self.size[row])) % self.capacity
+        self.sum[row] = math.fsum(self.values[row, index].tolist())
+
+    def _widen(self):
+        # 행마다 순서대로 펼친 뒤 뒤쪽에 빈 공간 추가 (head = 0)
+        order = (self.head[:, None] + np.arange(self.capacity)) % self.capacity
+        self.ts = np.concatenate(
+            [np.take_along_axis(self.ts, order, axis=1), np.zeros_like(self.ts)], axis=1
+        )
+        self.values = np.concatenate(
+            [np.take_along_axis(self.values, order, axis=1), np.zeros_like(self.values)], axis=1
+        )
+        self.head[:] = 0
+        self.capacity *= 2
+
+
+class DrowsinessDetectorBank:
+    """
+    여러 세션의 DrowsinessDetector 상태를 NumPy 배열(struct-of-arrays)로 보관
+    - update_batch() 한 번에 모든 세션의 score / 상태를 벡터 연산으로 계산
+    - 결과는 세션별 DrowsinessDetector.update 와 수치적으로 동일
+    - bounded: 세션별 링버퍼를 늘리지 않음 (서버용, 입력이 max_fps 보다 빠르면 윈도우 안의 오래된 항목부터 버림)
+      한 세션이 timestamp 를 몰아서 보내도 전체 bank 용량이 두 배가 되지 않음
+      → 세션당 메모리가 고정 (max_fps=60 이면 약 106KB), 대신 그 세션은 detector 와 결과가 달라질 수 있음
+    """
+
+    def __init__(self, capacity=64, max_fps=MAX_FPS, bounded=False):
+        self._slots = {}  # session_id → 행 번호
+        self._free = []
+        self._used = 0
+        self._capacity = capacity
+
+        # 세션당 메모리 대부분이 링버퍼라 값 타입/용량을 최소로
+        # - blink: 눈을 떴다 감아야 1회이므로 프레임 수의 절반이면 충분, 값은 항상 1
+        # - perclos: 값이 0/1 뿐이라 uint8
+        self.blink_times = _RingBank(
+            capacity, BLINK_WINDOW, int(BLINK_WINDOW * max_fps) // 2 + 1, np.uint8, bounded
+        )
+        self.perclos_window = _RingBank(
+            capacity, PERCLOS_WINDOW, int(PERCLOS_WINDOW * max_fps) + 1, np.uint8, bounded
+        )
+        self.ear_history = _RingBank(
+            capacity, EAR_BASELINE_WINDOW, int(EAR_BASELINE_WINDOW * max_fps) + 1, bounded=bounded
+        )
+
+        self.total_frames = np.zeros(capacity, dtype=np.int64)
+        self.eye_closed_frames = np.zeros(capacity, dtype=np.int64)
+        self.last_closed = np.zeros(capacity, dtype=bool)
+        self.avg_ear = np.full(capacity, np.nan)  # NaN = 아직 없음 (None)
+
+        self.baseline_blinks = np.zeros(capacity, dtype=np.int64)
+        self.baseline_start = np.zeros(capacity)
+        self.baseline_blink_rate = np.zeros(capacity)  # 0 = 아직 없음 (None)
+
+    def __len__(self):
+        return len(self._slots)
+
+    def __contains__(self, session_id):
+        return session_id in self._slots
+
+    def add_session(self, session_id, start_time=None):
+        """세션 등록 (DrowsinessDetector() 생성과 같음)"""
+        if session_id in self._slots:
+            return self._slots[session_id]
+
+        if self._free:
+            row = self._free.pop()
+        else:
+            if self._used == self._capacity:
+                self._grow(self._capacity * 2)
+            row = self._used
+            self._used += 1
+
+        for ring in (self.blink_times, self.perclos_window, self.ear_history):
+            ring.reset(row)
+
+        self.total_frames[row] = 0
+        self.eye_closed_frames[row] = 0
+        self.last_closed[row] = False
+        self.avg_ear[row] = np.nan
+        self.baseline_blinks[row] = 0
+        self.baseline_start[row] = time.time() if start_time is None else start_time
+        self.baseline_blink_rate[row] = 0
+
+        self._slots[session_id] = row
+        return row
+
+    def remove_session(self, session_id):
+        row = self._slots.pop(session_id, None)
+        if row is not None:
+            self._free.append(row)
+
+    def update_batch(self, session_ids, ears, eye_states, pitches, timestamps):
+        """
+        세션별 한 프레임씩 받아 한 번에 점수 계산
+        - session_ids: 한 배치 안에서 중복 불가 (처음 보는 세션은 자동 등록)
+        - ears: None / NaN 은 얼굴 없음 (EAR 미사용)
+        - eye_states: "OPEN"/"CLOSED" 문자열 또는 감음 여부 bool 배열
+        - 반환: DrowsinessDetector.update 와 같은 키의 배열 dict
+        """
+        slots = self._slots
+        rows = np.fromiter(
+            (slots[s] if s in slots else self.add_session(s) for s in session_ids),
+            dtype=np.int64,
+        )
+        if np.unique(rows).size != rows.size:
+            raise ValueError("session_ids must be unique within a batch")
+
+        ear = np.array(ears, dtype=np.float64)
+        closed = np.asarray(eye_states)
+        if closed.dtype != bool:
+            closed = closed == "CLOSED"
+        pitch = np.asarray(pitches, dtype=np.float64)
+        ts = np.asarray(timestamps, dtype=np.float64)
+
+        self.total_frames[rows] += 1
+
+        # ===== Eye closed / Blink =====
+        self.eye_closed_frames[rows] += closed
+        pending = self.baseline_blink_rate[rows] == 0
+        blink = ~closed & self.last_closed[rows]
+        if blink.any():
+            self.blink_times.push(rows[blink], ts[blink], 1.0)
+            self.baseline_blinks[rows[blink & pending]] += 1
+        self.last_closed[rows] = closed
+
+        self.blink_times.expire(rows, ts)
+        blink_count = self.blink_times.size[rows]
+
+        # ===== Baseline blink =====
+        ready = pending & (ts - self.baseline_start[rows] >= BASELINE_TIME)
+        if ready.any():
+            self.baseline_blink_rate[rows[ready]] = np.maximum(1, self.baseline_blinks[rows[ready]])
+
+        # ===== Blink 감소율 =====
+        rate = self.baseline_blink_rate[rows]
+        has_rate = rate > 0
+        safe_rate = np.where(has_rate, rate, 1.0)
+        blink_drop = np.where(has_rate, np.clip((safe_rate - blink_count) / safe_rate, 0, 1), 0.0)
+
+        # ===== PERCLOS (윈도우) =====
+        self.perclos_window.push(rows, ts, closed)
+        self.perclos_window.expire(rows, ts)
+        perclos = self.perclos_window.sum[rows] / np.maximum(1, self.perclos_window.size[rows])
+        perclos_score = np.clip(perclos / PERCLOS_LIMIT, 0, 1)
+
+        # ===== EAR baseline =====
+        valid = ~np.isnan(ear)
+        self.ear_history.push(rows[valid], ts[valid], ear[valid])
+        self.ear_history.expire(rows, ts)
+
+        enough = self.ear_history.size[rows] >= EAR_MIN_SAMPLES
+        if enough.any():
+            r = rows[enough]
+            self.avg_ear[r] = self.ear_history.sum[r] / self.ear_history.size[r]
+
+        avg_ear = self.avg_ear[rows]
+        # `if self.avg_ear and ear` 와 같은 조건 (None / 0 제외)
+        has_ear = ~np.isnan(avg_ear) & (avg_ear != 0) & valid & (ear != 0)
+        safe_avg = np.where(has_ear, avg_ear, 1.0)
+        ear_score = np.where(has_ear, np.clip((safe_avg - ear) / safe_avg, 0, 1), 0.0)
+
+        # ===== Head pitch =====
+        head_score = np.clip((np.abs(pitch) - PITCH_OFFSET) / PITCH_RANGE, 0, 1)
+
+        # ===== 최종 score (4요소 전부) =====
+        score = (
+            EAR_WEIGHT * ear_score +
+            PERCLOS_WEIGHT * perclos_score +
+            BLINK_WEIGHT * blink_drop +
+            HEAD_WEIGHT * head_score
+        )
+
+        # ===== 상태 =====
+        state = STATES[np.where(score < WARNING_SCORE, 0, np.where(score < DROWSY_SCORE, 1, 2))]
+
+        return {
+            "state": state,
+            "score": score,
+            "ear": ear,
+            "avg_ear": avg_ear,
+            "perclos": perclos,
+            "blink_count": blink_count,
+            "blink_drop": blink_drop,
+            "pitch": pitch,
+            "ear_score": ear_score,
+            "perclos_score": perclos_score,
+            "blink_score": blink_drop,
+            "head_score": head_score,
+        }
+
+    def _grow(self, capacity):
+        for ring in (self.blink_times, self.perclos_window, self.ear_history):
+            ring.grow(capacity)
+
+        def extend(arr, fill):
+            return np.concatenate([arr, np.full(capacity - len(arr), fill, dtype=arr.dtype)])
+
+        self.total_frames = extend(self.total_frames, 0)
+        self.eye_closed_frames = extend(self.eye_closed_frames, 0)
+        self.last_closed = extend(self.last_closed, False)
+        self.avg_ear = extend(self.avg_ear, np.nan)
+        self.baseline_blinks = extend(self.baseline_blinks, 0)
+        self.baseline_start = extend(self.baseline_start, 0.0)
+        self.baseline_blink_rate = extend(self.baseline_blink_rate, 0.0)
+        self._capacity = capacity
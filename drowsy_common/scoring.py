@@ -0,0 +1,20 @@
+# 점수 계산 상수 (DrowsinessDetector / DrowsinessDetectorBank 공용 → 클라이언트와 서버 점수가 같음)
+PERCLOS_LIMIT = 0.4  # 이 비율이면 perclos_score = 1
+PITCH_OFFSET = 15.0  # 이 각도까지는 head_score = 0
+PITCH_RANGE = 15.0
+
+EAR_WEIGHT = 0.40
+PERCLOS_WEIGHT = 0.25
+BLINK_WEIGHT = 0.15
+HEAD_WEIGHT = 0.20
+
+WARNING_SCORE = 0.4
+DROWSY_SCORE = 0.7
+
+# ===== 윈도우 설정 (DrowsinessDetector 클래스 속성) =====
+BLINK_WINDOW = 60  # seconds
+EAR_BASELINE_WINDOW = 60  # seconds
+PERCLOS_WINDOW = 60  # seconds
+BASELINE_TIME = 60
+EAR_MIN_SAMPLES = 30  # avg_ear 갱신에 필요한 최소 샘플 수
+MAX_FPS = 60  # 링버퍼 용량 산정용 최대 입력 속도
@@ -0,0 +1,103 @@
+import math
+from array import array
+
+# 이만큼 항목을 밀어낼 때마다 누적 합계를 다시 계산 (뺄셈 반올림 오차가 쌓이지 않게)
+RESYNC_POPS = 4096
+
+
+class TimeWindow:
+    """
+    링버퍼 기반 시간 윈도우 통계 (timestamp, value)
+    - push / expire 는 항목당 상수 시간 (용량이 찰 때만 두 배로 늘림)
+    - 합계를 누적 관리하므로 sum / mean / count 조회가 O(1)
+      비면 0 으로, RESYNC_POPS 번 밀어낼 때마다 남은 항목으로 다시 계산
+    - 초기 용량은 window * max_rate, 입력이 그보다 빠르면 윈도우 안의 항목은 버리지 않고 용량을 늘림
+    """
+
+    def __init__(self, window, max_rate=60):
+        self.window = window
+        self.capacity = int(window * max_rate) + 1
+
+        self._ts = array("d", bytes(8 * self.capacity))
+        self._values = array("d", bytes(8 * self.capacity))
+        self._head = 0  # 가장 오래된 항목 위치
+        self._size = 0
+        self._pops = 0  # 마지막 재계산 이후 밀어낸 항목 수
+
+        self.sum = 0.0
+
+    def __len__(self):
+        return self._size
+
+    def push(self, timestamp, value=1.0):
+        if self._size == self.capacity:
+            if timestamp - self._ts[self._head] > self.window:
+                self._pop()
+            else:
+                self._grow()
+
+        tail = self._head + self._size
+        if tail >= self.capacity:
+            tail -= self.capacity
+
+        self._ts[tail] = timestamp
+        self._values[tail] = value
+        self._size += 1
+        self.sum += value
+
+    def expire(self, now):
+        """now 기준 window 를 벗어난 항목 제거"""
+        while self._size and now - self._ts[self._head] > self.window:
+            self._pop()
+
+    def mean(self):
+        if not self._size:
+            return None
+        return self.sum / self._size
+
+    def clear(self):
+        self._head = 0
+        self._size = 0
+        self._pops = 0
+        self.sum = 0.0
+
+    def _pop(self):
+        self.sum -= self._values[self._head]
+        self._head += 1
+        if self._head == self.capacity:
+            self._head = 0
+        self._size -= 1
+
+        self._pops += 1
+        if not self._size:
+            self.sum = 0.0
+            self._pops = 0
+        elif self._pops >= RESYNC_POPS:
+            self._pops = 0
+            self._resync()
+
+    def _resync(self):
+        # fsum 은 순서와 상관없이 정확한 합 → DrowsinessDetectorBank 와 같은 값
+        values = self._values
+        end = self._head + self._size
+        if end <= self.capacity:
+            self.sum = math.fsum(values[self._head:end])
+        else:
+            self.sum = math.fsum(values[self._head:] + values[:end - self.capacity])
+
+    def _grow(self):
+        # 순서대로 펼친 뒤 뒤쪽에 빈 공간 추가 (head = 0)
+        empty = array("d", bytes(8 * self.capacity))
+        self._ts = self._ts[self._head:] + self._ts[:self._head] + empty
+        self._values = self._values[self._head:] + self._values[:self._head] + empty
+        self._head = 0
+        self.capacity *= 2
+
+
+class WindowedPerclos(TimeWindow):
+    """최근 window 초 동안 눈 감은 프레임 비율 (PERCLOS)"""
+
+    def update(self, timestamp, closed):
+        self.push(timestamp, 1.0 if closed else 0.0)
+        self.expire(timestamp)
+        return self.sum / max(1, self._size)
@@ -5,13 +5,21 @@ from kivy.clock import Clock
 from kivy.graphics import Color, RoundedRectangle
 from kivy.metrics import dp
 from datetime import datetime
+import math
+import time
+
+from App_sleep.utils.ui_updates import set_if_changed
 
 PRIMARY = (0.1, 0.4, 0.9, 1)
 GRAY = (0.4, 0.4, 0.4, 1)
 RED = (0.9, 0.2, 0.2, 1)
 
 class NapTimerButton(BoxLayout):
-    """하루 30분 제한 낮잠 타이머"""
+    """
+    하루 30분 제한 낮잠 타이머
+    - 남은 시간은 monotonic 마감 시각 기준으로 계산 (UI 가 밀려도 오차가 쌓이지 않음)
+    - 표시는 초가 바뀌는 시점에만 갱신
+    """
 
     def __init__(self, event_logger=None, **kwargs):
         super().__init__(**kwargs)
@@ -26,6 +34,7 @@ class NapTimerButton(BoxLayout):
         self.selected_minutes = 10
         self.remaining_seconds = 0
         self.timer_active = False
+        self.deadline = None  # time.monotonic() 기준 종료 시각
         self.timer_event = None
         self.alert_event = None
 
@@ -87,7 +96,7 @@ class NapTimerButton(BoxLayout):
 
         remain = max(0, self.max_daily_seconds - self.used_today)
         m, s = divmod(remain, 60)
-        self.remaining_label.text = f"오늘 남은 시간: {m}분 {s:02d}초"
+        set_if_changed(self.remaining_label, "text", f"오늘 남은 시간: {m}분 {s:02d}초")
 
     def toggle(self, *args):
         if self.timer_active:
@@ -107,26 +116,36 @@ class NapTimerButton(BoxLayout):
         self.btn.background_color = RED
         self.status_label.text = ""
 
-        self.timer_event = Clock.schedule_interval(self.tick, 1)
+        self.deadline = time.monotonic() + self.remaining_seconds
+        self.timer_event = Clock.schedule_once(self.tick, 1)
 
     def stop(self):
         if self.timer_event:
             self.timer_event.cancel()
+        if self.deadline is not None:
+            self.remaining_seconds = max(0, math.ceil(self.deadline - time.monotonic()))
+            self.deadline = None
         self.timer_active = False
         self.btn.text = "시작"
         self.btn.background_color = PRIMARY
 
     def tick(self, dt):
-        self.remaining_seconds -= 1
+        left = self.deadline - time.monotonic()
+        self.remaining_seconds = max(0, math.ceil(left))
         m, s = divmod(self.remaining_seconds, 60)
-        self.time_label.text = f"{m:02d}:{s:02d}"
+        set_if_changed(self.time_label, "text", f"{m:02d}:{s:02d}")
 
-        if self.remaining_seconds <= 0:
+        if left <= 0:
             self.finish()
+            return
+
+        # 다음 초 경계(표시가 바뀌는 시점)에 맞춰 다시 예약
+        self.timer_event = Clock.schedule_once(self.tick, left - (self.remaining_seconds - 1))
 
     def finish(self):
         if self.timer_event:
             self.timer_event.cancel()
+        self.deadline = None
 
         self.used_today += self.selected_minutes * 60
         self.timer_active = False
@@ -3,13 +3,24 @@ from kivy.uix.label import Label
 from kivy.uix.progressbar import ProgressBar
 from kivy.graphics import Color, RoundedRectangle
 from kivy.metrics import dp
+from kivy.clock import Clock
 from datetime import datetime
 
+from App_sleep.styles.theme import hex_to_rgb, hex_to_rgba
+from App_sleep.utils.ui_updates import set_if_changed
+
 class SleepStatusDisplay(BoxLayout):
-    """졸음 상태 표시 컴포넌트"""
+    """
+    졸음 상태 표시 컴포넌트
+    - update_status 는 매 카메라 프레임마다 불러도 됨: 값만 저장해 두고
+      다음 화면 프레임에 한 번만 반영 (바뀐 속성만 대입)
+    - update_interval(초): 저사양 기기에서 반영 주기를 더 늘려 감지 쪽에 CPU 양보 (0 = 매 프레임)
+    """
     
-    def __init__(self, **kwargs):
+    def __init__(self, update_interval=0, **kwargs):
         super().__init__(**kwargs)
+        self._pending = None  # 아직 화면에 반영하지 않은 (score, status_info)
+        self._apply_trigger = Clock.create_trigger(self._apply_pending, update_interval)
         self.orientation = 'vertical'
         self.padding = dp(16)
         self.spacing = dp(12)
@@ -77,19 +88,25 @@ class SleepStatusDisplay(BoxLayout):
         self.bg_rect.size = self.size
     
     def update_status(self, drowsiness_score: int, status_info: dict):
-        """졸음 상태 업데이트"""
-        self.emoji_label.text = status_info['emoji']
-        self.status_label.text = status_info['label']
-        self.progress_bar.value = drowsiness_score
-        self.score_label.text = f"{drowsiness_score}%"
+        """졸음 상태 업데이트 (한 프레임 안의 여러 호출은 마지막 값만 반영)"""
+        self._pending = (drowsiness_score, status_info)
+        self._apply_trigger()
+
+    def _apply_pending(self, dt):
+        pending, self._pending = self._pending, None
+        if pending is None:
+            return
+        drowsiness_score, status_info = pending
+
+        set_if_changed(self.emoji_label, 'text', status_info['emoji'])
+        set_if_changed(self.status_label, 'text', status_info['label'])
+        set_if_changed(self.progress_bar, 'value', drowsiness_score)
+        set_if_changed(self.score_label, 'text', f"{drowsiness_score}%")
         
-        # 색상 업데이트
-        color = status_info['color']
-        rgb = self.hex_to_rgb(color)
-        self.status_label.color = rgb + (1,)
+        # 색상 업데이트 (파싱 결과는 캐시)
+        set_if_changed(self.status_label, 'color', list(hex_to_rgba(status_info['color'])))
     
     @staticmethod
     def hex_to_rgb(hex_color: str) -> tuple:
         """헥스 색상을 RGB로 변환"""
-        hex_color = hex_color.lstrip('#')
-        return tuple(int(hex_color[i:i+2], 16) / 255.0 for i in (0, 2, 4))
\ No newline at end of file
+        return hex_to_rgb(hex_color)
\ No newline at end of file
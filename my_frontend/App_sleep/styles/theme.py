@@ -1,4 +1,6 @@
 # 앱 전체 테마 및 공통 스타일
+from functools import lru_cache
+
 theme = {
     'colors': {
         'primary': '#2196F3',
@@ -40,8 +42,20 @@ theme = {
     },
 }
 
-# 색상 헥스코드를 RGB 튜플로 변환
+# 색상 헥스코드를 RGB 튜플로 변환 (같은 색은 한 번만 파싱)
+@lru_cache(maxsize=256)
 def hex_to_rgb(hex_color: str) -> tuple:
     """#RRGGBB 형식을 (R, G, B) 튜플로 변환"""
     hex_color = hex_color.lstrip('#')
-    return tuple(int(hex_color[i:i+2], 16) / 255.0 for i in (0, 2, 4))
\ No newline at end of file
+    return tuple(int(hex_color[i:i+2], 16) / 255.0 for i in (0, 2, 4))
+
+
+@lru_cache(maxsize=256)
+def hex_to_rgba(hex_color: str, alpha: float = 1.0) -> tuple:
+    """#RRGGBB → Kivy color 용 (R, G, B, A) 튜플"""
+    return hex_to_rgb(hex_color) + (alpha,)
+
+
+def theme_color(name: str, alpha: float = 1.0) -> tuple:
+    """theme['colors'] 이름 → (R, G, B, A)"""
+    return hex_to_rgba(theme['colors'][name], alpha)
@@ -0,0 +1,10 @@
+def set_if_changed(widget, name, value):
+    """
+    값이 바뀐 경우에만 위젯 속성 대입
+    - Kivy 속성 대입의 검증/변환 비용과 텍스트 텍스처 재생성을 건너뜀
+    - 바뀌었으면 True
+    """
+    if getattr(widget, name) == value:
+        return False
+    setattr(widget, name, value)
+    return True
@@ -0,0 +1,189 @@
+import cv2
+
+from my_frontend.algorithm.analysis import create_face_mesh
+from my_frontend.algorithm.drowsiness import PITCH_OFFSET
+from my_frontend.algorithm.landmarks import (
+    landmarks_to_array,
+    extract_features,
+    feature_points,
+    FEATURE_INDEX,
+    EAR_THRESHOLD,
+)
+from my_frontend.algorithm.profiling import NULL_PROFILER
+
+
+class _Skipped:
+    def __repr__(self):
+        return "SKIPPED"
+
+
+# 추론을 건너뛴 프레임 (detect 반환값) → 호출하는 쪽은 직전 랜드마크를 이 프레임 시각으로 다시 점수 계산
+# 건너뛰는 건 눈을 안정적으로 뜨고 있을 때뿐이라 carry-forward 는 OPEN 샘플 (깜빡임은 CLOSED → OPEN 전환만 세므로 중복 없음)
+# 아예 detector 에 넣지 않으면 OPEN 프레임만 빠져서 PERCLOS 가 올라가고 avg_ear 는 감은 눈 쪽으로 치우침
+SKIPPED = _Skipped()
+
+
+class AdaptiveFaceMesh:
+    """
+    FaceMesh 추론 비용을 줄이는 적응형 래퍼
+    - ROI: 이전 랜드마크 주변만 잘라서 추론 (얼굴을 놓치면 같은 프레임을 전체 화면으로 재시도)
+    - 축소: ROI 가 max_side 보다 크면 줄여서 추론 (정규화 좌표라 결과는 그대로 사용)
+    - 홍채 refine 은 선택 (점수 계산에는 홍채 랜드마크를 쓰지 않음)
+    - 눈을 안정적으로 뜨고 있으면 최대 max_skip 프레임 추론을 건너뜀 (detect 는 SKIPPED 반환)
+      EAR / pitch 가 임계값에 가까워지면 즉시 매 프레임 추론으로 복귀
+    - ROI 추론은 매번 위치가 바뀌는 이미지라 static_image_mode FaceMesh (이전 프레임 추적 안 함)
+      전체 화면 추론은 추적 모드 FaceMesh 따로 (연속 프레임이면 얼굴 검출을 건너뛰어 더 빠름)
+    """
+
+    def __init__(
+        self,
+        refine_landmarks=False,
+        roi_scale=2.0,
+        max_side=256,
+        max_skip=2,
+        steady_frames=3,
+        ear_margin=0.05,
+        pitch_margin=5.0,
+        profiler=NULL_PROFILER,
+        face_mesh=None,
+        full_mesh=None,
+    ):
+        # face_mesh / full_mesh: 미리 만들어 둔 (워밍업된) FaceMesh 를 넘기면 그대로 사용
+        # (face_mesh 는 ROI 용 static_image_mode, full_mesh 는 전체 화면용 추적 모드로 생성)
+        self.face_mesh = face_mesh if face_mesh is not None else \
+            create_face_mesh(max_num_faces=1, refine_landmarks=refine_landmarks, static_image_mode=True)
+        self.full_mesh = full_mesh if full_mesh is not None else \
+            create_face_mesh(max_num_faces=1, refine_landmarks=refine_landmarks, static_image_mode=False)
+
+        self.roi_scale = roi_scale
+        self.max_side = max_side
+        self.max_skip = max_skip
+        self.steady_frames = steady_frames
+        self.ear_margin = ear_margin
+        self.pitch_margin = pitch_margin
+        self.profiler = profiler
+
+        self._points = None  # 마지막 추론 결과 (전체 프레임 정규화 좌표)
+        self._steady = 0  # 연속으로 '안정' 판정된 추론 횟수
+        self._skipped = 0  # 현재 연속 건너뛴 프레임 수
+
+        # 통계
+        self.frames = 0
+        self.inferences = 0
+        self.roi_inferences = 0
+
+    @property
+    def inference_rate(self):
+        """실제 FaceMesh 추론 횟수 / 입력 프레임 수"""
+        return self.inferences / max(1, self.frames)
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "inferences": self.inferences,
+            "roi_inferences": self.roi_inferences,
+            "inference_rate": self.inference_rate,
+        }
+
+    def detect(self, frame):
+        """BGR 프레임 → 첫 번째 얼굴의 (N, 3) 랜드마크 배열 (얼굴 없으면 None, 건너뛰면 SKIPPED)"""
+        self.frames += 1
+        h, w, _ = frame.shape
+
+        if self._should_skip():
+            self._skipped += 1
+            return SKIPPED
+        self._skipped = 0
+
+        points = None
+        roi = self._roi(w, h)
+        if roi is not None:
+            points = self._infer(frame, roi)
+            self.roi_inferences += 1
+        if points is None:
+            points = self._infer(frame, None)
+        if points is None:
+            self.profiler.count("no_face")
+
+        self._points = points
+        self._observe(points, w, h)
+        return points
+
+    def close(self):
+        self.face_mesh.close()
+        self.full_mesh.close()
+
+    def _should_skip(self):
+        return (
+            self._points is not None
+            and self._steady >= self.steady_frames
+            and self._skipped < self.max_skip
+        )
+
+    def _observe(self, points, w, h):
+        if points is None:
+            self._steady = 0
+            return
+
+        _, ear, pitch, _ = extract_features(points, w, h)
+        steady = (
+            ear >= EAR_THRESHOLD + self.ear_margin
+            and abs(pitch) <= PITCH_OFFSET - self.pitch_margin
+        )
+        self._steady = self._steady + 1 if steady else 0
+
+    def _roi(self, w, h):
+        """이전 랜드마크 기준 정사각형 ROI (x0, y0, x1, y1), 없거나 화면 대부분이면 None"""
+        if self._points is None:
+            return None
+
+        pts = feature_points(self._points)[:, :2]
+        x_min, y_min = pts.min(axis=0)
+        x_max, y_max = pts.max(axis=0)
+
+        # 눈~턱 범위라 이마 쪽이 빠지므로 중심을 조금 위로
+        size = self.roi_scale * max((x_max - x_min) * w, (y_max - y_min) * h)
+        cx = (x_min + x_max) / 2 * w
+        cy = (y_min + y_max) / 2 * h - 0.1 * size
+
+        x0, y0 = max(0, int(cx - size / 2)), max(0, int(cy - size / 2))
+        x1, y1 = min(w, int(cx + size / 2)), min(h, int(cy + size / 2))
+
+        if x1 - x0 < 32 or y1 - y0 < 32 or (x1 - x0) * (y1 - y0) > 0.8 * w * h:
+            return None
+        return x0, y0, x1, y1
+
+    def _infer(self, frame, roi):
+        t = self.profiler.start()
+        h, w, _ = frame.shape
+        x0, y0, x1, y1 = roi if roi is not None else (0, 0, w, h)
+
+        image = frame[y0:y1, x0:x1]
+        cw, ch = x1 - x0, y1 - y0
+        scale = self.max_side / max(cw, ch) if self.max_side else 1.0
+        if scale < 1.0:
+            image = cv2.resize(
+                image,
+                (max(1, int(cw * scale)), max(1, int(ch * scale))),
+                interpolation=cv2.INTER_AREA
+            )
+
+        rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        t = self.profiler.stop("convert", t)
+
+        mesh = self.face_mesh if roi is not None else self.full_mesh
+        result = mesh.process(rgb)
+        self.inferences += 1
+
+        if not result.multi_face_landmarks:
+            self.profiler.stop("mesh", t)
+            return None
+
+        # ROI 기준 정규화 좌표 → 전체 프레임 정규화 좌표 (compact 배열이라 전부 특징 랜드마크)
+        points = landmarks_to_array(result.multi_face_landmarks[0], FEATURE_INDEX)
+        points[:, 0] = (x0 + points[:, 0] * cw) / w
+        points[:, 1] = (y0 + points[:, 1] * ch) / h
+        points[:, 2] *= cw / w
+
+        self.profiler.stop("mesh", t)
+        return points
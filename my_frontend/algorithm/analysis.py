@@ -0,0 +1,102 @@
+import cv2
+import numpy as np
+
+from my_frontend.algorithm.landmarks import landmarks_to_array, extract_features, FEATURE_INDEX
+from my_frontend.algorithm.profiling import NULL_PROFILER
+
+# 화면에 표시할 detector 출력 항목
+OVERLAY_KEYS = [
+    "state", "score",
+    "ear", "avg_ear",
+    "perclos", "blink_count",
+    "blink_drop", "pitch"
+]
+
+
+def create_face_mesh(max_num_faces=1, refine_landmarks=True, static_image_mode=False):
+    # mediapipe import 는 수 초가 걸려서 실제로 모델을 만들 때 (보통 백그라운드 스레드에서) import
+    import mediapipe as mp
+
+    # static_image_mode: 이전 프레임 추적을 쓰지 않음 (여러 영상의 프레임을 번갈아 넣을 때)
+    return mp.solutions.face_mesh.FaceMesh(
+        static_image_mode=static_image_mode,
+        max_num_faces=max_num_faces,
+        refine_landmarks=refine_landmarks
+    )
+
+
+def warm_up_face_mesh(face_mesh, width=640, height=480, runs=2):
+    """
+    빈 프레임으로 미리 추론 (첫 process() 의 그래프 / 인터프리터 초기화 비용을 시작 단계에서 처리)
+    """
+    dummy = np.zeros((height, width, 3), dtype=np.uint8)
+    for _ in range(runs):
+        face_mesh.process(dummy)
+    return face_mesh
+
+
+def detect_points(face_mesh, frame, profiler=NULL_PROFILER, pool=None):
+    """
+    BGR 프레임 → 첫 번째 얼굴의 (N, 3) 랜드마크 배열 (얼굴 없으면 None)
+    - pool: frame_pool.FramePool 이면 재사용 RGB 버퍼에 변환 (읽기 전용이라 MediaPipe 가 복사하지 않음)
+    """
+    t = profiler.start()
+    rgb = pool.to_rgb(frame) if pool is not None else cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    t = profiler.stop("convert", t)
+
+    result = face_mesh.process(rgb)
+
+    if not result.multi_face_landmarks:
+        profiler.stop("mesh", t)
+        profiler.count("no_face")
+        return None
+
+    points = landmarks_to_array(result.multi_face_landmarks[0], FEATURE_INDEX)
+    profiler.stop("mesh", t)
+    return points
+
+
+def score_points(detector, points, w, h, timestamp, profiler=NULL_PROFILER):
+    """랜드마크 배열 → EAR / pitch 계산 → detector.update 결과"""
+    t = profiler.start()
+    eye_state, ear, pitch, yaw = extract_features(points, w, h)
+    t = profiler.stop("features", t)
+
+    out = detector.update(
+        ear=ear,
+        eye_state=eye_state,
+        pitch=pitch,
+        timestamp=timestamp
+    )
+    profiler.stop("score", t)
+    return out
+
+
+def draw_lines(frame, lines, x, y, color=(0, 255, 0), scale=0.6, thickness=2, step=25):
+    for text in lines:
+        cv2.putText(
+            frame,
+            text,
+            (x, y),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            scale,
+            color,
+            thickness
+        )
+        y += step
+
+
+def draw_overlay(frame, out):
+    """detector 출력값을 프레임 위에 텍스트로 표시"""
+    lines = []
+    for key in OVERLAY_KEYS:
+        value = out[key]
+        lines.append(f"{key}: {value:.3f}" if isinstance(value, float) else f"{key}: {value}")
+    draw_lines(frame, lines, 20, 30)
+
+
+def draw_profile(frame, profiler):
+    """단계별 지연 시간 (profiling.StageProfiler) 을 화면 아래쪽에 표시"""
+    lines = profiler.overlay_lines()
+    h = frame.shape[0]
+    draw_lines(frame, lines, 20, h - 18 * len(lines), (0, 200, 255), 0.45, 1, 18)
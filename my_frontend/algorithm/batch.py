@@ -0,0 +1,331 @@
+"""
+녹화된 블랙박스 영상 일괄 분석 (화면 출력 없음)
+
+    python -m my_frontend.algorithm.batch videos/ results/ --workers 8 --chunk-seconds 600
+
+결과는 영상마다 results/<영상 이름>/ 아래 열(column)별 바이너리 파일로 저장
+(read_columns 로 읽음)
+
+chunk 로 나눠도 파일 전체를 한 번에 분석한 결과와 같도록
+- FaceMesh 는 static_image_mode (프레임 결과가 이전 프레임 / 작업 순서와 무관)
+- chunk 마다 영상 처음 BASELINE_TIME 초 (깜빡임 baseline) + chunk 직전 warmup 초를 먼저 돌림
+  (60초 윈도우는 warmup 으로, baseline 은 앞부분으로 같은 상태가 됨,
+   얼굴 없음이 길어서 부족하면 warmup 을 늘려 다시 분석)
+- seek 위치는 CAP_PROP_POS_FRAMES 로 확인, 틀리면 처음부터 grab 으로 이동
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+import numpy as np
+
+from my_frontend.algorithm.analysis import create_face_mesh, detect_points
+from my_frontend.algorithm.drowsiness import DrowsinessDetector
+from my_frontend.algorithm.landmarks import extract_features
+
+VIDEO_EXTS = (".mp4", ".avi", ".mov", ".mkv")
+
+# 열 이름 → dtype
+COLUMNS = {
+    "frame": "<i8",
+    "timestamp": "<f8",
+    "has_face": "u1",
+    "ear": "<f4",
+    "pitch": "<f4",
+    "yaw": "<f4",
+    "perclos": "<f4",
+    "score": "<f4",
+    "state": "u1",
+}
+STATE_CODES = {"NORMAL": 0, "WARNING": 1, "DROWSY": 2}
+NO_FACE = 255
+
+# 윈도우/베이스라인이 모두 채워지는 시간 (chunk 앞에서 미리 돌려둘 구간)
+WARMUP_SECONDS = 60.0
+
+_face_mesh = None
+
+
+class ColumnWriter:
+    """
+    열별 파일에 block 단위로 이어 쓰기
+    - 메모리는 block 크기만큼만 사용
+    """
+
+    def __init__(self, directory, block=4096):
+        os.makedirs(directory, exist_ok=True)
+        self._files = {
+            name: open(os.path.join(directory, f"{name}.bin"), "wb") for name in COLUMNS
+        }
+        self._block = {name: np.empty(block, dtype=dt) for name, dt in COLUMNS.items()}
+        self._n = 0
+        self.rows = 0
+
+    def append(self, **row):
+        i = self._n
+        for name, arr in self._block.items():
+            arr[i] = row[name]
+        self._n += 1
+        self.rows += 1
+        if self._n == len(self._block["frame"]):
+            self.flush()
+
+    def flush(self):
+        for name, arr in self._block.items():
+            self._files[name].write(arr[:self._n].tobytes())
+        self._n = 0
+
+    def close(self):
+        self.flush()
+        for f in self._files.values():
+            f.close()
+
+
+def read_columns(video_dir):
+    """영상 결과 디렉터리 → {열 이름: 전체 배열} (chunk 순서대로 이어붙임)"""
+    parts = sorted(
+        d for d in os.listdir(video_dir) if os.path.isdir(os.path.join(video_dir, d))
+    )
+    out = {}
+    for name, dt in COLUMNS.items():
+        arrays = [
+            np.fromfile(os.path.join(video_dir, part, f"{name}.bin"), dtype=dt)
+            for part in parts
+        ]
+        out[name] = np.concatenate(arrays) if arrays else np.empty(0, dtype=dt)
+    return out
+
+
+def _init_worker(refine_landmarks):
+    global _face_mesh
+    # 추적 모드면 이전 작업 / 다른 영상의 프레임 상태가 이어지므로 프레임마다 독립적으로 검출
+    _face_mesh = create_face_mesh(
+        max_num_faces=1, refine_landmarks=refine_landmarks, static_image_mode=True
+    )
+
+
+def _seek(cap, path, target):
+    """
+    target 프레임으로 이동 → (cap, 정확히 seek 했는지)
+    - 코덱에 따라 키프레임으로 이동하므로 CAP_PROP_POS_FRAMES 로 확인
+    - 틀리면 다시 열어서 처음부터 grab (느리지만 정확)
+    """
+    if cap.set(cv2.CAP_PROP_POS_FRAMES, target) and int(cap.get(cv2.CAP_PROP_POS_FRAMES)) == target:
+        return cap, True
+
+    cap.release()
+    cap = cv2.VideoCapture(path)
+    for _ in range(target):
+        if not cap.grab():
+            break
+    return cap, False
+
+
+def _segments(start, stop, warmup_start, baseline_frames):
+    """
+    읽을 프레임 구간 [(first, last, baseline_only)]
+    - 영상 앞 baseline 구간 (baseline 이 정해지면 중단) + warmup 부터 chunk 끝까지, 겹치면 합침
+    """
+    if start == 0 or warmup_start <= baseline_frames:
+        return [(0, stop, False)]
+    return [(0, warmup_start, True), (warmup_start, stop, False)]
+
+
+def analyze_chunk(path, out_dir, start, stop, warmup_start):
+    """
+    [start, stop) 프레임 분석 → out_dir 에 열 파일 저장 (stop 이 None 이면 영상 끝까지)
+    - 영상 앞 baseline 구간과 [warmup_start, start) 구간은 detector 상태를 채우는 데만 쓰고 저장하지 않음
+    - chunk 직전에 얼굴 없음이 길어서 avg_ear 가 warmup 밖 구간으로 정해지는 경우
+      warmup 을 두 배씩 앞으로 늘려 다시 분석 (결과가 전체 분석과 같아질 때까지)
+    - timestamp 는 영상 시간 (프레임 번호 / fps)
+    - 반환: (path, start, 저장한 행 수, {"retries", "seek_fallbacks"})
+    """
+    info = {"retries": 0, "seek_fallbacks": 0}
+    while True:
+        rows, exact, fallbacks = _analyze(path, out_dir, start, stop, warmup_start)
+        info["seek_fallbacks"] += fallbacks
+        if exact or warmup_start == 0:
+            break
+        warmup_start = max(0, warmup_start - (start - warmup_start))
+        info["retries"] += 1
+    return path, start, rows, info
+
+
+def _analyze(path, out_dir, start, stop, warmup_start):
+    """analyze_chunk 한 번 → (저장한 행 수, 전체 분석과 같은지, 부정확한 seek 수)"""
+    cap = cv2.VideoCapture(path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    baseline_frames = math.ceil(DrowsinessDetector.BASELINE_TIME * fps) + 1
+    segments = _segments(start, stop, warmup_start, baseline_frames)
+
+    # 전체 분석과 같은 baseline 시작 시각 (영상 시작)
+    detector = DrowsinessDetector(start_time=0.0)
+    writer = ColumnWriter(out_dir)
+    fallbacks = 0
+    # 처음부터 이어서 읽으면 항상 같음, 아니면 chunk 첫 점수 계산 때 avg_ear 가
+    # warmup 구간 안의 EAR 윈도우로 정해졌는지 확인
+    exact = len(segments) == 1
+    checked = exact
+    warmup_ts = warmup_start / fps
+    last_full = None  # warmup 구간에서 avg_ear 를 마지막으로 갱신한 시각
+    pos = 0
+
+    try:
+        for first, last, baseline_only in segments:
+            if first != pos:
+                cap, exact_seek = _seek(cap, path, first)
+                if not exact_seek:
+                    fallbacks += 1
+                pos = first
+
+            idx = first
+            while last is None or idx < last:
+                # baseline 이 정해지면 나머지 앞부분은 건너뜀 (60초 윈도우는 warmup 에서 다시 채움)
+                if baseline_only and detector.baseline_blink_rate is not None:
+                    break
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                pos = idx + 1
+
+                h, w, _ = frame.shape
+                ts = idx / fps
+                points = detect_points(_face_mesh, frame)
+
+                if points is None:
+                    if idx >= start:
+                        writer.append(
+                            frame=idx, timestamp=ts, has_face=0, ear=np.nan, pitch=np.nan,
+                            yaw=np.nan, perclos=np.nan, score=np.nan, state=NO_FACE
+                        )
+                    idx += 1
+                    continue
+
+                eye_state, ear, pitch, yaw = extract_features(points, w, h)
+                out = detector.update(ear, eye_state, pitch, ts)
+
+                if not checked:
+                    if not baseline_only and len(detector.ear_history) >= DrowsinessDetector.EAR_MIN_SAMPLES:
+                        last_full = ts
+                    if idx >= start:
+                        checked = True
+                        exact = last_full is not None and \
+                            last_full - DrowsinessDetector.EAR_BASELINE_WINDOW >= warmup_ts
+
+                if idx >= start:
+                    writer.append(
+                        frame=idx, timestamp=ts, has_face=1, ear=ear, pitch=pitch, yaw=yaw,
+                        perclos=out["perclos"], score=out["score"],
+                        state=STATE_CODES[out["state"]]
+                    )
+                idx += 1
+    finally:
+        writer.close()
+        cap.release()
+
+    # chunk 안에 얼굴이 한 번도 없으면 detector 상태가 결과에 안 쓰임
+    return writer.rows, exact or not checked, fallbacks
+
+
+def plan_tasks(video_dir, out_dir, chunk_seconds=0.0, warmup=WARMUP_SECONDS):
+    """
+    영상 목록 → (analyze_chunk 인자 목록, 건너뛴 영상 [(path, 이유)]) (chunk_seconds <= 0 이면 파일 단위)
+    - 프레임 수를 알 수 없는 영상은 나누지 않고 끝까지 한 작업으로 처리
+    - warmup 이 WARMUP_SECONDS (가장 긴 윈도우) 보다 짧으면 chunk 결과가 전체 분석과 달라짐
+    """
+    tasks = []
+    skipped = []
+    for name in sorted(os.listdir(video_dir)):
+        if not name.lower().endswith(VIDEO_EXTS):
+            continue
+        path = os.path.join(video_dir, name)
+
+        cap = cv2.VideoCapture(path)
+        opened = cap.isOpened()
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
+        if not opened:
+            skipped.append((path, "cannot open"))
+            continue
+
+        video_out = os.path.join(out_dir, os.path.splitext(name)[0])
+        os.makedirs(video_out, exist_ok=True)
+        with open(os.path.join(video_out, "schema.json"), "w") as f:
+            json.dump(
+                {"fps": fps, "frames": total if total > 0 else None, "columns": COLUMNS,
+                 "states": STATE_CODES, "no_face": NO_FACE},
+                f, indent=2
+            )
+
+        if total <= 0:
+            skipped.append((path, "frame count unknown, analyzed as one task"))
+            tasks.append((path, os.path.join(video_out, "part-00000"), 0, None, 0))
+            continue
+
+        step = int(chunk_seconds * fps) if chunk_seconds > 0 else total
+        # 윈도우 경계 (now - ts > window) 에 걸리는 프레임까지 포함
+        warmup_frames = math.ceil(warmup * fps) + 1
+        for part, start in enumerate(range(0, total, step)):
+            tasks.append((
+                path,
+                os.path.join(video_out, f"part-{part:05d}"),
+                start,
+                min(start + step, total),
+                max(0, start - warmup_frames),
+            ))
+    return tasks, skipped
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="offline batch drowsiness analysis")
+    parser.add_argument("video_dir")
+    parser.add_argument("out_dir")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-seconds", type=float, default=0.0,
+                        help="영상을 이 길이로 나눠 병렬 처리 (0 이면 파일 단위)")
+    parser.add_argument("--warmup", type=float, default=WARMUP_SECONDS,
+                        help="chunk 앞에서 detector 워밍업에 쓰는 시간(초, 60 미만이면 전체 분석과 달라짐)")
+    parser.add_argument("--refine", action="store_true", help="홍채 랜드마크 refine 켜기")
+    parser.add_argument("--tasks-per-worker", type=int, default=32,
+                        help="워커 프로세스를 이 작업 수마다 재시작 (메모리 상한, 0 이면 재시작 안 함)")
+    args = parser.parse_args(argv)
+
+    tasks, skipped = plan_tasks(args.video_dir, args.out_dir, args.chunk_seconds, args.warmup)
+    for path, reason in skipped:
+        print(f"[skip] {os.path.basename(path)}: {reason}", file=sys.stderr)
+    print(f"{len(tasks)} tasks, {args.workers} workers")
+
+    started = time.time()
+    frames = 0
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        initializer=_init_worker,
+        initargs=(args.refine,),
+        max_tasks_per_child=args.tasks_per_worker or None,
+    ) as pool:
+        futures = [pool.submit(analyze_chunk, *task) for task in tasks]
+        for done, future in enumerate(as_completed(futures), 1):
+            path, start, rows, info = future.result()
+            frames += rows
+            notes = []
+            if info["retries"]:
+                notes.append(f"warmup extended {info['retries']}x (no face before chunk)")
+            if info["seek_fallbacks"]:
+                notes.append("inexact seek, re-read from start")
+            note = f" ({'; '.join(notes)})" if notes else ""
+            print(f"[{done}/{len(tasks)}] {os.path.basename(path)} @{start}: {rows} frames{note}")
+
+    elapsed = time.time() - started
+    print(f"done: {frames} frames in {elapsed:.1f}s ({frames / max(elapsed, 1e-9):.1f} fps)")
+    unreadable = [path for path, reason in skipped if reason == "cannot open"]
+    return 1 if unreadable else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""
+카메라 / GPU 없이 도는 핫패스 벤치마크
+
+    python -m my_frontend.algorithm.bench
+    python -m my_frontend.algorithm.bench --recording session.lmrec --json out.json
+    python -m my_frontend.algorithm.bench --baseline base.json   # 느려지면 exit 1
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from drowsy_common.bench_gate import compare, report
+from drowsy_common.detector_bank import DrowsinessDetectorBank
+from my_frontend.algorithm.drowsiness import DrowsinessDetector
+from my_frontend.algorithm.eye_detect import detect_eye_state
+from my_frontend.algorithm.head_pose import get_head_pose
+from my_frontend.algorithm.landmarks import extract_features, extract_features_batch
+from my_frontend.algorithm.recording import Recording, replay
+from my_frontend.algorithm.synthetic import write_synthetic
+
+
+def _per_frame(fn, frames, repeat):
+    """fn() 을 repeat 번 실행해서 가장 빠른 회차의 프레임당 시간(us)"""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best / max(1, frames) * 1e6
+
+
+class _Point:
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x, y, z):
+        self.x, self.y, self.z = x, y, z
+
+
+class _FaceLandmarks:
+    """MediaPipe 결과 대신 쓰는 랜드마크 객체 (.landmark[i].x / .y / .z, 변환 비용 측정용)"""
+
+    def __init__(self, points):
+        self.landmark = [_Point(*p) for p in points.tolist()]
+
+
+def run_benchmarks(recording, repeat=3, sessions=1000):
+    rec = Recording(recording) if not isinstance(recording, Recording) else recording
+    w, h = rec.width, rec.height
+    frames = int(rec.has_face.sum())
+    start = float(rec.timestamps[0])
+    points = rec.points()[rec.has_face]
+    timestamps = np.asarray(rec.timestamps[rec.has_face])
+
+    results = {"frames": frames}
+
+    # ===== 전체 재생 (단계별 시간 포함) =====
+    t0 = time.perf_counter()
+    _, n, stage = replay(rec, DrowsinessDetector(start_time=start), timings=True)
+    elapsed = time.perf_counter() - t0
+    results["replay_fps"] = n / elapsed
+    for name, total in stage.items():
+        results[f"stage_{name}_us"] = total / max(1, n) * 1e6
+
+    # ===== 단계별 마이크로벤치 =====
+    def features():
+        for p in points:
+            extract_features(p, w, h)
+
+    feats = [extract_features(p, w, h) for p in points]
+
+    def scoring():
+        d = DrowsinessDetector(start_time=start)
+        for (state, ear, pitch, _), ts in zip(feats, timestamps):
+            d.update(ear, state, pitch, ts)
+
+    # MediaPipe 객체 → 배열 변환 포함 (실제 카메라 경로), 객체 수가 많아 최대 1000 프레임
+    faces = [_FaceLandmarks(p) for p in points[:1000]]
+
+    def from_landmarks():
+        for face in faces:
+            extract_features(face, w, h)
+
+    def legacy_wrappers():
+        for face in faces:
+            detect_eye_state(face, w, h)
+            get_head_pose(face, w, h)
+
+    results["extract_features_us"] = _per_frame(features, frames, repeat)
+    results["landmarks_features_us"] = _per_frame(from_landmarks, len(faces), repeat)
+    results["landmarks_legacy_us"] = _per_frame(legacy_wrappers, len(faces), repeat)
+    results["extract_features_batch_us"] = _per_frame(
+        lambda: extract_features_batch(points, w, h), frames, repeat
+    )
+    results["detector_update_us"] = _per_frame(scoring, frames, repeat)
+
+    # ===== 다중 세션 (bank) =====
+    ticks = min(frames, 300)
+    ids = list(range(sessions))
+    ears = np.array([f[1] for f in feats[:ticks]])
+    states = np.array([f[0] == "CLOSED" for f in feats[:ticks]])
+    pitches = np.array([f[2] for f in feats[:ticks]])
+
+    def bank():
+        b = DrowsinessDetectorBank(capacity=sessions)
+        for i in range(ticks):
+            b.update_batch(
+                ids,
+                np.full(sessions, ears[i]),
+                np.full(sessions, states[i]),
+                np.full(sessions, pitches[i]),
+                np.full(sessions, timestamps[i]),
+            )
+
+    results["bank_update_us_per_session"] = _per_frame(bank, ticks * sessions, repeat)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="drowsiness hot-path benchmark")
+    parser.add_argument("--recording", help="재생할 .lmrec (없으면 합성 세션 생성)")
+    parser.add_argument("--duration", type=float, default=300.0, help="합성 세션 길이(초)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--sessions", type=int, default=1000, help="bank 벤치 세션 수")
+    parser.add_argument("--json", help="결과를 JSON 으로 저장")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="허용 성능 저하 비율")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.recording
+        if path is None:
+            path = os.path.join(tmp, "synthetic.lmrec")
+            write_synthetic(path, duration=args.duration, drowsy_after=args.duration / 2)
+
+        results = run_benchmarks(path, repeat=args.repeat, sessions=args.sessions)
+
+    for key, value in results.items():
+        print(f"{key:32s} {value:12.2f}" if isinstance(value, float) else f"{key:32s} {value:12d}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        return report(compare(results, baseline, args.tolerance))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# 세션 보정값을 프로필에 합칠 때 기존 프로필 가중치 상한 (초)
+# → 오래 쓴 사용자도 최근 세션이 어느 정도 반영됨
+MAX_PROFILE_SECONDS = 3600.0
+# 이보다 짧게 관찰한 세션은 프로필에 반영하지 않음
+MIN_SESSION_SECONDS = 60.0
+# 프레임 간격이 이보다 길면 (얼굴 놓침 등) 그 사이는 관찰 시간에 넣지 않음
+MAX_FRAME_GAP = 1.0
+
+
+class CalibrationProfile:
+    """
+    사용자별 보정값 (DrowsinessDetector 의 60초 baseline 을 대신함)
+    - blink_rate: 분당 깜빡임 수
+    - ear_mean: 평상시 EAR 평균
+    - pitch_neutral: 평상시 고개 각도 (카메라 설치 각도 보정)
+    - seconds: 지금까지 관찰한 평상시 시간 (합칠 때 가중치)
+    """
+
+    def __init__(self, blink_rate, ear_mean, pitch_neutral=0.0, seconds=0.0, updated_at=None):
+        self.blink_rate = blink_rate
+        self.ear_mean = ear_mean
+        self.pitch_neutral = pitch_neutral
+        self.seconds = seconds
+        self.updated_at = time.time() if updated_at is None else updated_at
+
+    def to_dict(self):
+        return {
+            "blink_rate": self.blink_rate,
+            "ear_mean": self.ear_mean,
+            "pitch_neutral": self.pitch_neutral,
+            "seconds": self.seconds,
+            "updated_at": self.updated_at,
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(
+            blink_rate=float(d["blink_rate"]),
+            ear_mean=float(d["ear_mean"]),
+            pitch_neutral=float(d.get("pitch_neutral", 0.0)),
+            seconds=float(d.get("seconds", 0.0)),
+            updated_at=d.get("updated_at"),
+        )
+
+    def merge(self, other):
+        """관찰 시간 가중 평균으로 합친 새 프로필"""
+        w0 = min(self.seconds, MAX_PROFILE_SECONDS)
+        w1 = other.seconds
+        total = w0 + w1
+        if total <= 0:
+            return other
+
+        def mix(a, b):
+            return (a * w0 + b * w1) / total
+
+        return CalibrationProfile(
+            blink_rate=mix(self.blink_rate, other.blink_rate),
+            ear_mean=mix(self.ear_mean, other.ear_mean),
+            pitch_neutral=mix(self.pitch_neutral, other.pitch_neutral),
+            seconds=self.seconds + other.seconds,
+        )
+
+
+class OnlineCalibration:
+    """
+    세션 중 보정값 측정 (DrowsinessDetector(calibration=...) 가 매 프레임 observe 호출)
+    - profile: 저장돼 있던 프로필 (없으면 None → detector 는 기존처럼 60초 baseline)
+    - 평상시 (NORMAL) 프레임만 관찰 → 졸린 구간이 baseline 에 섞이지 않음
+    - refined(): 저장 프로필 + 이번 세션 측정값 (관찰 시간이 MIN_SESSION_SECONDS 미만이면 기존 프로필)
+    """
+
+    def __init__(self, profile=None):
+        self.profile = profile
+
+        self.seconds = 0.0
+        self.blinks = 0
+        self._n = 0
+        self._ear_sum = 0.0
+        self._pitch_sum = 0.0
+        self._last_ts = None
+        self._last_closed = False
+
+    def observe(self, timestamp, ear, eye_state, pitch, state):
+        closed = eye_state == "CLOSED"
+        last_ts, self._last_ts = self._last_ts, timestamp
+        was_closed, self._last_closed = self._last_closed, closed
+        if state != "NORMAL":
+            return
+
+        if last_ts is not None and 0 < timestamp - last_ts <= MAX_FRAME_GAP:
+            self.seconds += timestamp - last_ts
+        if was_closed and not closed:
+            self.blinks += 1
+        if ear:
+            self._n += 1
+            self._ear_sum += ear
+            self._pitch_sum += pitch
+
+    def session_profile(self):
+        """이번 세션 측정값만으로 만든 프로필 (관찰이 부족하면 None)"""
+        if self.seconds < MIN_SESSION_SECONDS or not self._n:
+            return None
+        return CalibrationProfile(
+            blink_rate=self.blinks * 60.0 / self.seconds,
+            ear_mean=self._ear_sum / self._n,
+            pitch_neutral=self._pitch_sum / self._n,
+            seconds=self.seconds,
+        )
+
+    def refined(self):
+        session = self.session_profile()
+        if session is None:
+            return self.profile
+        if self.profile is None:
+            return session
+        return self.profile.merge(session)
+
+
+class CalibrationStore:
+    """
+    사용자별 CalibrationProfile 저장소 (JSON 파일 하나)
+    - 메모리에는 최근 사용한 capacity 명만 유지 (LRU), 파일에도 같은 목록만 저장
+    - save() 는 임시 파일에 쓰고 교체 (중간에 종료돼도 이전 파일 유지)
+    """
+
+    def __init__(self, path, capacity=32):
+        self.path = path
+        self.capacity = capacity
+        self._profiles = OrderedDict()
+        self._lock = threading.Lock()
+        self._load()
+
+    def __len__(self):
+        return len(self._profiles)
+
+    def get(self, user_id):
+        with self._lock:
+            profile = self._profiles.get(user_id)
+            if profile is not None:
+                self._profiles.move_to_end(user_id)
+            return profile
+
+    def put(self, user_id, profile):
+        if profile is None:
+            return
+        with self._lock:
+            self._profiles[user_id] = profile
+            self._profiles.move_to_end(user_id)
+            while len(self._profiles) > self.capacity:
+                self._profiles.popitem(last=False)
+
+    def save(self):
+        with self._lock:
+            data = {"users": {uid: p.to_dict() for uid, p in self._profiles.items()}}
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path)
+
+    def open_session(self, user_id):
+        """저장된 프로필로 OnlineCalibration 시작"""
+        return OnlineCalibration(self.get(user_id))
+
+    def close_session(self, user_id, calibration, save=True):
+        """세션 측정값을 프로필에 반영 (save 면 파일에도)"""
+        self.put(user_id, calibration.refined())
+        if save:
+            self.save()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"[calibration] {self.path} 읽기 실패, 새로 시작: {e}")
+            return
+
+        # 파일 순서 = 오래된 사용 순
+        for user_id, d in data.get("users", {}).items():
+            try:
+                self._profiles[user_id] = CalibrationProfile.from_dict(d)
+            except (KeyError, TypeError, ValueError):
+                continue
+        while len(self._profiles) > self.capacity:
+            self._profiles.popitem(last=False)
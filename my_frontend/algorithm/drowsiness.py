@@ -1,35 +1,84 @@
-import numpy as np
 import time
-from collections import deque
+
+from drowsy_common import scoring
+from drowsy_common.scoring import (
+    PERCLOS_LIMIT,
+    PITCH_OFFSET,
+    PITCH_RANGE,
+    EAR_WEIGHT,
+    PERCLOS_WEIGHT,
+    BLINK_WEIGHT,
+    HEAD_WEIGHT,
+    WARNING_SCORE,
+    DROWSY_SCORE,
+)
+from drowsy_common.window_stats import TimeWindow, WindowedPerclos
+
+
+def _clip01(x):
+    # 스칼라 하나에 np.clip 을 쓰면 느려서 직접 비교
+    if x < 0:
+        return 0.0
+    if x > 1:
+        return 1.0
+    return x
 
 
 class DrowsinessDetector:
     """
     EAR, PERCLOS, BLINK 감소, HEAD PITCH
     → 4요소를 모두 사용해 졸음 score 계산
+    - 윈도우 통계는 window_stats 링버퍼로 관리 → update() 는 상수 시간
     """
 
-    def __init__(self):
+    # 윈도우 설정은 DrowsinessDetectorBank / 서버와 공용 (drowsy_common.scoring)
+    BLINK_WINDOW = scoring.BLINK_WINDOW
+    EAR_BASELINE_WINDOW = scoring.EAR_BASELINE_WINDOW
+    PERCLOS_WINDOW = scoring.PERCLOS_WINDOW
+    BASELINE_TIME = scoring.BASELINE_TIME
+    EAR_MIN_SAMPLES = scoring.EAR_MIN_SAMPLES
+    MAX_FPS = scoring.MAX_FPS
+
+    def __init__(self, start_time=None, calibration=None):
+        """
+        - start_time: baseline 측정 시작 시각 (녹화 재생처럼 timestamp 가 현재 시각이 아닐 때 지정)
+        - calibration: calibration.OnlineCalibration
+          저장된 프로필이 있으면 baseline 깜빡임 / avg_ear / 고개 기준 각도를 바로 사용 (60초 대기 없음)
+          매 프레임 observe 로 이번 세션 보정값도 측정, BASELINE_TIME 마다 측정값을 반영해 기준 갱신
+          - 깜빡임 윈도우가 차기 전에는 기대 깜빡임 수를 경과 시간 비율만큼만 (빈 윈도우 = 졸음으로 보지 않게)
+          - avg_ear 는 EAR 윈도우가 차기 전까지 프로필 ear_mean 과 측정값을 경과 시간 비율로 섞음
+        """
         # 프레임 카운트
         self.total_frames = 0
         self.eye_closed_frames = 0
 
         # Blink 관련
         self.last_eye_state = "OPEN"
-        self.blink_times = deque()
-        self.BLINK_WINDOW = 60  # seconds
+        self.blink_times = TimeWindow(self.BLINK_WINDOW, self.MAX_FPS)
+
+        # PERCLOS (최근 PERCLOS_WINDOW 초)
+        self.perclos_window = WindowedPerclos(self.PERCLOS_WINDOW, self.MAX_FPS)
 
         # EAR 기준
-        self.ear_history = deque()
+        self.ear_history = TimeWindow(self.EAR_BASELINE_WINDOW, self.MAX_FPS)
         self.avg_ear = None
-        self.EAR_BASELINE_WINDOW = 60  # seconds
 
         # Baseline blink
-        self.baseline_blinks = []
-        self.baseline_start = time.time()
-        self.BASELINE_TIME = 60
+        self.baseline_blinks = 0
+        self.baseline_start = time.time() if start_time is None else start_time
         self.baseline_blink_rate = None
 
+        # Head pitch 기준 (평상시 각도)
+        self.pitch_neutral = 0.0
+
+        self.calibration = calibration
+        self._calibrated_at = self.baseline_start
+        self._ear_prior = None  # 프로필의 평상시 EAR (윈도우가 찰 때까지 섞어 씀)
+        profile = calibration.profile if calibration is not None else None
+        if profile is not None:
+            self._apply_profile(profile)
+            self.avg_ear = self._ear_prior = profile.ear_mean
+
     def update(self, ear, eye_state, pitch, timestamp):
         self.total_frames += 1
 
@@ -38,68 +87,82 @@ class DrowsinessDetector:
             self.eye_closed_frames += 1
         else:
             if self.last_eye_state == "CLOSED":
-                self.blink_times.append(timestamp)
+                self.blink_times.push(timestamp)
                 if self.baseline_blink_rate is None:
-                    self.baseline_blinks.append(timestamp)
+                    self.baseline_blinks += 1
 
         self.last_eye_state = eye_state
 
         # ===== Blink window 유지 =====
-        while self.blink_times and timestamp - self.blink_times[0] > self.BLINK_WINDOW:
-            self.blink_times.popleft()
+        self.blink_times.expire(timestamp)
 
         blink_count = len(self.blink_times)
 
         # ===== Baseline blink =====
         if self.baseline_blink_rate is None:
             if timestamp - self.baseline_start >= self.BASELINE_TIME:
-                self.baseline_blink_rate = max(1, len(self.baseline_blinks))
+                self.baseline_blink_rate = max(1, self.baseline_blinks)
 
         # ===== Blink 감소율 =====
         blink_drop = 0.0
         if self.baseline_blink_rate:
-            blink_drop = np.clip(
-                (self.baseline_blink_rate - blink_count) / self.baseline_blink_rate,
-                0, 1
+            expected = self.baseline_blink_rate
+            # 프로필로 시작하면 윈도우가 아직 BLINK_WINDOW 만큼 차지 않음 → 그동안 볼 수 있었던 만큼만 기대
+            fill = (timestamp - self.baseline_start) / self.BLINK_WINDOW
+            if fill < 1:
+                expected *= max(0.0, fill)
+            blink_drop = _clip01(
+                (expected - blink_count) / self.baseline_blink_rate
             )
 
-        # ===== PERCLOS =====
-        perclos = self.eye_closed_frames / max(1, self.total_frames)
-        perclos_score = np.clip(perclos / 0.4, 0, 1)
+        # ===== PERCLOS (윈도우) =====
+        perclos = self.perclos_window.update(timestamp, eye_state == "CLOSED")
+        perclos_score = _clip01(perclos / PERCLOS_LIMIT)
 
         # ===== EAR baseline =====
         if ear is not None:
-            self.ear_history.append((timestamp, ear))
+            self.ear_history.push(timestamp, ear)
 
-        while self.ear_history and timestamp - self.ear_history[0][0] > self.EAR_BASELINE_WINDOW:
-            self.ear_history.popleft()
+        self.ear_history.expire(timestamp)
 
-        if len(self.ear_history) >= 30:
-            self.avg_ear = sum(e for _, e in self.ear_history) / len(self.ear_history)
+        if len(self.ear_history) >= self.EAR_MIN_SAMPLES:
+            self.avg_ear = self.ear_history.mean()
+            if self._ear_prior is not None:
+                fill = (timestamp - self.baseline_start) / self.EAR_BASELINE_WINDOW
+                if fill < 1:
+                    self.avg_ear = self._ear_prior + fill * (self.avg_ear - self._ear_prior)
 
         ear_score = 0.0
         if self.avg_ear and ear:
-            ear_score = np.clip((self.avg_ear - ear) / self.avg_ear, 0, 1)
+            ear_score = _clip01((self.avg_ear - ear) / self.avg_ear)
 
         # ===== Head pitch =====
-        head_score = np.clip((abs(pitch) - 15.0) / 15.0, 0, 1)
+        head_score = _clip01((abs(pitch - self.pitch_neutral) - PITCH_OFFSET) / PITCH_RANGE)
 
         # ===== 최종 score (4요소 전부) =====
         score = (
-            0.40 * ear_score +
-            0.25 * perclos_score +
-            0.15 * blink_drop +
-            0.20 * head_score
+            EAR_WEIGHT * ear_score +
+            PERCLOS_WEIGHT * perclos_score +
+            BLINK_WEIGHT * blink_drop +
+            HEAD_WEIGHT * head_score
         )
 
         # ===== 상태 =====
-        if score < 0.4:
+        if score < WARNING_SCORE:
             state = "NORMAL"
-        elif score < 0.7:
+        elif score < DROWSY_SCORE:
             state = "WARNING"
         else:
             state = "DROWSY"
 
+        if self.calibration is not None:
+            self.calibration.observe(timestamp, ear, eye_state, pitch, state)
+            if timestamp - self._calibrated_at >= self.BASELINE_TIME:
+                self._calibrated_at = timestamp
+                refined = self.calibration.refined()
+                if refined is not None:
+                    self._apply_profile(refined)
+
         return {
             "state": state,
             "score": score,
@@ -114,3 +177,8 @@ class DrowsinessDetector:
             "blink_score": blink_drop,
             "head_score": head_score,
         }
+
+    def _apply_profile(self, profile):
+        # 분당 깜빡임 → BLINK_WINDOW 초당 깜빡임
+        self.baseline_blink_rate = max(1.0, profile.blink_rate * self.BLINK_WINDOW / 60.0)
+        self.pitch_neutral = profile.pitch_neutral
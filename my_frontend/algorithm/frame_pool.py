@@ -0,0 +1,149 @@
+"""
+프레임 버퍼 재사용 (프레임마다 새 배열을 만들지 않음)
+
+    python -m my_frontend.algorithm.frame_pool            # 카메라 0 으로 프레임당 할당량 측정
+    python -m my_frontend.algorithm.frame_pool cabin.mp4 --frames 300
+"""
+import argparse
+import sys
+import threading
+import tracemalloc
+
+import cv2
+import numpy as np
+
+
+class FramePool:
+    """
+    캡처 프레임 버퍼 풀 + RGB 변환 버퍼
+    - read(cap): 풀에서 꺼낸 버퍼에 cap.read(image=...) 로 바로 읽음
+      (첫 프레임 / 해상도가 바뀌면 OpenCV 가 만든 배열을 그대로 쓰고 이후 그 크기로 재사용)
+    - release(frame): 다 쓴 프레임을 풀에 돌려줌 (버린 프레임도 반드시 돌려줘야 재사용됨)
+      풀이 비어 있으면 새로 할당 (allocated 로 확인) → 동시에 살아 있는 프레임 수만큼만 생김
+    - to_rgb(frame): 하나의 RGB 버퍼에 cvtColor(dst=) 로 변환 후 읽기 전용으로 반환
+      (읽기 전용이면 MediaPipe 가 입력을 복사하지 않고 참조, 추론 스레드 하나에서만 사용)
+    """
+
+    def __init__(self, size=4):
+        self.size = size
+        self._free = []
+        self._lock = threading.Lock()
+        self._shape = None
+        self._rgb = None
+
+        # 통계
+        self.allocated = 0  # 새로 만든 프레임 버퍼 수
+        self.reused = 0
+
+    def read(self, cap):
+        buf = self._acquire()
+        ret, frame = cap.read() if buf is None else cap.read(image=buf)
+        if not ret:
+            if buf is not None:
+                self.release(buf)
+            return False, None
+
+        if frame is not buf:
+            # OpenCV 가 새 배열을 만듦 (첫 프레임 / 해상도 변경)
+            with self._lock:
+                self._shape = frame.shape
+                self.allocated += 1
+        return True, frame
+
+    def release(self, frame):
+        if frame is None:
+            return
+        with self._lock:
+            if frame.shape == self._shape and len(self._free) < self.size:
+                self._free.append(frame)
+
+    def _acquire(self):
+        with self._lock:
+            if self._free:
+                self.reused += 1
+                return self._free.pop()
+            shape = self._shape
+            if shape is None:
+                return None
+            self.allocated += 1
+        # 버퍼 할당은 잠금 밖에서 (release 를 막지 않게)
+        return np.empty(shape, dtype=np.uint8)
+
+    def to_rgb(self, frame):
+        rgb = self._rgb
+        if rgb is None or rgb.shape != frame.shape:
+            rgb = self._rgb = np.empty_like(frame)
+        rgb.flags.writeable = True
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
+        rgb.flags.writeable = False
+        return rgb
+
+    def stats(self):
+        return {"allocated": self.allocated, "reused": self.reused, "free": len(self._free)}
+
+
+def measure_allocations(cap, frames=300, pool=None, skip=10):
+    """
+    캡처 + RGB 변환 경로에서 프레임당 새로 할당되는 바이트 (tracemalloc, numpy 배열 포함)
+    - 프레임마다 peak 를 초기화하고 (peak - 시작 시점 사용량) 을 그 프레임의 할당량으로 봄
+    - 앞의 skip 프레임은 버퍼를 처음 만드는 구간이라 제외
+    - 반환: {"frames", "bytes_per_frame", "max_bytes_per_frame"}
+    """
+    tracemalloc.start()
+    total = 0
+    worst = 0
+    measured = 0
+    try:
+        for i in range(frames + skip):
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+
+            if pool is not None:
+                ret, frame = pool.read(cap)
+                if not ret:
+                    break
+                pool.to_rgb(frame)
+                pool.release(frame)
+            else:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+            allocated = tracemalloc.get_traced_memory()[1] - before
+            if i >= skip:
+                total += allocated
+                worst = max(worst, allocated)
+                measured += 1
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "frames": measured,
+        "bytes_per_frame": total / max(1, measured),
+        "max_bytes_per_frame": worst,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="bytes allocated per frame, with and without FramePool")
+    parser.add_argument("source", nargs="?", default="0", help="카메라 번호 또는 영상 파일")
+    parser.add_argument("--frames", type=int, default=300)
+    args = parser.parse_args(argv)
+
+    spec = int(args.source) if args.source.isdigit() else args.source
+    for name, pool in (("baseline", None), ("pool", FramePool())):
+        cap = cv2.VideoCapture(spec)
+        try:
+            result = measure_allocations(cap, args.frames, pool)
+        finally:
+            cap.release()
+        print(
+            f"{name:8s} {result['bytes_per_frame'] / 1024:10.1f} KiB/frame "
+            f"(max {result['max_bytes_per_frame'] / 1024:.1f} KiB, {result['frames']} frames)"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+import numpy as np
+
+# MediaPipe FaceMesh 기준 랜드마크 인덱스
+LEFT_EYE = [33, 160, 158, 133, 153, 144]
+RIGHT_EYE = [362, 385, 387, 263, 373, 380]
+
+NOSE_TIP = 1
+CHIN = 152
+LEFT_EYE_OUTER = 33
+RIGHT_EYE_OUTER = 263
+
+# 점수 계산에 실제로 쓰는 랜드마크만 모은 인덱스 (부분 변환용)
+FEATURE_INDEX = sorted(set(LEFT_EYE + RIGHT_EYE + [NOSE_TIP, CHIN]))
+N_FEATURES = len(FEATURE_INDEX)
+
+# compact 배열 (FEATURE_INDEX 행만 그 순서로 모은 (N_FEATURES, 3)) 의 랜드마크 번호 → 행 번호
+_COMPACT_ROW = {i: k for k, i in enumerate(FEATURE_INDEX)}
+
+# 이 값보다 EAR 이 작으면 눈 감음
+EAR_THRESHOLD = 0.21
+
+# EAR = (|p1-p5| + |p2-p4|) / (2 * |p0-p3|)
+# 두 눈의 (시작점, 끝점) 쌍을 한 번의 인덱싱으로 모으기 위한 순서
+_PAIR_FROM = [eye[i] for eye in (LEFT_EYE, RIGHT_EYE) for i in (1, 2, 0)]
+_PAIR_TO = [eye[i] for eye in (LEFT_EYE, RIGHT_EYE) for i in (5, 4, 3)]
+
+# [0:6] 쌍 시작점, [6:12] 쌍 끝점, [12:16] 코끝, 턱, 왼눈 바깥, 오른눈 바깥
+_GATHER = np.array(_PAIR_FROM + _PAIR_TO + [NOSE_TIP, CHIN, LEFT_EYE_OUTER, RIGHT_EYE_OUTER])
+_GATHER_COMPACT = np.array([_COMPACT_ROW[i] for i in _GATHER.tolist()])
+_FEATURE_ROWS = np.array(FEATURE_INDEX)
+
+# [코x, 코y, 턱x, 턱y, 왼눈x, 왼눈y, 오른눈x, 오른눈y] → [pitch, yaw] 선형식
+#   pitch = (턱y - 코y - 80) * 0.5
+#   yaw   = (코x - (왼눈x + 오른눈x) / 2) * 0.3
+_POSE_W = np.array([
+    [0.0, 0.3],
+    [-0.5, 0.0],
+    [0.0, 0.0],
+    [0.5, 0.0],
+    [0.0, -0.15],
+    [0.0, 0.0],
+    [0.0, -0.15],
+    [0.0, 0.0],
+], dtype=np.float32)
+_POSE_B = np.array([-40.0, 0.0], dtype=np.float32)
+
+
+def landmarks_to_array(landmarks, idx=None):
+    """
+    MediaPipe 얼굴 랜드마크 → float32 배열 (정규화 좌표 x, y, z)
+    - idx 가 없으면 전체 (N, 3)
+    - idx 를 주면 그 랜드마크만 순서대로 모은 (len(idx), 3) (점수 계산에는 FEATURE_INDEX 면 충분)
+      idx=FEATURE_INDEX 인 compact 배열은 특징 계산 함수가 그대로 받음 (landmark_rows 로 행 번호 변환)
+    """
+    lm = landmarks.landmark
+    if idx is None:
+        return np.array([(p.x, p.y, p.z) for p in lm], dtype=np.float32)
+    return np.array([(lm[i].x, lm[i].y, lm[i].z) for i in idx], dtype=np.float32)
+
+
+def is_compact(points):
+    """FEATURE_INDEX 행만 모은 배열인지 (아니면 랜드마크 번호 = 행 번호인 전체 배열)"""
+    return points.shape[-2] == N_FEATURES
+
+
+def landmark_rows(points, idx):
+    """랜드마크 번호 목록 → points 의 행 번호 (compact 배열은 FEATURE_INDEX 안의 위치)"""
+    if is_compact(points):
+        try:
+            return np.array([_COMPACT_ROW[int(i)] for i in idx])
+        except KeyError as e:
+            raise ValueError(f"compact 배열에 없는 랜드마크: {e.args[0]}") from None
+    return np.asarray(idx)
+
+
+def feature_points(points):
+    """(..., N, 3) → FEATURE_INDEX 랜드마크만 (..., N_FEATURES, 3)"""
+    if is_compact(points):
+        return points
+    return points[..., _FEATURE_ROWS, :]
+
+
+# as_points 가 마지막으로 변환한 (랜드마크 객체, 배열)
+# → eye_detect.detect_eye_state 와 head_pose.get_head_pose 에 같은 객체를 넘기면 변환은 한 번
+_last_converted = (None, None)
+
+
+def as_points(landmarks):
+    """랜드마크 객체 또는 이미 변환된 배열을 (..., N, 3) 배열로 통일 (객체는 compact 배열로 변환)"""
+    global _last_converted
+    if isinstance(landmarks, np.ndarray):
+        return landmarks
+    source, points = _last_converted
+    if source is landmarks:
+        return points
+    points = landmarks_to_array(landmarks, FEATURE_INDEX)
+    _last_converted = (landmarks, points)
+    return points
+
+
+def _pixel_points(points, w, h):
+    """(..., N, 3) → 특징 계산용 픽셀 좌표 (..., 16, 2)"""
+    gather = _GATHER_COMPACT if is_compact(points) else _GATHER
+    return points[..., gather, :2] * np.array([w, h], dtype=np.float32)
+
+
+def _ears(px):
+    """(..., 16, 2) → (..., 2) : [왼눈 EAR, 오른눈 EAR]"""
+    diff = px[..., 0:6, :] - px[..., 6:12, :]
+    dist = np.hypot(diff[..., 0], diff[..., 1]).reshape(px.shape[:-2] + (2, 3))    # A, B, C
+
+    return (dist[..., 0] + dist[..., 1]) / (2.0 * dist[..., 2])
+
+
+def _angles(px):
+    """(..., 16, 2) → (..., 2) : [pitch, yaw] (head_pose.get_head_pose 와 같은 근사식)"""
+    pose = px[..., 12:16, :].reshape(px.shape[:-2] + (8,))
+    return np.clip(pose @ _POSE_W + _POSE_B, -40, 40)
+
+
+def _clip40(x):
+    # 스칼라 하나에 np.clip 을 쓰면 느려서 직접 비교 (drowsiness._clip01 과 같은 이유)
+    return -40.0 if x < -40.0 else 40.0 if x > 40.0 else x
+
+
+def _frame_angles(px):
+    """(16, 2) → (pitch, yaw) 파이썬 float (한 프레임용, np.clip 없이)"""
+    pitch, yaw = (px[12:16].reshape(8) @ _POSE_W + _POSE_B).tolist()
+    return _clip40(pitch), _clip40(yaw)
+
+
+def eye_aspect_ratios(points, w, h):
+    """(..., N, 3) → (..., 2) : [왼눈 EAR, 오른눈 EAR] (픽셀 좌표계 기준)"""
+    return _ears(_pixel_points(points, w, h))
+
+
+def pose_angles(points, w, h):
+    """(..., N, 3) → (..., 2) : [pitch, yaw]"""
+    return _angles(_pixel_points(points, w, h))
+
+
+def frame_pose_angles(points, w, h):
+    """(N, 3) 한 프레임 → (pitch, yaw) 파이썬 float"""
+    return _frame_angles(_pixel_points(points, w, h))
+
+
+def extract_features(landmarks, w, h, ear_threshold=EAR_THRESHOLD):
+    """
+    한 프레임의 특징 추출
+    - 반환: (eye_state, ear, pitch, yaw)
+    """
+    px = _pixel_points(as_points(landmarks), w, h)
+
+    # tolist() 로 한 번에 파이썬 float 변환 (numpy 스칼라 연산 회피)
+    left_ear, right_ear = _ears(px).tolist()
+    ear = (left_ear + right_ear) / 2.0
+    pitch, yaw = _frame_angles(px)
+
+    eye_state = "CLOSED" if ear < ear_threshold else "OPEN"
+
+    return eye_state, ear, pitch, yaw
+
+
+def extract_features_batch(points, w, h, ear_threshold=EAR_THRESHOLD):
+    """
+    오프라인용 배치 특징 추출
+    - points: (frames, N, 3)
+    - 반환: 프레임별 배열 dict
+    """
+    points = np.asarray(points, dtype=np.float32)
+    px = _pixel_points(points, w, h)
+
+    ears = _ears(px)
+    ear = ears.mean(axis=-1)
+    angles = _angles(px)
+
+    return {
+        "left_ear": ears[..., 0],
+        "right_ear": ears[..., 1],
+        "ear": ear,
+        "eye_closed": ear < ear_threshold,
+        "pitch": angles[..., 0],
+        "yaw": angles[..., 1],
+    }
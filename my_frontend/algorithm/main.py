@@ -1,78 +1,278 @@
-import cv2
 import time
-import mediapipe as mp
 
-from my_frontend.algorithm.eye_detect import detect_eye_state
-from my_frontend.algorithm.head_pose import get_head_pose
+# 시작 시간 기준점 (무거운 import 전에)
+_STARTED = time.perf_counter()
+
+import argparse
+from functools import partial
+
+import cv2
+
+from my_frontend.algorithm.analysis import (
+    create_face_mesh,
+    warm_up_face_mesh,
+    detect_points,
+    score_points,
+    draw_overlay,
+    draw_profile,
+)
+from my_frontend.algorithm.adaptive import AdaptiveFaceMesh, SKIPPED
+from my_frontend.algorithm.calibration import CalibrationStore
 from my_frontend.algorithm.drowsiness import DrowsinessDetector
+from my_frontend.algorithm.frame_pool import FramePool
+from my_frontend.algorithm.multi_face import MultiFaceScorer, detect_faces, draw_faces, DRIVER_MODES
+from my_frontend.algorithm.pipeline import run_pipelined
+from my_frontend.algorithm.profiling import StageProfiler, StartupTimeline, NULL_PROFILER, NULL_TIMELINE
+from my_frontend.algorithm.startup import BackgroundWarmup, DeferredDetect
+from my_frontend.algorithm.uploader import Uploader
 
+WARMUP_CLOSE_TIMEOUT = 5.0  # 초, 종료할 때 모델 준비를 기다리는 최대 시간
 
-def main():
-    cap = cv2.VideoCapture(0)
 
-    mp_face = mp.solutions.face_mesh
-    face_mesh = mp_face.FaceMesh(
-        max_num_faces=1,
-        refine_landmarks=True
-    )
+def run_serial(cap, detect, detector, window="Drowsiness",
+               profiler=NULL_PROFILER, show_profile=False, uploader=None, timeline=NULL_TIMELINE,
+               pool=None):
+    """
+    캡처 → 추론 → 출력을 한 스레드에서 순서대로 처리
+    - detect: BGR 프레임 → 랜드마크 배열 (analysis.detect_points 또는 AdaptiveFaceMesh.detect)
+      SKIPPED (추론 건너뜀) 이면 직전 랜드마크를 이 프레임 시각으로 다시 점수 계산 (adaptive.SKIPPED 참고)
+    - profiler: 단계별 지연 측정 (profiling.StageProfiler), show_profile 이면 화면에 표시
+    - uploader: 점수 결과를 백엔드로 전송 (uploader.Uploader, submit 은 막히지 않음)
+    - timeline: 첫 프레임 / 첫 점수 시각 기록 (profiling.StartupTimeline)
+    - pool: 프레임 버퍼 재사용 (frame_pool.FramePool, 표시가 끝난 프레임은 풀로 반환)
+    """
+    out = None
+    last_points = None
+    while cap.isOpened():
+        t = profiler.start()
+        ret, frame = pool.read(cap) if pool is not None else cap.read()
+        if not ret:
+            break
+        profiler.stop("capture", t)
+        profiler.count("frames")
+        timeline.mark("first_frame")
+
+        h, w, _ = frame.shape
+        points = detect(frame)
+
+        t = profiler.start()
+        if points is SKIPPED:
+            profiler.count("skipped")
+            points = last_points
+        last_points = points
+        if points is not None:
+            now = time.time()
+            out = score_points(detector, points, w, h, now, profiler)
+            timeline.mark("first_score")
+            if uploader is not None:
+                uploader.submit(out, now)
+        else:
+            out = None
+
+        if out is not None:
+            # ===== 화면 출력 =====
+            t = profiler.start()
+            draw_overlay(frame, out)
+        if show_profile:
+            draw_profile(frame, profiler)
+
+        cv2.imshow(window, frame)
+        key = cv2.waitKey(1) & 0xFF
+        profiler.stop("render", t)
+        profiler.maybe_export()
+        if pool is not None:
+            pool.release(frame)
+        if key == 27:
+            break
 
-    detector = DrowsinessDetector()
 
+def run_multi(cap, detect, scorer, window="Drowsiness",
+              profiler=NULL_PROFILER, show_profile=False, uploader=None, timeline=NULL_TIMELINE,
+              pool=None):
+    """
+    여러 얼굴 모드 (run_serial 과 같은 흐름)
+    - detect: BGR 프레임 → (faces, N, 3) 랜드마크 배열 (multi_face.detect_faces)
+    - scorer: multi_face.MultiFaceScorer (얼굴별 detector 상태, 운전자 우선)
+    - 운전자 결과만 overlay 전체 표시 / 백엔드 전송, 나머지 얼굴은 얼굴 위치에 상태만 표시
+    """
     while cap.isOpened():
-        ret, frame = cap.read()
+        t = profiler.start()
+        ret, frame = pool.read(cap) if pool is not None else cap.read()
         if not ret:
             break
+        profiler.stop("capture", t)
+        profiler.count("frames")
+        timeline.mark("first_frame")
 
         h, w, _ = frame.shape
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        result = face_mesh.process(rgb)
+        points = detect(frame)
 
-        if not result.multi_face_landmarks:
-            cv2.imshow("Drowsiness", frame)
-            if cv2.waitKey(1) & 0xFF == 27:
-                break
-            continue
+        now = time.time()
+        results = scorer.update(points, w, h, now)
+        out = scorer.driver_output(results)
 
-        landmarks = result.multi_face_landmarks[0]
+        t = profiler.start()
+        if out is not None:
+            timeline.mark("first_score")
+            if uploader is not None:
+                uploader.submit(out, now)
+            draw_overlay(frame, out)
+        draw_faces(frame, results)
+        if show_profile:
+            draw_profile(frame, profiler)
 
-        eye_state, ear = detect_eye_state(landmarks, w, h)
-        pitch, yaw = get_head_pose(landmarks, w, h)
+        cv2.imshow(window, frame)
+        key = cv2.waitKey(1) & 0xFF
+        profiler.stop("render", t)
+        profiler.maybe_export()
+        if pool is not None:
+            pool.release(frame)
+        if key == 27:
+            break
+
+
+def main(pipelined=False, adaptive=False, refine_landmarks=True,
+         profile=False, show_profile=False, profile_export=None, profile_interval=5.0,
+         upload_url=None, user_id="default_user", spool_dir=None,
+         max_faces=1, driver="largest", calibration_path=None):
+    """
+    - pipelined=True: capture / inference / render 를 스레드로 분리 (pipeline.run_pipelined)
+    - adaptive=True: ROI 추론 + 추론 빈도 조절 (adaptive.AdaptiveFaceMesh)
+    - profile=True: 단계별 지연 측정, show_profile 이면 화면 표시,
+      profile_export 경로가 있으면 profile_interval 초마다 JSON 줄로 기록
+    - upload_url: 백엔드 주소가 있으면 결과를 배치로 전송
+      (오프라인이면 spool_dir 에 보관, 없으면 uploader.default_spool_dir(user_id))
+    - calibration_path: 사용자별 보정 프로필 파일 (있으면 user_id 프로필로 바로 시작, 종료 시 갱신)
+      한 얼굴 모드 전용 (여러 얼굴 모드는 얼굴 id 가 실행마다 달라서 사용자 프로필과 연결할 수 없음)
+    - max_faces > 1: 여러 얼굴 추적 + 얼굴별 점수 (multi_face), 운전자는 driver 기준으로 선택
+      (adaptive / pipelined 는 한 얼굴 모드에서만 사용)
+    - 시작 시간 단축: FaceMesh 생성 + 워밍업은 백그라운드, 그동안 카메라를 열고 화면 표시
+      (모델이 준비되기 전 프레임은 얼굴 없음으로 처리)
+    """
+    if calibration_path and max_faces > 1:
+        raise ValueError("calibration_path 는 한 얼굴 모드 (max_faces=1) 에서만 사용 가능")
+
+    timeline = StartupTimeline(origin=_STARTED)
+    timeline.mark("imports")
+
+    profile = profile or show_profile or profile_export is not None
+    profiler = StageProfiler(export_path=profile_export, export_interval=profile_interval) \
+        if profile else NULL_PROFILER
+
+    multi = max_faces > 1
+    adaptive = adaptive and not multi
+
+    def build_mesh():
+        # 전체 화면 추론은 추적 모드, adaptive 의 ROI 추론만 추적 없는 static_image_mode
+        face_mesh = warm_up_face_mesh(create_face_mesh(
+            max_num_faces=max_faces, refine_landmarks=refine_landmarks, static_image_mode=False
+        ))
+        if adaptive:
+            roi_mesh = warm_up_face_mesh(create_face_mesh(
+                max_num_faces=1, refine_landmarks=refine_landmarks, static_image_mode=True
+            ))
+            return AdaptiveFaceMesh(refine_landmarks=refine_landmarks, profiler=profiler,
+                                    face_mesh=roi_mesh, full_mesh=face_mesh)
+        return face_mesh
+
+    # 캡처 / RGB 변환 버퍼 재사용 (ROI 를 잘라 쓰는 adaptive 는 RGB 변환만 기존 방식)
+    pool = FramePool()
 
-        out = detector.update(
-            ear=ear,
-            eye_state=eye_state,
-            pitch=pitch,
-            timestamp=time.time()
+    warmup = BackgroundWarmup(build_mesh, timeline, name="mesh")
+    if multi:
+        detect = DeferredDetect(
+            warmup, lambda mesh: partial(detect_faces, mesh, profiler=profiler, pool=pool)
+        )
+    elif adaptive:
+        detect = DeferredDetect(warmup, lambda mesh: mesh.detect)
+    else:
+        detect = DeferredDetect(
+            warmup, lambda mesh: partial(detect_points, mesh, profiler=profiler, pool=pool)
         )
 
-        # ===== 화면 출력 =====
-        y = 30
-        for key in [
-            "state", "score",
-            "ear", "avg_ear",
-            "perclos", "blink_count",
-            "blink_drop", "pitch"
-        ]:
-            value = out[key]
-            text = f"{key}: {value:.3f}" if isinstance(value, float) else f"{key}: {value}"
-            cv2.putText(
-                frame,
-                text,
-                (20, y),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.6,
-                (0, 255, 0),
-                2
-            )
-            y += 25
-
-        cv2.imshow("Drowsiness", frame)
-        if cv2.waitKey(1) & 0xFF == 27:
-            break
+    cap = cv2.VideoCapture(0)
+    timeline.mark("camera_open")
+    store = CalibrationStore(calibration_path) if calibration_path else None
+    calibration = store.open_session(user_id) if store is not None else None
+    detector = DrowsinessDetector(calibration=calibration)
+
+    uploader = Uploader(upload_url, user_id=user_id, spool_dir=spool_dir) if upload_url else None
 
-    cap.release()
-    cv2.destroyAllWindows()
+    try:
+        if multi:
+            scorer = MultiFaceScorer(driver=driver, profiler=profiler)
+            run_multi(cap, detect, scorer, profiler=profiler,
+                      show_profile=show_profile, uploader=uploader, timeline=timeline, pool=pool)
+        elif pipelined:
+            stats = run_pipelined(cap, detect, detector, profiler=profiler,
+                                  show_profile=show_profile, uploader=uploader, timeline=timeline,
+                                  pool=pool)
+            print(f"[pipeline] {stats}")
+        else:
+            run_serial(cap, detect, detector, profiler=profiler,
+                       show_profile=show_profile, uploader=uploader, timeline=timeline, pool=pool)
+    finally:
+        # 카메라 / 창은 모델 준비 여부와 상관없이 먼저 정리
+        cap.release()
+        cv2.destroyAllWindows()
+        print(f"[startup] {timeline.report()}")
+        if store is not None:
+            store.close_session(user_id, calibration)
+        if uploader is not None:
+            uploader.close()
+            print(f"[upload] {uploader.stats()}")
+        if profiler.enabled:
+            profiler.export()
+            print(f"[profile] {profiler.summary()}")
+        _close_mesh(warmup, adaptive)
+
+
+def _close_mesh(warmup, adaptive, timeout=WARMUP_CLOSE_TIMEOUT):
+    """워밍업이 끝났으면 모델 정리 (멈췄거나 실패했으면 기다리지 않고 넘어감, 데몬 스레드라 종료를 막지 않음)"""
+    try:
+        mesh = warmup.result(timeout)
+    except TimeoutError:
+        print(f"[startup] 모델 준비가 {timeout:.0f}초 안에 끝나지 않아 정리하지 않고 종료")
+        return
+    except Exception as e:
+        print(f"[startup] 모델 준비 실패: {e!r}")
+        return
+    if adaptive:
+        print(f"[adaptive] {mesh.stats()}")
+    mesh.close()
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pipelined", action="store_true", help="capture/inference/render 스레드 분리")
+    parser.add_argument("--adaptive", action="store_true", help="ROI 추론 + 추론 빈도 조절")
+    parser.add_argument("--no-refine", action="store_true", help="홍채 랜드마크 refine 끄기")
+    parser.add_argument("--profile", action="store_true", help="단계별 지연 측정")
+    parser.add_argument("--profile-overlay", action="store_true", help="측정 결과를 화면에 표시")
+    parser.add_argument("--profile-export", help="측정 결과를 주기적으로 JSON 줄로 기록할 파일")
+    parser.add_argument("--profile-interval", type=float, default=5.0, help="기록 주기(초)")
+    parser.add_argument("--upload", help="결과를 보낼 백엔드 주소 (예: http://localhost:8000)")
+    parser.add_argument("--user-id", default="default_user")
+    parser.add_argument("--spool-dir", help="오프라인일 때 전송할 배치를 보관할 디렉터리 (기본: ~/.drowsy/spool/<user-id>)")
+    parser.add_argument("--calibration", help="사용자별 보정 프로필 파일 (JSON)")
+    parser.add_argument("--faces", type=int, default=1, help="추적할 최대 얼굴 수 (2 이상이면 여러 얼굴 모드)")
+    parser.add_argument("--driver", choices=DRIVER_MODES, default="largest", help="운전자 얼굴 선택 기준")
+    args = parser.parse_args()
+    if args.calibration and args.faces > 1:
+        parser.error("--calibration 은 --faces 1 에서만 사용 가능")
+
+    main(
+        pipelined=args.pipelined,
+        adaptive=args.adaptive,
+        refine_landmarks=not args.no_refine,
+        profile=args.profile,
+        show_profile=args.profile_overlay,
+        profile_export=args.profile_export,
+        profile_interval=args.profile_interval,
+        upload_url=args.upload,
+        user_id=args.user_id,
+        spool_dir=args.spool_dir,
+        max_faces=args.faces,
+        driver=args.driver,
+        calibration_path=args.calibration,
+    )
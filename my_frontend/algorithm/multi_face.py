@@ -0,0 +1,238 @@
+import itertools
+
+import cv2
+import numpy as np
+
+from drowsy_common.detector_bank import DrowsinessDetectorBank
+from my_frontend.algorithm.landmarks import (
+    landmarks_to_array,
+    extract_features_batch,
+    feature_points,
+    landmark_rows,
+    FEATURE_INDEX,
+    LEFT_EYE_OUTER,
+    RIGHT_EYE_OUTER,
+)
+from my_frontend.algorithm.analysis import draw_lines
+from my_frontend.algorithm.profiling import NULL_PROFILER
+
+# 운전자 선택 기준
+DRIVER_MODES = ("largest", "left", "right")
+
+
+def detect_faces(face_mesh, frame, profiler=NULL_PROFILER, pool=None):
+    """
+    BGR 프레임 → 모든 얼굴의 (faces, N, 3) 랜드마크 배열 (FEATURE_INDEX compact, 얼굴 없으면 None)
+    - pool: frame_pool.FramePool 이면 재사용 RGB 버퍼에 변환 (읽기 전용이라 MediaPipe 가 복사하지 않음)
+    """
+    t = profiler.start()
+    rgb = pool.to_rgb(frame) if pool is not None else cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    t = profiler.stop("convert", t)
+
+    result = face_mesh.process(rgb)
+
+    if not result.multi_face_landmarks:
+        profiler.stop("mesh", t)
+        profiler.count("no_face")
+        return None
+
+    points = np.stack([
+        landmarks_to_array(face, FEATURE_INDEX) for face in result.multi_face_landmarks
+    ])
+    profiler.stop("mesh", t)
+    return points
+
+
+def face_geometry(points):
+    """(faces, N, 3) → 중심 (faces, 2), 크기 = 두 눈 바깥 사이 거리 (faces,) (정규화 좌표)"""
+    center = feature_points(points)[:, :, :2].mean(axis=1)
+    left, right = landmark_rows(points, (LEFT_EYE_OUTER, RIGHT_EYE_OUTER))
+    eyes = points[:, left, :2] - points[:, right, :2]
+    size = np.hypot(eyes[:, 0], eyes[:, 1])
+    return center, size
+
+
+class FaceTracker:
+    """
+    프레임 간 얼굴 id 유지 (중심 거리 기반 greedy 매칭)
+    - 트랙과 검출의 중심 거리를 트랙 얼굴 크기로 나눈 값이 max_distance 이하이면 같은 얼굴
+    - 거리가 가까운 쌍부터 확정 (얼굴 수가 적어서 헝가리안 대신 정렬 한 번)
+    - max_age 초 동안 안 보이면 트랙 삭제 → update() 반환값의 expired 로 알려줌
+    """
+
+    def __init__(self, max_distance=1.0, max_age=2.0):
+        self.max_distance = max_distance
+        self.max_age = max_age
+
+        self._ids = itertools.count(1)
+        self.tracks = {}  # face_id → [중심 (2,), 크기, 마지막으로 본 시각]
+
+    def update(self, centers, sizes, timestamp):
+        """
+        - 반환: (검출 순서대로 face_id 목록, 이번에 삭제된 face_id 목록)
+        """
+        n = len(centers)
+        assigned = [None] * n
+        track_ids = list(self.tracks)
+
+        if track_ids and n:
+            prev = np.array([self.tracks[i][0] for i in track_ids])
+            scale = np.array([self.tracks[i][1] for i in track_ids])
+            # (트랙, 검출) 거리 행렬
+            dist = np.linalg.norm(prev[:, None, :] - centers[None, :, :], axis=-1)
+            dist /= np.maximum(scale, 1e-6)[:, None]
+
+            used_tracks = set()
+            for flat in np.argsort(dist, axis=None):
+                ti, di = divmod(int(flat), n)
+                if dist[ti, di] > self.max_distance:
+                    break
+                if ti in used_tracks or assigned[di] is not None:
+                    continue
+                used_tracks.add(ti)
+                assigned[di] = track_ids[ti]
+
+        for i in range(n):
+            if assigned[i] is None:
+                assigned[i] = next(self._ids)
+            self.tracks[assigned[i]] = [centers[i], float(sizes[i]), timestamp]
+
+        expired = [
+            face_id for face_id, (_, _, seen) in self.tracks.items()
+            if timestamp - seen > self.max_age
+        ]
+        for face_id in expired:
+            del self.tracks[face_id]
+
+        return assigned, expired
+
+
+class MultiFaceScorer:
+    """
+    여러 얼굴을 동시에 점수 계산 (얼굴마다 독립된 detector 상태)
+    - 얼굴 id 는 FaceTracker 로 유지 → 얼굴이 바뀌어도 EAR baseline / 깜빡임 기록이 섞이지 않음
+    - 특징 추출 (landmarks.extract_features_batch) 과 점수 계산 (DrowsinessDetectorBank)
+      모두 얼굴 수와 상관없이 프레임당 한 번의 벡터 연산
+    - 운전자: driver 기준으로 한 번 정하면 그 트랙이 사라질 때까지 유지, 매 프레임 점수 계산
+      (driver="largest": 가장 큰 얼굴, "left"/"right": 화면에서 그쪽에 가장 가까운 얼굴)
+      트랙이 남아 있는 동안 안 보이는 프레임은 운전자 결과 없음 (driver_output → None)
+    - 승객: passenger_every 프레임마다 한 번만 점수 계산 (윈도우 통계가 시간 기준이라 결과는 유지)
+    - 트랙이 사라지면 detector 상태도 삭제
+    """
+
+    def __init__(self, driver="largest", passenger_every=2, tracker=None, profiler=NULL_PROFILER):
+        if driver not in DRIVER_MODES:
+            raise ValueError(f"driver must be one of {DRIVER_MODES}")
+        self.driver_mode = driver
+        self.passenger_every = max(1, passenger_every)
+        self.tracker = tracker if tracker is not None else FaceTracker()
+        self.profiler = profiler
+
+        self.bank = DrowsinessDetectorBank(capacity=8)
+        self.driver_id = None
+        self._frames = 0
+        self._last = {}  # face_id → 마지막 점수 결과 (승객을 건너뛴 프레임에 재사용)
+
+    def update(self, points, w, h, timestamp):
+        """
+        points: (faces, N, 3) 또는 None (얼굴 없음)
+        - 반환: 운전자가 맨 앞인 [(face_id, 중심 (x, y), out dict)] 목록
+          (out 은 DrowsinessDetector.update 와 같은 키, 운전자는 out["driver"] = True)
+        """
+        self._frames += 1
+        profiler = self.profiler
+        t = profiler.start()
+
+        if points is None or not len(points):
+            centers, sizes = np.zeros((0, 2)), np.zeros(0)
+        else:
+            centers, sizes = face_geometry(points)
+        face_ids, expired = self.tracker.update(centers, sizes, timestamp)
+        for face_id in expired:
+            self._forget(face_id)
+        if not face_ids:
+            profiler.stop("track", t)
+            return []
+
+        self._choose_driver(face_ids, centers, sizes)
+        t = profiler.stop("track", t)
+
+        # 이번 프레임에 점수 계산할 얼굴 (운전자는 항상)
+        score_passengers = self._frames % self.passenger_every == 0
+        rows = [
+            i for i, face_id in enumerate(face_ids)
+            if face_id == self.driver_id or score_passengers or face_id not in self._last
+        ]
+
+        if rows:
+            features = extract_features_batch(points[rows], w, h)
+            t = profiler.stop("features", t)
+
+            ids = [face_ids[i] for i in rows]
+            for face_id in ids:
+                if face_id not in self.bank:
+                    # baseline 측정은 얼굴이 처음 보인 시각부터
+                    self.bank.add_session(face_id, start_time=timestamp)
+            outs = self.bank.update_batch(
+                ids,
+                features["ear"],
+                features["eye_closed"],
+                features["pitch"],
+                np.full(len(rows), timestamp),
+            )
+            for k, face_id in enumerate(ids):
+                self._last[face_id] = {key: _scalar(value[k]) for key, value in outs.items()}
+            profiler.stop("score", t)
+
+        results = []
+        for i, face_id in enumerate(face_ids):
+            out = dict(self._last[face_id], driver=face_id == self.driver_id)
+            item = (face_id, tuple(centers[i].tolist()), out)
+            if out["driver"]:
+                results.insert(0, item)
+            else:
+                results.append(item)
+        return results
+
+    def driver_output(self, results):
+        """update() 결과 중 운전자 out (없으면 None)"""
+        if results and results[0][2]["driver"]:
+            return results[0][2]
+        return None
+
+    def _choose_driver(self, face_ids, centers, sizes):
+        # 운전자 트랙이 살아 있으면 이번 프레임에 안 보여도 유지 (그동안 운전자 결과 없음)
+        # → 잠깐 가려진 사이 승객이 운전자로 바뀌어 승객 점수로 알람이 울리지 않게
+        if self.driver_id in self.tracker.tracks:
+            return
+        if self.driver_mode == "largest":
+            i = int(np.argmax(sizes))
+        elif self.driver_mode == "left":
+            i = int(np.argmin(centers[:, 0]))
+        else:
+            i = int(np.argmax(centers[:, 0]))
+        self.driver_id = face_ids[i]
+
+    def _forget(self, face_id):
+        self.bank.remove_session(face_id)
+        self._last.pop(face_id, None)
+        if face_id == self.driver_id:
+            self.driver_id = None
+
+
+def _scalar(value):
+    # numpy 스칼라 → 파이썬 값 (화면 표시 / 전송 시 DrowsinessDetector.update 결과와 같은 타입)
+    return value.item() if hasattr(value, "item") else value
+
+
+def draw_faces(frame, results):
+    """얼굴마다 id / 상태 / score 를 얼굴 위치에 표시 (운전자는 빨간색)"""
+    h, w = frame.shape[:2]
+    for face_id, (cx, cy), out in results:
+        color = (0, 0, 255) if out["driver"] else (255, 200, 0)
+        label = f"#{face_id}{' driver' if out['driver'] else ''}"
+        draw_lines(
+            frame,
+            [label, f"{out['state']} {out['score']:.2f}"],
+            int(cx * w) - 40, int(cy * h) - 60, color, 0.5, 1, 18
+        )
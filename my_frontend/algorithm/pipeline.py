@@ -0,0 +1,213 @@
+import queue
+import threading
+import time
+
+import cv2
+
+from my_frontend.algorithm.adaptive import SKIPPED
+from my_frontend.algorithm.analysis import score_points, draw_overlay, draw_profile
+from my_frontend.algorithm.profiling import NULL_PROFILER, NULL_TIMELINE
+
+
+class LatestFrame:
+    """
+    크기 1 슬롯 (latest-frame-wins)
+    - put: 아직 소비되지 않은 이전 프레임은 버리고 덮어씀
+    - get: 새 프레임이 올 때까지 대기, 닫히면 None
+    - on_drop: 버린 항목을 받는 콜백 (프레임 버퍼를 풀에 돌려줄 때)
+    """
+
+    def __init__(self, on_drop=None):
+        self._cond = threading.Condition()
+        self._item = None
+        self._closed = False
+        self._on_drop = on_drop
+        self.dropped = 0
+
+    def put(self, item):
+        """이전 프레임을 버렸으면 True"""
+        with self._cond:
+            old, self._item = self._item, item
+            if old is not None:
+                self.dropped += 1
+            self._cond.notify()
+        if old is None:
+            return False
+        if self._on_drop is not None:
+            self._on_drop(old)
+        return True
+
+    def get(self, timeout=None):
+        with self._cond:
+            if self._item is None and not self._closed:
+                self._cond.wait(timeout)
+            item, self._item = self._item, None
+            return item
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+
+def _put_latest(q, item, on_drop=None):
+    """bounded queue 가 차 있으면 가장 오래된 항목을 버리고 넣음, 버린 개수 반환"""
+    dropped = 0
+    while True:
+        try:
+            q.put_nowait(item)
+            return dropped
+        except queue.Full:
+            try:
+                old = q.get_nowait()
+                dropped += 1
+                if on_drop is not None and old is not None:
+                    on_drop(old)
+            except queue.Empty:
+                pass
+
+
+def _release_frame(pool):
+    """(frame, ...) 항목을 버릴 때 프레임 버퍼를 풀에 돌려주는 콜백"""
+    if pool is None:
+        return None
+    return lambda item: pool.release(item[0])
+
+
+def _capture_loop(cap, slot, stop, profiler, timeline=NULL_TIMELINE, pool=None):
+    try:
+        while not stop.is_set():
+            t = profiler.start()
+            ret, frame = pool.read(cap) if pool is not None else cap.read()
+            if not ret:
+                break
+            profiler.stop("capture", t)
+            timeline.mark("first_frame")
+
+            if slot.put((frame, time.time())):
+                profiler.count("dropped_capture")
+    finally:
+        slot.close()
+
+
+def _inference_loop(detect, detector, slot, results, stop, profiler, uploader=None,
+                    timeline=NULL_TIMELINE, pool=None):
+    release = _release_frame(pool)
+    out = None
+    last_points = None
+    try:
+        while not stop.is_set():
+            item = slot.get(timeout=0.1)
+            if item is None:
+                if slot.closed:
+                    break
+                continue
+
+            frame, captured_at = item
+            h, w, _ = frame.shape
+            profiler.count("frames")
+            points = detect(frame)
+
+            # 추론을 건너뛴 프레임은 직전 랜드마크로 점수 계산 (carry-forward, adaptive.SKIPPED 참고)
+            # scored: 이번 프레임의 랜드마크로 계산했는지 (통계용)
+            scored = points is not SKIPPED
+            if not scored:
+                profiler.count("skipped")
+                points = last_points
+            last_points = points
+            if points is None:
+                out = None
+            else:
+                out = score_points(detector, points, w, h, captured_at, profiler)
+                timeline.mark("first_score")
+                if uploader is not None:
+                    uploader.submit(out, captured_at)
+
+            dropped = _put_latest(results, (frame, out, captured_at, scored), release)
+            if dropped:
+                profiler.count("dropped_result", dropped)
+    finally:
+        # 표시 단계에 종료 알림
+        _put_latest(results, None)
+
+
+def run_pipelined(cap, detect, detector, window="Drowsiness",
+                  profiler=NULL_PROFILER, show_profile=False, uploader=None,
+                  timeline=NULL_TIMELINE, pool=None):
+    """
+    capture → inference → render 3단 파이프라인
+    - detect: BGR 프레임 → 랜드마크 배열 (analysis.detect_points 또는 AdaptiveFaceMesh.detect)
+      SKIPPED 면 직전 랜드마크를 이 프레임 시각으로 다시 점수 계산 (adaptive.SKIPPED 참고)
+    - profiler: 단계별 지연 측정 (profiling.StageProfiler), show_profile 이면 화면에 표시
+    - uploader: 점수 결과를 백엔드로 전송 (render 에서 버려지는 결과도 모두 전송)
+    - timeline: 첫 프레임 / 첫 점수 시각 기록 (profiling.StartupTimeline)
+    - pool: 프레임 버퍼 재사용 (frame_pool.FramePool, 버린 프레임 / 표시한 프레임은 풀로 반환)
+    - capture / inference 는 각각 별도 스레드, 화면 출력은 호출한 (메인) 스레드
+    - capture → inference: LatestFrame (밀린 프레임은 버림)
+    - inference → render: 크기 2 bounded queue (가득 차면 오래된 결과 버림)
+    - 반환: 처리 통계 dict (scored_frames / fps / avg_latency 는 이번 프레임 랜드마크로 점수를 계산해 표시한 프레임만,
+      SKIPPED 로 직전 랜드마크를 다시 쓴 프레임은 displayed_frames 에만 포함)
+    """
+    slot = LatestFrame(on_drop=_release_frame(pool))
+    results = queue.Queue(maxsize=2)
+    stop = threading.Event()
+
+    threads = [
+        threading.Thread(target=_capture_loop, args=(cap, slot, stop, profiler, timeline, pool),
+                         daemon=True),
+        threading.Thread(
+            target=_inference_loop,
+            args=(detect, detector, slot, results, stop, profiler, uploader, timeline, pool),
+            daemon=True
+        ),
+    ]
+    for t in threads:
+        t.start()
+
+    frames = 0
+    displayed = 0
+    latency_sum = 0.0
+    started = time.time()
+
+    while True:
+        item = results.get()
+        if item is None:
+            break
+
+        frame, out, captured_at, scored = item
+        t = profiler.start()
+        if scored:
+            frames += 1
+            latency_sum += time.time() - captured_at
+        if out is not None:
+            displayed += 1
+            draw_overlay(frame, out)
+        if show_profile:
+            draw_profile(frame, profiler)
+
+        cv2.imshow(window, frame)
+        key = cv2.waitKey(1) & 0xFF
+        profiler.stop("render", t)
+        profiler.maybe_export()
+        if pool is not None:
+            pool.release(frame)
+        if key == 27:
+            break
+
+    stop.set()
+    slot.close()
+    for t in threads:
+        t.join(timeout=1.0)
+
+    elapsed = max(time.time() - started, 1e-9)
+    return {
+        "scored_frames": frames,
+        "displayed_frames": displayed,
+        "fps": frames / elapsed,
+        "avg_latency": latency_sum / frames if frames else None,
+        "dropped_frames": slot.dropped,
+    }
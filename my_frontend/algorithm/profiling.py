@@ -0,0 +1,182 @@
+import json
+import threading
+import time
+from array import array
+
+import numpy as np
+
+# 감지 루프 단계 (표시 순서)
+STAGES = ("capture", "convert", "mesh", "features", "score", "render")
+# 카운터마다 쓰는 스레드는 하나 (잠금 없이 += 하므로 두 스레드가 같은 카운터를 올리면 값이 빠질 수 있음)
+# dropped_capture: capture → inference 에서 버린 프레임 (capture 스레드)
+# dropped_result: inference → render 에서 버린 결과 (inference 스레드)
+COUNTERS = ("frames", "dropped_capture", "dropped_result", "no_face", "skipped")
+
+
+class StageProfiler:
+    """
+    단계별 지연 시간 측정
+    - 단계마다 최근 window 개 측정값을 고정 크기 링버퍼에 보관 → p50 / p95 / p99
+    - 사용법: t = prof.start() ... t = prof.stop("mesh", t) ... t = prof.stop("score", t)
+    - export_path 가 있으면 export_interval 초마다 JSON 한 줄씩 추가
+    """
+
+    enabled = True
+
+    def __init__(self, window=1024, export_path=None, export_interval=5.0):
+        self.window = window
+        self._samples = {stage: array("d", bytes(8 * window)) for stage in STAGES}
+        self._count = dict.fromkeys(STAGES, 0)
+        self.counters = dict.fromkeys(COUNTERS, 0)
+
+        self.export_path = export_path
+        self.export_interval = export_interval
+        self._next_export = time.perf_counter() + export_interval
+        self._lock = threading.Lock()  # 요약/내보내기 전용 (기록 경로에는 잠금 없음)
+
+    @staticmethod
+    def start():
+        return time.perf_counter()
+
+    def stop(self, stage, t0):
+        """t0 부터 지금까지를 stage 시간으로 기록하고 현재 시각 반환 (다음 단계 시작점)"""
+        now = time.perf_counter()
+        n = self._count[stage]
+        self._samples[stage][n % self.window] = now - t0
+        self._count[stage] = n + 1
+        return now
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def summary(self):
+        """단계별 {count, p50, p95, p99} (ms) + 카운터"""
+        stages = {}
+        for stage in STAGES:
+            n = min(self._count[stage], self.window)
+            if not n:
+                continue
+            values = np.frombuffer(self._samples[stage], dtype=np.float64)[:n] * 1000.0
+            p50, p95, p99 = np.percentile(values, (50, 95, 99))
+            stages[stage] = {
+                "count": self._count[stage],
+                "p50": float(p50),
+                "p95": float(p95),
+                "p99": float(p99),
+            }
+        return {"stages": stages, "counters": dict(self.counters)}
+
+    def overlay_lines(self):
+        summary = self.summary()
+        lines = [
+            f"{stage:8s} p50 {s['p50']:6.1f} p95 {s['p95']:6.1f} p99 {s['p99']:6.1f} ms"
+            for stage, s in summary["stages"].items()
+        ]
+        lines.append(" ".join(f"{k}:{v}" for k, v in summary["counters"].items()))
+        return lines
+
+    def maybe_export(self):
+        """export_interval 이 지났으면 파일에 한 줄 추가"""
+        if self.export_path is None:
+            return
+        now = time.perf_counter()
+        if now < self._next_export:
+            return
+        self._next_export = now + self.export_interval
+        self.export()
+
+    def export(self):
+        if self.export_path is None:
+            return
+        with self._lock:
+            record = {"time": time.time(), **self.summary()}
+            with open(self.export_path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+
+
+class NullProfiler:
+    """측정 끔: 같은 인터페이스의 빈 구현 (호출 비용만 남음)"""
+
+    enabled = False
+    counters = {}
+
+    @staticmethod
+    def start():
+        return 0.0
+
+    @staticmethod
+    def stop(stage, t0):
+        return 0.0
+
+    @staticmethod
+    def count(name, n=1):
+        pass
+
+    @staticmethod
+    def summary():
+        return {"stages": {}, "counters": {}}
+
+    @staticmethod
+    def overlay_lines():
+        return []
+
+    @staticmethod
+    def maybe_export():
+        pass
+
+    @staticmethod
+    def export():
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class StartupTimeline:
+    """
+    시작 단계별 경과 시간 (time-to-first-frame / time-to-first-score 등)
+    - mark(name): 처음 호출된 시각만 기록 (루프 안에서 매 프레임 불러도 됨)
+    - 기준 시각은 생성 시점 (또는 origin, time.perf_counter 기준)
+    """
+
+    enabled = True
+
+    def __init__(self, origin=None):
+        self.origin = time.perf_counter() if origin is None else origin
+        self.marks = {}
+        self._lock = threading.Lock()
+
+    def mark(self, name):
+        if name in self.marks:
+            return
+        with self._lock:
+            self.marks.setdefault(name, time.perf_counter() - self.origin)
+
+    def to_dict(self):
+        """{단계: 경과 초}, 시간 순"""
+        return dict(sorted(self.marks.items(), key=lambda item: item[1]))
+
+    def report(self):
+        return " ".join(f"{name}={t * 1000:.0f}ms" for name, t in self.to_dict().items())
+
+
+class NullTimeline:
+    """시작 시간 측정 끔"""
+
+    enabled = False
+    marks = {}
+
+    @staticmethod
+    def mark(name):
+        pass
+
+    @staticmethod
+    def to_dict():
+        return {}
+
+    @staticmethod
+    def report():
+        return ""
+
+
+NULL_TIMELINE = NullTimeline()
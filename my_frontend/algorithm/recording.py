@@ -0,0 +1,211 @@
+import struct
+import time
+
+import numpy as np
+
+from my_frontend.algorithm.drowsiness import DrowsinessDetector
+from my_frontend.algorithm.eye_detect import detect_eye_state
+from my_frontend.algorithm.head_pose import get_head_pose
+from my_frontend.algorithm.landmarks import FEATURE_INDEX, is_compact, landmark_rows
+
+# ===== 파일 형식 (.lmrec) =====
+# [헤더 64B] magic, version, n_landmarks, n_stored, width, height
+# [인덱스]   저장한 랜드마크 번호 n_stored 개 (uint16)
+# [레코드]   DATA_ALIGN 정렬 위치부터 고정 길이 레코드 반복 → np.memmap 으로 바로 읽힘
+MAGIC = b"LMREC\x00\x00\x00"
+VERSION = 1
+HEADER = struct.Struct("<8sIIIII")
+HEADER_SIZE = 64
+DATA_ALIGN = 64
+NUM_LANDMARKS = 478  # refine_landmarks=True 기준
+
+
+def record_dtype(n_stored):
+    """프레임 하나의 레코드 형식 (16 + 12 * n_stored 바이트)"""
+    return np.dtype([
+        ("timestamp", "<f8"),
+        ("has_face", "u1"),
+        ("_reserved", "V7"),
+        ("points", "<f4", (n_stored, 3)),
+    ])
+
+
+def _data_offset(n_stored):
+    offset = HEADER_SIZE + 2 * n_stored
+    return (offset + DATA_ALIGN - 1) // DATA_ALIGN * DATA_ALIGN
+
+
+class LandmarkRecorder:
+    """
+    프레임별 랜드마크 + timestamp 녹화
+    - 기본은 점수 계산에 쓰는 FEATURE_INDEX 랜드마크만 저장 (프레임당 184B)
+    - chunk 단위로 모아서 한 번에 기록
+    """
+
+    def __init__(self, path, width, height, index=FEATURE_INDEX,
+                 n_landmarks=NUM_LANDMARKS, chunk=1024):
+        self.path = path
+        self.width = width
+        self.height = height
+        self.index = np.asarray(index if index is not None else range(n_landmarks), dtype=np.uint16)
+        self.n_landmarks = n_landmarks
+
+        self._compact_rows = None  # compact 배열 (analysis.detect_points) 에서 index 의 행 번호
+
+        self._chunk = np.zeros(chunk, dtype=record_dtype(len(self.index)))
+        self._pending = 0
+        self.frames = 0
+
+        self._file = open(path, "wb")
+        header = HEADER.pack(MAGIC, VERSION, n_landmarks, len(self.index), width, height)
+        self._file.write(header.ljust(HEADER_SIZE, b"\x00"))
+        self._file.write(self.index.astype("<u2").tobytes())
+        self._file.write(b"\x00" * (_data_offset(len(self.index)) - self._file.tell()))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, timestamp, points):
+        """points: (N, 3) 랜드마크 배열 (전체 또는 FEATURE_INDEX compact), 얼굴이 없으면 None"""
+        rec = self._chunk[self._pending]
+        rec["timestamp"] = timestamp
+        rec["has_face"] = points is not None
+        if points is not None:
+            rec["points"] = points[self._rows(points)]
+
+        self._pending += 1
+        self.frames += 1
+        if self._pending == len(self._chunk):
+            self.flush()
+
+    def write_batch(self, timestamps, points, has_face=None):
+        """points: (frames, N, 3)"""
+        self.flush()
+        recs = np.zeros(len(timestamps), dtype=self._chunk.dtype)
+        recs["timestamp"] = timestamps
+        recs["has_face"] = True if has_face is None else has_face
+        recs["points"] = points[:, self._rows(points)]
+        self._file.write(recs.tobytes())
+        self.frames += len(recs)
+
+    def _rows(self, points):
+        if not is_compact(points):
+            return self.index
+        if self._compact_rows is None:
+            self._compact_rows = landmark_rows(points, self.index)
+        return self._compact_rows
+
+    def flush(self):
+        if self._pending:
+            self._file.write(self._chunk[:self._pending].tobytes())
+            self._pending = 0
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+
+class Recording:
+    """녹화 파일을 memmap 으로 연 결과 (복사 없이 읽기)"""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            magic, version, n_landmarks, n_stored, width, height = HEADER.unpack(
+                f.read(HEADER_SIZE)[:HEADER.size]
+            )
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"not a landmark recording: {path}")
+            self.index = np.frombuffer(f.read(2 * n_stored), dtype="<u2").astype(np.intp)
+
+        self.path = path
+        self.n_landmarks = n_landmarks
+        self.width = width
+        self.height = height
+        self.records = np.memmap(
+            path, dtype=record_dtype(n_stored), mode="r", offset=_data_offset(n_stored)
+        )
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def timestamps(self):
+        return self.records["timestamp"]
+
+    @property
+    def has_face(self):
+        return self.records["has_face"].astype(bool)
+
+    def points(self, start=0, stop=None):
+        """[start, stop) 프레임을 (frames, N, 3) 배열로 펼침 (저장 안 한 랜드마크는 0)"""
+        stored = self.records["points"][start:stop]
+        out = np.zeros((len(stored), self.n_landmarks, 3), dtype=np.float32)
+        out[:, self.index] = stored
+        return out
+
+
+def replay(recording, detector=None, timings=False):
+    """
+    녹화를 detect_eye_state → get_head_pose → DrowsinessDetector.update 로 최대 속도 재생
+    - recording: 파일 경로 또는 Recording
+    - timings=True 면 단계별 누적 시간(초)도 반환
+    - 반환: (마지막 detector 출력, 처리 프레임 수, 단계별 시간 dict 또는 None)
+    """
+    if not isinstance(recording, Recording):
+        recording = Recording(recording)
+
+    records = recording.records
+    if detector is None:
+        start = float(records["timestamp"][0]) if len(records) else None
+        detector = DrowsinessDetector(start_time=start)
+
+    w, h = recording.width, recording.height
+    index = recording.index
+    # 기본 녹화 (FEATURE_INDEX 만 저장) 는 저장된 행이 그대로 compact 배열
+    compact = np.array_equal(index, FEATURE_INDEX)
+    points = np.zeros((recording.n_landmarks, 3), dtype=np.float32)
+
+    stage = {"load": 0.0, "eye": 0.0, "head": 0.0, "score": 0.0} if timings else None
+    clock = time.perf_counter
+
+    out = None
+    frames = 0
+    for rec in records:
+        if not rec["has_face"]:
+            continue
+
+        if stage is None:
+            if compact:
+                points = rec["points"]
+            else:
+                points[index] = rec["points"]
+            eye_state, ear = detect_eye_state(points, w, h)
+            pitch, yaw = get_head_pose(points, w, h)
+            out = detector.update(ear, eye_state, pitch, float(rec["timestamp"]))
+        else:
+            t0 = clock()
+            if compact:
+                points = rec["points"]
+            else:
+                points[index] = rec["points"]
+            t1 = clock()
+            eye_state, ear = detect_eye_state(points, w, h)
+            t2 = clock()
+            pitch, yaw = get_head_pose(points, w, h)
+            t3 = clock()
+            out = detector.update(ear, eye_state, pitch, float(rec["timestamp"]))
+            t4 = clock()
+
+            stage["load"] += t1 - t0
+            stage["eye"] += t2 - t1
+            stage["head"] += t3 - t2
+            stage["score"] += t4 - t3
+
+        frames += 1
+
+    return out, frames, stage
@@ -0,0 +1,316 @@
+"""
+여러 카메라 / 영상을 화면 출력 없이 동시에 분석하는 서비스
+
+    python -m my_frontend.algorithm.service 0 1 cabin.mp4 --workers 2
+    python -m my_frontend.algorithm.service 0 1 --upload http://localhost:8000 --user-id bus-17
+
+소스마다 상태를 한 줄씩 (JSON) 출력하고, stats_interval 초마다 소스별 fps / 지연 / 버린 프레임 출력
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import deque
+
+import cv2
+
+from my_frontend.algorithm.analysis import create_face_mesh, warm_up_face_mesh, detect_points, score_points
+from my_frontend.algorithm.drowsiness import DrowsinessDetector
+from my_frontend.algorithm.uploader import Uploader
+
+
+def open_source(spec):
+    """"0" 같은 숫자는 카메라 번호, 나머지는 파일 / 스트림 주소"""
+    return cv2.VideoCapture(int(spec) if spec.isdigit() else spec)
+
+
+class Source:
+    """
+    영상 소스 하나 (캡처 스레드 + 소스별 detector 상태)
+    - 캡처 스레드는 최신 프레임 하나만 남김 → 추론이 밀리면 그 사이 프레임은 버림
+    - 파일은 realtime 이면 영상 fps 에 맞춰 읽음 (카메라처럼 동작, 아니면 최대 속도)
+    - 파일의 점수 계산 / 전송 시각은 영상 안의 시각 (열린 시각 + CAP_PROP_POS_MSEC)
+      → 읽는 속도나 버린 프레임과 상관없이 윈도우 통계가 영상 시간 기준
+    """
+
+    def __init__(self, name, spec, realtime=True, uploader=None):
+        self.name = name
+        self.spec = spec
+        self.realtime = realtime and not str(spec).isdigit()
+        self.uploader = uploader
+        self.detector = DrowsinessDetector()
+
+        # 스케줄러 잠금 안에서만 변경 (통계 포함, stats() 가 잠금 안에서 읽음)
+        self.pending = None  # (frame, captured_at, timestamp)
+        self.busy = False
+        self.finished = False
+
+        # 통계
+        self.captured = 0
+        self.processed = 0
+        self.dropped = 0
+        self.last_state = None
+        self.last_score = None
+        self._done_times = deque(maxlen=256)
+        self._lags = deque(maxlen=256)
+
+    def record(self, out, captured_at, done_at):
+        self.processed += 1
+        self._done_times.append(done_at)
+        self._lags.append(done_at - captured_at)
+        if out is not None:
+            self.last_state = out["state"]
+            self.last_score = out["score"]
+
+    def stats(self, now):
+        """최근 처리 기준 fps, 평균 / 최대 지연 (캡처 → 점수 계산 완료)"""
+        # 최근 5초 동안 처리한 프레임 수로 fps 계산
+        recent = [t for t in self._done_times if now - t <= 5.0]
+        fps = 0.0
+        if len(recent) > 1 and recent[-1] > recent[0]:
+            fps = (len(recent) - 1) / (recent[-1] - recent[0])
+        lags = list(self._lags)
+        return {
+            "captured": self.captured,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "fps": round(fps, 1),
+            "lag_ms": round(sum(lags) / len(lags) * 1000, 1) if lags else None,
+            "max_lag_ms": round(max(lags) * 1000, 1) if lags else None,
+            "state": self.last_state,
+            "score": self.last_score,
+        }
+
+
+class InferenceService:
+    """
+    N 개 소스를 고정 크기 워커 풀에서 같이 추론
+    - 워커마다 FaceMesh 하나 (static_image_mode, 여러 소스 프레임을 번갈아 처리하므로)
+    - 스케줄링: 새 프레임이 있고 처리 중이 아닌 소스를 커서 다음부터 차례로 선택 (round-robin)
+      → 한 소스가 빨라도 다른 소스를 굶기지 않음, 소스별 프레임은 항상 순서대로 한 번에 하나
+    - 코어가 부족하면 밀린 프레임은 최신 것만 남기고 버림 (지연이 쌓이지 않음)
+      max_lag 초보다 오래된 프레임은 추론하지 않고 버림
+    - 화면 출력 없음, 결과는 on_result(source, out, timestamp) 콜백 (얼굴 없으면 out=None)
+    """
+
+    def __init__(self, sources, workers=2, refine_landmarks=False, max_lag=0.5, on_result=None):
+        self.sources = sources
+        self.workers = workers
+        self.refine_landmarks = refine_landmarks
+        self.max_lag = max_lag
+        self.on_result = on_result
+
+        self._cond = threading.Condition()
+        self._cursor = 0
+        self._stop = threading.Event()
+        self._threads = []
+
+    # ===== 캡처 =====
+
+    def _capture_loop(self, source):
+        cap = open_source(source.spec)
+        interval = 0.0
+        if source.realtime:
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            interval = 1.0 / fps if fps and fps > 0 else 0.0
+        next_at = time.monotonic()
+
+        # 길이가 있는 영상 파일은 영상 안의 시각 사용 (카메라 / 실시간 스트림은 캡처 시각)
+        origin = None
+        if not str(source.spec).isdigit() and cap.get(cv2.CAP_PROP_FRAME_COUNT) > 0:
+            origin = time.time()
+            source.detector = DrowsinessDetector(start_time=origin)
+
+        try:
+            while not self._stop.is_set() and cap.isOpened():
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                captured_at = time.time()
+                timestamp = captured_at
+                if origin is not None:
+                    timestamp = origin + cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+                self._offer(source, frame, captured_at, timestamp)
+
+                if interval:
+                    next_at += interval
+                    delay = next_at - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                    else:
+                        next_at = time.monotonic()
+        finally:
+            cap.release()
+            with self._cond:
+                source.finished = True
+                self._cond.notify_all()
+
+    def _offer(self, source, frame, captured_at, timestamp):
+        with self._cond:
+            source.captured += 1
+            if source.pending is not None:
+                source.dropped += 1
+            source.pending = (frame, captured_at, timestamp)
+            self._cond.notify()
+
+    # ===== 스케줄링 / 추론 =====
+
+    def _next_job(self):
+        sources = self.sources
+        n = len(sources)
+        with self._cond:
+            while not self._stop.is_set():
+                for k in range(n):
+                    i = (self._cursor + k) % n
+                    source = sources[i]
+                    if source.pending is None or source.busy:
+                        continue
+                    frame, captured_at, timestamp = source.pending
+                    source.pending = None
+                    if time.time() - captured_at > self.max_lag:
+                        source.dropped += 1
+                        continue
+                    source.busy = True
+                    self._cursor = i + 1
+                    return source, frame, captured_at, timestamp
+
+                if all(s.finished and s.pending is None for s in sources):
+                    return None
+                self._cond.wait(0.1)
+        return None
+
+    def _worker_loop(self):
+        face_mesh = warm_up_face_mesh(create_face_mesh(
+            max_num_faces=1, refine_landmarks=self.refine_landmarks, static_image_mode=True
+        ))
+        try:
+            while True:
+                job = self._next_job()
+                if job is None:
+                    break
+                source, frame, captured_at, timestamp = job
+                try:
+                    self._process(face_mesh, source, frame, captured_at, timestamp)
+                finally:
+                    with self._cond:
+                        source.busy = False
+                        self._cond.notify()
+        finally:
+            face_mesh.close()
+
+    def _process(self, face_mesh, source, frame, captured_at, timestamp):
+        """captured_at: 캡처 시각 (지연 측정용), timestamp: 점수 계산 / 전송 시각"""
+        h, w, _ = frame.shape
+        points = detect_points(face_mesh, frame)
+
+        out = None
+        if points is not None:
+            out = score_points(source.detector, points, w, h, timestamp)
+            if source.uploader is not None:
+                source.uploader.submit(out, timestamp)
+
+        with self._cond:
+            source.record(out, captured_at, time.time())
+        if self.on_result is not None:
+            self.on_result(source, out, timestamp)
+
+    # ===== 실행 =====
+
+    def start(self):
+        for source in self.sources:
+            self._threads.append(threading.Thread(
+                target=self._capture_loop, args=(source,), name=f"capture-{source.name}", daemon=True
+            ))
+        for i in range(self.workers):
+            self._threads.append(threading.Thread(
+                target=self._worker_loop, name=f"inference-{i}", daemon=True
+            ))
+        for t in self._threads:
+            t.start()
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        for t in self._threads:
+            t.join(timeout)
+        for source in self.sources:
+            if source.uploader is not None:
+                source.uploader.close()
+
+    @property
+    def running(self):
+        return any(t.is_alive() for t in self._threads)
+
+    def stats(self):
+        now = time.time()
+        with self._cond:
+            return {source.name: source.stats(now) for source in self.sources}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="headless multi-camera drowsiness service")
+    parser.add_argument("sources", nargs="+", help="카메라 번호 또는 영상 파일 / 스트림 주소")
+    parser.add_argument("--workers", type=int, default=2, help="추론 워커 스레드 수")
+    parser.add_argument("--max-lag", type=float, default=0.5, help="이보다 오래된 프레임은 버림(초)")
+    parser.add_argument("--stats-interval", type=float, default=5.0, help="통계 출력 주기(초)")
+    parser.add_argument("--duration", type=float, help="이 시간(초) 후 종료")
+    parser.add_argument("--no-realtime", action="store_true", help="영상 파일을 fps 에 맞추지 않고 최대 속도로 읽기")
+    parser.add_argument("--refine", action="store_true", help="홍채 랜드마크 refine 켜기")
+    parser.add_argument("--quiet", action="store_true", help="상태 변화 출력 끄기 (통계만)")
+    parser.add_argument("--upload", help="결과를 보낼 백엔드 주소")
+    parser.add_argument("--user-id", default="default_user", help="소스별 사용자 id 앞부분 ({user-id}-{소스 번호})")
+    args = parser.parse_args(argv)
+
+    sources = [
+        Source(
+            str(i), spec,
+            realtime=not args.no_realtime,
+            uploader=Uploader(args.upload, user_id=f"{args.user_id}-{i}") if args.upload else None,
+        )
+        for i, spec in enumerate(args.sources)
+    ]
+
+    last_states = {}
+
+    def on_result(source, out, timestamp):
+        # 상태가 바뀔 때만 출력
+        state = out["state"] if out is not None else None
+        if args.quiet or last_states.get(source.name, "") == state:
+            return
+        last_states[source.name] = state
+        print(json.dumps({
+            "source": source.name,
+            "timestamp": timestamp,
+            "state": state,
+            "score": out["score"] if out is not None else None,
+        }), flush=True)
+
+    service = InferenceService(
+        sources, workers=args.workers, refine_landmarks=args.refine,
+        max_lag=args.max_lag, on_result=on_result,
+    )
+    service.start()
+
+    started = time.monotonic()
+    next_stats = started + args.stats_interval
+    try:
+        while service.running:
+            if args.duration is not None and time.monotonic() - started >= args.duration:
+                break
+            time.sleep(0.1)
+            if time.monotonic() >= next_stats:
+                next_stats += args.stats_interval
+                print(json.dumps({"stats": service.stats()}), flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        print(json.dumps({"stats": service.stats()}), flush=True)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
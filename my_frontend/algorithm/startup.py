@@ -0,0 +1,61 @@
+import threading
+
+from my_frontend.algorithm.profiling import NULL_TIMELINE
+
+
+class BackgroundWarmup:
+    """
+    모델 생성 + 워밍업을 백그라운드 스레드에서 실행
+    - 그동안 메인 스레드는 카메라를 열고 화면을 그림
+    - factory() 의 반환값은 result() 로 받음 (예외가 났으면 result() 에서 다시 발생)
+    """
+
+    def __init__(self, factory, timeline=NULL_TIMELINE, name="model"):
+        self._factory = factory
+        self._timeline = timeline
+        self._name = name
+        self._done = threading.Event()
+        self._value = None
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name=f"warmup-{name}", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            self._value = self._factory()
+            self._timeline.mark(f"{self._name}_ready")
+        except BaseException as e:
+            self._error = e
+        finally:
+            self._done.set()
+
+    @property
+    def ready(self):
+        return self._done.is_set()
+
+    def result(self, timeout=None):
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"{self._name} warm-up not finished")
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+
+class DeferredDetect:
+    """
+    워밍업이 끝나기 전까지는 None (얼굴 없음) 을 돌려주는 detect
+    - 카메라 화면은 모델 준비를 기다리지 않고 바로 표시
+    - 준비되면 make_detect(모델) 로 만든 실제 detect 로 바뀜 (이후에는 호출 한 번 추가 비용만)
+    """
+
+    def __init__(self, warmup, make_detect):
+        self._warmup = warmup
+        self._make_detect = make_detect
+        self._detect = None
+
+    def __call__(self, frame):
+        if self._detect is None:
+            if not self._warmup.ready:
+                return None
+            self._detect = self._make_detect(self._warmup.result())
+        return self._detect(frame)
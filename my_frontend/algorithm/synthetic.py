@@ -0,0 +1,90 @@
+import numpy as np
+
+from my_frontend.algorithm.landmarks import LEFT_EYE, RIGHT_EYE, NOSE_TIP, CHIN
+from my_frontend.algorithm.recording import LandmarkRecorder, NUM_LANDMARKS
+
+# 눈 한쪽 반폭 (가로 픽셀 대비 비율)
+EYE_HALF_WIDTH = 0.05
+
+
+def _blink_mask(timestamps, rng, rate_per_min, min_dur, max_dur):
+    """깜빡임(눈 감음) 구간이면 True"""
+    duration = timestamps[-1] - timestamps[0] if len(timestamps) else 0.0
+    n = rng.poisson(rate_per_min * duration / 60.0 * 1.2) + 1
+    starts = timestamps[0] + np.cumsum(rng.exponential(60.0 / max(rate_per_min, 1e-6), n))
+    ends = starts + rng.uniform(min_dur, max_dur, n)
+
+    # 각 프레임 직전에 시작한 깜빡임이 아직 안 끝났으면 감은 상태
+    k = np.searchsorted(starts, timestamps, side="right") - 1
+    closed = k >= 0
+    closed[closed] = timestamps[closed] < ends[k[closed]]
+    return closed
+
+
+def synthetic_features(duration=600.0, fps=30.0, drowsy_after=None, seed=0):
+    """
+    카메라 없이 쓰는 합성 세션의 프레임별 (timestamp, ear, pitch)
+    - 평상시: 분당 ~15회, 0.1~0.3초 깜빡임, pitch 는 0 근처
+    - drowsy_after 초 이후: 1.5~3초씩 눈 감음, 고개 숙임 (pitch ~25)
+    """
+    rng = np.random.default_rng(seed)
+    timestamps = np.arange(int(duration * fps)) / fps
+
+    ear = rng.normal(0.30, 0.01, len(timestamps))
+    pitch = rng.normal(0.0, 3.0, len(timestamps))
+    closed = _blink_mask(timestamps, rng, 15, 0.1, 0.3)
+
+    if drowsy_after is not None:
+        late = timestamps >= drowsy_after
+        late_closed = _blink_mask(timestamps, rng, 10, 1.5, 3.0)
+        closed = np.where(late, late_closed, closed)
+        pitch = np.where(late, rng.normal(25.0, 4.0, len(timestamps)), pitch)
+
+    ear[closed] = rng.normal(0.12, 0.01, int(closed.sum()))
+    return timestamps, ear, pitch
+
+
+def features_to_points(ear, pitch, width=640, height=480, n_landmarks=NUM_LANDMARKS):
+    """
+    EAR / pitch 배열 → 그 값이 그대로 나오는 (frames, N, 3) 랜드마크
+    - 눈: 양 끝점 거리 2a, 위/아래 점 세로 거리 v 면 EAR = v / 2a
+    - 턱 - 코 세로 거리 = 80 + 2 * pitch 픽셀 (head_pose 근사식의 역)
+    """
+    frames = len(ear)
+    points = np.zeros((frames, n_landmarks, 3), dtype=np.float32)
+
+    a = EYE_HALF_WIDTH * width
+    v = np.asarray(ear) * 2 * a
+    for eye, cx in ((LEFT_EYE, 0.4 * width), (RIGHT_EYE, 0.6 * width)):
+        cy = 0.4 * height
+        p0, p1, p2, p3, p4, p5 = eye
+        points[:, p0, 0], points[:, p0, 1] = cx - a, cy
+        points[:, p3, 0], points[:, p3, 1] = cx + a, cy
+        for upper, lower, x in ((p1, p5, cx - a / 3), (p2, p4, cx + a / 3)):
+            points[:, upper, 0] = points[:, lower, 0] = x
+            points[:, upper, 1] = cy - v / 2
+            points[:, lower, 1] = cy + v / 2
+
+    nose_y = 0.5 * height
+    points[:, NOSE_TIP, 0], points[:, NOSE_TIP, 1] = 0.5 * width, nose_y
+    points[:, CHIN, 0] = 0.5 * width
+    points[:, CHIN, 1] = nose_y + 80 + 2 * np.asarray(pitch)
+
+    points[..., 0] /= width
+    points[..., 1] /= height
+    return points
+
+
+def write_synthetic(path, duration=600.0, fps=30.0, drowsy_after=None, seed=0,
+                    width=640, height=480, start_time=0.0, chunk=4096):
+    """합성 세션을 녹화 파일(.lmrec)로 저장, 저장한 프레임 수 반환"""
+    timestamps, ear, pitch = synthetic_features(duration, fps, drowsy_after, seed)
+
+    with LandmarkRecorder(path, width, height) as rec:
+        for i in range(0, len(timestamps), chunk):
+            sl = slice(i, i + chunk)
+            rec.write_batch(
+                start_time + timestamps[sl],
+                features_to_points(ear[sl], pitch[sl], width, height)
+            )
+        return rec.frames
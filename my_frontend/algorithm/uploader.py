@@ -0,0 +1,309 @@
+import gzip
+import http.client
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+BATCH_PATH = "/drowsy/batch"
+
+# 기본 spool 위치 (사용자별 하위 디렉터리)
+SPOOL_ROOT = os.environ.get(
+    "DROWSY_SPOOL_DIR", os.path.join(os.path.expanduser("~"), ".drowsy", "spool")
+)
+CONNECT_ATTEMPTS = 2  # _post 한 번의 연결 시도 수 (끊긴 keep-alive 연결 재시도 포함)
+
+
+def default_spool_dir(user_id):
+    """user_id 별 기본 spool 디렉터리 (한 프로세스에 업로더가 여러 개여도 파일 번호가 겹치지 않게)"""
+    return os.path.join(SPOOL_ROOT, re.sub(r"[^\w.-]", "_", user_id) or "_")
+
+
+class Uploader:
+    """
+    detector.update 결과를 백엔드 /drowsy/batch 로 보내는 백그라운드 업로더
+    - submit(): 메모리 큐에 넣기만 함 (감지 루프를 절대 막지 않음, 큐가 차면 가장 오래된 샘플 버림)
+    - batch_size 개가 모이거나 max_delay 초가 지나면 NDJSON + gzip 한 번에 전송
+    - keep-alive 연결 하나를 계속 재사용 (끊기면 다시 연결)
+    - 전송 실패(오프라인, 503) 시 배치를 spool_dir 에 파일로 저장 → 다시 연결되면 오래된 것부터 전송
+      (spool 이 비기 전까지 새 배치도 spool 뒤에 쌓아서 순서 유지, 용량을 넘으면 가장 오래된 파일 삭제)
+    - spool_dir: None 이면 default_spool_dir(user_id), 빈 문자열이면 spool 없음 (실패한 배치는 버림)
+    """
+
+    def __init__(
+        self,
+        url,
+        user_id="default_user",
+        batch_size=200,
+        max_delay=1.0,
+        queue_size=10_000,
+        spool_dir=None,
+        spool_max_bytes=64 * 1024 * 1024,
+        timeout=5.0,
+        compress=True,
+        retry_base=1.0,
+        retry_max=30.0,
+    ):
+        parts = urlsplit(url)
+        self._https = parts.scheme == "https"
+        self._host = parts.hostname
+        self._port = parts.port
+        self._path = (parts.path.rstrip("/") or "") + BATCH_PATH
+
+        self.user_id = user_id
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.compress = compress
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+
+        if spool_dir is None:
+            spool_dir = default_spool_dir(user_id)
+        self.spool_dir = spool_dir or None
+        self.spool_max_bytes = spool_max_bytes
+        self._spool = deque()  # (seq, path, size, 샘플 수), 오래된 순
+        self._spool_bytes = 0
+        self._seq = 0
+        if self.spool_dir is not None:
+            os.makedirs(self.spool_dir, exist_ok=True)
+            self._load_spool()
+
+        self._queue = deque(maxlen=queue_size)
+        self._wake = threading.Event()
+        self._closed = False
+        self._close_deadline = None
+        self._conn = None
+        self._retry_at = 0.0
+        self._failures = 0
+
+        # 통계
+        self.submitted = 0
+        self.dropped = 0  # 큐가 가득 차서 버린 샘플
+        self.sent = 0
+        self.rejected = 0  # 서버가 거부한 (4xx) 샘플
+        self.spooled = 0
+        self.spool_dropped = 0  # spool 용량 초과로 버린 배치
+        self.bytes_sent = 0
+
+        self._thread = threading.Thread(target=self._run, name="uploader", daemon=True)
+        self._thread.start()
+
+    def stats(self):
+        return {
+            "submitted": self.submitted,
+            "dropped": self.dropped,
+            "sent": self.sent,
+            "rejected": self.rejected,
+            "spooled": self.spooled,
+            "spool_dropped": self.spool_dropped,
+            "spool_files": len(self._spool),
+            "spool_bytes": self._spool_bytes,
+            "queued": len(self._queue),
+            "bytes_sent": self.bytes_sent,
+        }
+
+    # ===== 감지 루프 쪽 =====
+
+    def submit(self, out, timestamp):
+        """detector.update 결과 하나 추가 (항상 바로 반환)"""
+        if len(self._queue) == self._queue.maxlen:
+            self.dropped += 1
+        self._queue.append((timestamp, out["state"], out["score"]))
+        self.submitted += 1
+        if len(self._queue) >= self.batch_size:
+            self._wake.set()
+
+    def close(self, timeout=None):
+        """
+        남은 샘플을 보내고 (안 되면 spool 에 저장) 종료
+        - timeout: 전송에 쓸 시간 (기본: _post 한 번의 최대 시간), 지나면 남은 큐는 보내지 않고 spool 에 저장
+        - 진행 중이던 전송 하나가 끝날 때까지 기다리므로 최대 timeout + _post 한 번 + spool 기록 시간
+        """
+        budget = self._post_budget()
+        if timeout is None:
+            timeout = budget
+        self._close_deadline = time.monotonic() + timeout
+        self._closed = True
+        self._wake.set()
+        self._thread.join(timeout + budget + 1.0)
+        if self._conn is not None:
+            self._conn.close()
+
+    def _post_budget(self):
+        # 시도마다 연결 + 응답 대기에 각각 최대 timeout
+        return CONNECT_ATTEMPTS * 2 * self.timeout
+
+    # ===== 전송 스레드 =====
+
+    def _run(self):
+        while True:
+            if not self._closed and len(self._queue) < self.batch_size:
+                self._wake.wait(self.max_delay)
+            self._wake.clear()
+            closed = self._closed
+
+            while self._queue:
+                batch = self._take()
+                body = self._encode(batch)
+                # spool 에 밀린 배치가 있으면 순서를 지키기 위해 뒤에 붙임
+                if self._spool or not self._send_now(body, len(batch)):
+                    self._spool_write(body, len(batch))
+                if not closed and len(self._queue) < self.batch_size:
+                    break
+
+            self._drain_spool()
+
+            if closed and not self._queue:
+                return
+
+    def _take(self):
+        batch = []
+        queue = self._queue
+        while queue and len(batch) < self.batch_size:
+            batch.append(queue.popleft())
+        return batch
+
+    def _encode(self, batch):
+        user_id = self.user_id
+        lines = [
+            json.dumps({"timestamp": ts, "state": state, "drowsy_level": score, "user_id": user_id})
+            for ts, state, score in batch
+        ]
+        body = "\n".join(lines).encode()
+        return gzip.compress(body, compresslevel=6) if self.compress else body
+
+    def _send_now(self, body, n):
+        """재시도 대기 중이 아니면 바로 전송, 성공(또는 복구 불가능한 거부)이면 True"""
+        now = time.monotonic()
+        if now < self._retry_at:
+            return False
+        # 종료 중 전송 시간을 다 쓰면 남은 배치는 spool 로
+        if self._close_deadline is not None and now >= self._close_deadline:
+            return False
+        return self._post(body, n)
+
+    def _drain_spool(self):
+        """spool 을 오래된 것부터 전송 (실패하면 다음 기회에, 종료 시 남은 것은 다음 실행 때)"""
+        while self._spool:
+            seq, path, size, n = self._spool[0]
+            try:
+                with open(path, "rb") as f:
+                    body = f.read()
+            except OSError:
+                body = None
+            if body is not None and not self._send_now(body, n):
+                return
+            self._spool.popleft()
+            self._spool_bytes -= size
+            _remove(path)
+
+    def _post(self, body, n):
+        headers = {
+            "Content-Type": "application/x-ndjson",
+            "Connection": "keep-alive",
+        }
+        if self.compress:
+            headers["Content-Encoding"] = "gzip"
+
+        for attempt in range(CONNECT_ATTEMPTS):
+            try:
+                conn = self._connection()
+                conn.request("POST", self._path, body=body, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                break
+            except (OSError, http.client.HTTPException):
+                # 서버가 keep-alive 연결을 끊었을 수 있으므로 한 번은 새 연결로 재시도
+                self._reset_connection()
+                if attempt == CONNECT_ATTEMPTS - 1:
+                    self._backoff()
+                    return False
+
+        status = response.status
+        if status < 300:
+            self.sent += n
+            self.bytes_sent += len(body)
+            self._failures = 0
+            self._retry_at = 0.0
+            return True
+        if status in (429, 502, 503, 504):
+            retry_after = response.getheader("Retry-After")
+            self._backoff(float(retry_after) if retry_after and retry_after.isdigit() else None)
+            return False
+        # 잘못된 데이터 등 → 다시 보내도 같은 결과이므로 버림
+        self.rejected += n
+        return True
+
+    def _connection(self):
+        if self._conn is None:
+            cls = http.client.HTTPSConnection if self._https else http.client.HTTPConnection
+            self._conn = cls(self._host, self._port, timeout=self.timeout)
+        return self._conn
+
+    def _reset_connection(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _backoff(self, delay=None):
+        self._failures += 1
+        if delay is None:
+            delay = min(self.retry_max, self.retry_base * 2 ** (self._failures - 1))
+            delay = random.uniform(0.5 * delay, delay)
+        self._retry_at = time.monotonic() + delay
+
+    # ===== spool =====
+
+    def _load_spool(self):
+        # 기록 도중 종료되어 남은 임시 파일 정리 (os.replace 전이라 완성되지 않은 배치)
+        for name in os.listdir(self.spool_dir):
+            if name.endswith(".batch.tmp"):
+                _remove(os.path.join(self.spool_dir, name))
+
+        names = sorted(n for n in os.listdir(self.spool_dir) if n.endswith(".batch"))
+        for name in names:
+            path = os.path.join(self.spool_dir, name)
+            size = os.path.getsize(path)
+            seq, n = name.split(".")[0].split("-")
+            self._spool.append((int(seq), path, size, int(n)))
+            self._spool_bytes += size
+        if self._spool:
+            self._seq = self._spool[-1][0] + 1
+
+    def _spool_write(self, body, n):
+        if self.spool_dir is None:
+            self.spool_dropped += 1
+            return
+
+        # 용량을 넘으면 가장 오래된 배치부터 버림
+        while self._spool and self._spool_bytes + len(body) > self.spool_max_bytes:
+            _, path, size, _ = self._spool.popleft()
+            self._spool_bytes -= size
+            self.spool_dropped += 1
+            _remove(path)
+
+        path = os.path.join(self.spool_dir, f"{self._seq:012d}-{n}.batch")
+        tmp = path + ".tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(body)
+            os.replace(tmp, path)
+        except OSError:
+            self.spool_dropped += 1
+            return
+        self._spool.append((self._seq, path, len(body), n))
+        self._spool_bytes += len(body)
+        self._seq += 1
+        self.spooled += 1
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -1,35 +1,60 @@
-from kivy.core.text import LabelBase
+import time
+
+# 시작 시간 기준점 (kivy import 전에)
+_STARTED = time.perf_counter()
+
 import os
 
+from kivy.app import App
+from kivy.core.text import LabelBase
+from kivy.core.window import Window
+
+from my_frontend.algorithm.profiling import StartupTimeline
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-LabelBase.register(
-    name="NanumBarunPen",
-    fn_regular=os.path.join(
-        BASE_DIR,
-        "App_sleep",
-        "fonts",
-        "NanumBarunpenR.ttf"
-    ),
-    fn_bold=os.path.join(
-        BASE_DIR,
-        "App_sleep",
-        "fonts",
-        "NanumBarunpenB.ttf"
-    ) if os.path.exists(os.path.join(BASE_DIR, "App_sleep", "fonts", "NanumBarunpenB.ttf")) else None
-)
+# 시작 단계별 경과 시간 (algorithm/main.py 와 같은 StartupTimeline)
+TIMELINE = StartupTimeline(origin=_STARTED)
+TIMELINE.mark("imports")
 
-print("✅ Nanum Barun Pen 폰트 로드 성공")
 
-print("✅ 한글 폰트 등록 완료")
+def register_fonts():
+    bold = os.path.join(BASE_DIR, "App_sleep", "fonts", "NanumBarunpenB.ttf")
+    LabelBase.register(
+        name="NanumBarunPen",
+        fn_regular=os.path.join(
+            BASE_DIR,
+            "App_sleep",
+            "fonts",
+            "NanumBarunpenR.ttf"
+        ),
+        fn_bold=bold if os.path.exists(bold) else None
+    )
 
+    print("✅ Nanum Barun Pen 폰트 로드 성공")
+
+    print("✅ 한글 폰트 등록 완료")
 
-from kivy.app import App
-from App_sleep.screens.sleep_mode_screen import SleepModeScreen
 
 class TestApp(App):
     def build(self):
+        # 화면 모듈은 여기서 import (앱 창 생성 전에 필요한 것만 먼저 로드)
+        from App_sleep.screens.sleep_mode_screen import SleepModeScreen
+
+        register_fonts()
+        TIMELINE.mark("build")
         return SleepModeScreen()
 
+    def on_start(self):
+        # on_start 는 첫 화면을 그리기 전 → 첫 프레임은 창이 처음 화면에 표시(flip)될 때 기록
+        TIMELINE.mark("start")
+        Window.bind(on_flip=self._on_first_frame)
+
+    def _on_first_frame(self, window):
+        window.unbind(on_flip=self._on_first_frame)
+        TIMELINE.mark("first_frame")
+        print(f"[startup] {TIMELINE.report()}")
+
+
 if __name__ == "__main__":
     TestApp().run()
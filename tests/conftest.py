@@ -0,0 +1,28 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# 프론트엔드는 저장소 루트에서 (my_frontend.algorithm.*), 백엔드는 backend/ 에서 (core.*, api.*) import
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, "backend")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+# 백엔드 저장소 / 타이머 / 알림은 모듈 import 시점에 환경변수를 읽으므로 먼저 임시 경로로 지정
+_TMP = tempfile.mkdtemp(prefix="drowsy-tests-")
+os.environ.setdefault("DROWSY_DB_PATH", os.path.join(_TMP, "events.db"))
+os.environ.setdefault("ESCALATION_DB", os.path.join(_TMP, "escalation.db"))
+os.environ.setdefault("ALARM_SESSION_DB", os.path.join(_TMP, "sessions.db"))
+os.environ.setdefault("NOTIFY_SINKS", "stub")
+
+
+@pytest.fixture(scope="session")
+def client():
+    """백엔드 앱 TestClient (lifespan 포함, 테스트 세션 동안 하나)"""
+    from fastapi.testclient import TestClient
+    from main import app
+
+    with TestClient(app) as c:
+        yield c
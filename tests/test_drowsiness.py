@@ -0,0 +1,181 @@
+import math
+from collections import deque
+
+import numpy as np
+import pytest
+
+from drowsy_common.detector_bank import DrowsinessDetectorBank
+from my_frontend.algorithm.calibration import CalibrationProfile, OnlineCalibration
+from my_frontend.algorithm.drowsiness import DrowsinessDetector
+
+START = 1000.0
+
+
+class _ReferenceDetector:
+    """
+    링버퍼 이전의 DrowsinessDetector (deque + 매 프레임 전체 합산)
+    - PERCLOS 만 누적 대신 최근 PERCLOS_WINDOW 초 (user-002 에서 바뀐 의미)
+    """
+
+    def __init__(self, start_time):
+        d = DrowsinessDetector
+        self.last_eye_state = "OPEN"
+        self.blink_times = deque()
+        self.closed = deque()
+        self.ear_history = deque()
+        self.avg_ear = None
+        self.baseline_blinks = 0
+        self.baseline_start = start_time
+        self.baseline_blink_rate = None
+        self.d = d
+
+    def update(self, ear, eye_state, pitch, timestamp):
+        d = self.d
+        if eye_state != "CLOSED" and self.last_eye_state == "CLOSED":
+            self.blink_times.append(timestamp)
+            if self.baseline_blink_rate is None:
+                self.baseline_blinks += 1
+        self.last_eye_state = eye_state
+
+        while self.blink_times and timestamp - self.blink_times[0] > d.BLINK_WINDOW:
+            self.blink_times.popleft()
+        blink_count = len(self.blink_times)
+
+        if self.baseline_blink_rate is None and timestamp - self.baseline_start >= d.BASELINE_TIME:
+            self.baseline_blink_rate = max(1, self.baseline_blinks)
+
+        blink_drop = 0.0
+        if self.baseline_blink_rate:
+            rate = self.baseline_blink_rate
+            blink_drop = float(np.clip((rate - blink_count) / rate, 0, 1))
+
+        self.closed.append((timestamp, eye_state == "CLOSED"))
+        while timestamp - self.closed[0][0] > d.PERCLOS_WINDOW:
+            self.closed.popleft()
+        perclos = sum(c for _, c in self.closed) / len(self.closed)
+
+        if ear is not None:
+            self.ear_history.append((timestamp, ear))
+        while self.ear_history and timestamp - self.ear_history[0][0] > d.EAR_BASELINE_WINDOW:
+            self.ear_history.popleft()
+        if len(self.ear_history) >= d.EAR_MIN_SAMPLES:
+            self.avg_ear = sum(e for _, e in self.ear_history) / len(self.ear_history)
+
+        ear_score = 0.0
+        if self.avg_ear and ear:
+            ear_score = float(np.clip((self.avg_ear - ear) / self.avg_ear, 0, 1))
+        head_score = float(np.clip((abs(pitch) - 15.0) / 15.0, 0, 1))
+        score = (
+            0.40 * ear_score
+            + 0.25 * float(np.clip(perclos / 0.4, 0, 1))
+            + 0.15 * blink_drop
+            + 0.20 * head_score
+        )
+        return {
+            "score": score,
+            "avg_ear": self.avg_ear,
+            "perclos": perclos,
+            "blink_count": blink_count,
+            "blink_drop": blink_drop,
+            "head_score": head_score,
+        }
+
+
+def _stream(seed, seconds, fps):
+    """(ear 또는 None, eye_state, pitch, timestamp) 프레임 목록 (지터, 얼굴 없음, 졸음 구간 포함)"""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * fps)
+    ts = START + np.cumsum(rng.uniform(0.5, 1.5, n) / fps)
+    ear = rng.normal(0.3, 0.03, n)
+    drowsy = (ts - START) % 120 > 80
+    ear[drowsy] -= 0.12
+    closed = (ear < 0.21) | (rng.random(n) < 0.03)
+    pitch = rng.normal(0, 10, n) + 25 * drowsy
+    missing = rng.random(n) < 0.05
+    return [
+        (None if missing[i] else float(ear[i]), "CLOSED" if closed[i] else "OPEN", float(pitch[i]), float(ts[i]))
+        for i in range(n)
+    ]
+
+
+@pytest.mark.parametrize("fps", [30, 90])
+def test_detector_matches_reference(fps):
+    detector = DrowsinessDetector(start_time=START)
+    reference = _ReferenceDetector(START)
+    for frame in _stream(fps, 200, fps):
+        got = detector.update(*frame)
+        want = reference.update(*frame)
+        for key, value in want.items():
+            if value is None:
+                assert got[key] is None, key
+            else:
+                assert math.isclose(got[key], value, rel_tol=1e-9, abs_tol=1e-12), key
+
+
+@pytest.mark.parametrize("fps, bounded", [(30, False), (120, False), (200, False), (30, True)])
+def test_bank_matches_detector(fps, bounded):
+    """
+    bank 는 세션별 detector 와 비트 단위로 같은 결과 (MAX_FPS 를 넘는 입력 포함)
+    - bounded (서버용) 는 MAX_FPS 이하 입력이면 같음
+    """
+    sessions = ["a", "b", "c"]
+    streams = {s: _stream(10 + i, 150, fps) for i, s in enumerate(sessions)}
+    detectors = {s: DrowsinessDetector(start_time=START) for s in sessions}
+    bank = DrowsinessDetectorBank(capacity=2, bounded=bounded)
+    for s in sessions:
+        bank.add_session(s, start_time=START)
+
+    for i in range(min(len(v) for v in streams.values())):
+        frames = [streams[s][i] for s in sessions]
+        outs = bank.update_batch(
+            sessions,
+            [np.nan if f[0] is None else f[0] for f in frames],
+            [f[1] for f in frames],
+            [f[2] for f in frames],
+            [f[3] for f in frames],
+        )
+        for k, s in enumerate(sessions):
+            want = detectors[s].update(*frames[k])
+            for key, value in want.items():
+                got = outs[key][k]
+                if value is None:
+                    assert np.isnan(got), key
+                elif isinstance(value, str):
+                    assert got == value, key
+                else:
+                    assert got == value, (key, got, value)
+
+
+def test_removed_session_slot_starts_fresh():
+    bank = DrowsinessDetectorBank(capacity=1)
+    for ts in np.arange(START, START + 5, 0.05):
+        bank.update_batch(["a"], [0.3], ["OPEN"], [0.0], [ts])
+    bank.remove_session("a")
+    bank.add_session("b", start_time=START + 5)
+    detector = DrowsinessDetector(start_time=START + 5)
+    out = bank.update_batch(["b"], [0.2], ["CLOSED"], [0.0], [START + 5])
+    want = detector.update(0.2, "CLOSED", 0.0, START + 5)
+    assert out["perclos"][0] == want["perclos"]
+    assert np.isnan(out["avg_ear"][0]) and want["avg_ear"] is None
+
+
+def test_calibrated_start_ramps_in():
+    """저장된 프로필로 시작하면 윈도우가 비어 있어도 졸음으로 보지 않음"""
+    profile = CalibrationProfile(blink_rate=15.0, ear_mean=0.3, seconds=600.0)
+    detector = DrowsinessDetector(start_time=START, calibration=OnlineCalibration(profile))
+
+    out = detector.update(0.3, "OPEN", 0.0, START)
+    assert out["blink_drop"] == 0.0
+    assert out["avg_ear"] == 0.3
+    assert out["state"] == "NORMAL"
+
+    # 분당 15번 깜빡이는 평소 상태를 유지하면 윈도우가 차는 동안 계속 NORMAL
+    ts = START
+    while ts < START + 2 * DrowsinessDetector.BLINK_WINDOW:
+        ts += 1 / 30
+        closed = (ts - START) % 4 < 0.1
+        out = detector.update(0.15 if closed else 0.3, "CLOSED" if closed else "OPEN", 0.0, ts)
+        # 기대 깜빡임 수가 경과 시간에 비례 → 첫 깜빡임 전 아주 작은 값 외에는 감소 없음
+        assert out["blink_drop"] < 0.01, ts - START
+        if not closed and ts - START > 5:
+            assert out["state"] == "NORMAL", ts - START
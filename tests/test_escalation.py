@@ -0,0 +1,246 @@
+import asyncio
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+
+import pytest
+
+from core import alarm_logic, escalation, notify_logic, session_store
+from core.escalation import EscalationScheduler
+from core.notify_logic import NotificationDispatcher, StubSink
+from core.session_store import MemorySessionStore, SQLiteSessionStore
+
+
+def _other_owner(pid):
+    return f"{socket.gethostname()}:{pid}"
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+async def _start_stop(scheduler):
+    await scheduler.start()
+    await scheduler.stop()
+
+
+@pytest.fixture
+def scheduler():
+    """저장하지 않는 scheduler + 메모리 세션 저장소로 교체 (테스트 후 원래대로)"""
+    old_scheduler, old_store = escalation._scheduler, session_store._store
+    s = EscalationScheduler()
+    alarm_logic.register_timers(s)
+    escalation.set_scheduler(s)
+    session_store.set_session_store(MemorySessionStore())
+    yield s
+    escalation.set_scheduler(old_scheduler)
+    session_store.set_session_store(old_store)
+
+
+# ===== 소유권 (lease) =====
+
+def test_second_worker_is_standby(tmp_path, monkeypatch):
+    monkeypatch.setattr(escalation, "LEASE_RENEW", 0.05)
+    path = str(tmp_path / "esc.db")
+    deadline = time.time() + 3600
+
+    async def scenario():
+        first = EscalationScheduler(path)
+        await first.start()
+        second = EscalationScheduler(path)
+        second.owner = _other_owner(1)  # pid 1 은 항상 살아 있음
+        await second.start()
+        assert not first.standby and second.standby
+
+        # standby 의 예약 / 취소는 owner 의 wheel 로 전달
+        second.schedule("u", "nap", deadline, {"minutes": 60})
+        assert second.deadline("u", "nap") == deadline
+        first._sync()
+        assert first.deadline("u", "nap") == deadline
+        assert second.cancel("u", "nap")
+        first._sync()
+        assert first.deadline("u", "nap") is None
+        assert len(second) == 0 and first.synced == 2
+
+        # owner 가 끝나면 standby 가 이어받아 남은 타이머를 불러옴
+        first.schedule("v", "nap", deadline)
+        await first.stop()
+        for _ in range(100):
+            if not second.standby:
+                break
+            await asyncio.sleep(0.01)
+        try:
+            assert not second.standby
+            assert second.deadline("v", "nap") == deadline and len(second) == 1
+        finally:
+            await second.stop()
+
+    _run(scenario())
+
+
+def test_lost_lease_stops_timers(tmp_path, monkeypatch):
+    monkeypatch.setattr(escalation, "LEASE_RENEW", 0.05)
+    path = str(tmp_path / "esc.db")
+    deadline = time.time() + 3600
+
+    async def scenario():
+        s = EscalationScheduler(path)
+        await s.start()
+        s.schedule("u", "nap", deadline)
+        # 다른 프로세스가 lease 를 가져감 (예: 이 프로세스가 LEASE_TTL 넘게 멈춘 사이)
+        conn = sqlite3.connect(path)
+        conn.execute("UPDATE escalation_lease SET owner = 'other-host:5'")
+        conn.commit()
+        conn.close()
+        for _ in range(100):
+            if s.standby:
+                break
+            await asyncio.sleep(0.01)
+        try:
+            assert s.standby and len(s) == 0
+            # 저장하지 않은 예약은 새 owner 가 반영하도록 변경 기록으로 넘김
+            assert s.deadline("u", "nap") == deadline
+            changes = s._connect().execute("SELECT user_id, kind, deadline FROM escalation_changes").fetchall()
+            assert changes == [("u", "nap", deadline)]
+        finally:
+            await s.stop()
+
+    _run(scenario())
+
+
+def test_dead_or_expired_owner_is_taken_over(tmp_path):
+    path = str(tmp_path / "esc.db")
+    EscalationScheduler(path)._connect().close()
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+
+    conn = sqlite3.connect(path)
+    for owner, expires in (
+        (_other_owner(proc.pid), time.time() + 100),  # 같은 호스트, 끝난 프로세스
+        ("other-host:5", time.time() - 1),  # 만료
+    ):
+        conn.execute("INSERT OR REPLACE INTO escalation_lease VALUES (1, ?, ?)", (owner, expires))
+        conn.commit()
+        _run(_start_stop(EscalationScheduler(path)))
+
+    # 다른 호스트의 만료되지 않은 lease 는 살아 있다고 봄 → standby
+    conn.execute("INSERT OR REPLACE INTO escalation_lease VALUES (1, 'other-host:5', ?)", (time.time() + 100,))
+    conn.commit()
+    s = EscalationScheduler(path)
+    _run(_start_stop(s))
+    assert s.standby
+    assert conn.execute("SELECT owner FROM escalation_lease").fetchone() == ("other-host:5",)
+    conn.close()
+
+
+def test_restart_restores_pending_timers(tmp_path):
+    path = str(tmp_path / "esc.db")
+    deadline = time.time() + 3600
+
+    async def first_run():
+        s = EscalationScheduler(path)
+        await s.start()
+        s.schedule("u", "nap", deadline, {"minutes": 60})
+        s.schedule("v", "nap", deadline)
+        s.cancel("v", "nap")
+        await s.stop()
+
+    async def second_run():
+        s = EscalationScheduler(path)
+        await s.start()
+        try:
+            return s.restored, s.deadline("u", "nap"), s.deadline("v", "nap")
+        finally:
+            await s.stop()
+
+    _run(first_run())
+    assert _run(second_run()) == (1, deadline, None)
+
+
+def test_timers_fire_without_polling():
+    fired = []
+
+    async def scenario():
+        s = EscalationScheduler()
+        s.register("ping", lambda user_id, payload: fired.append((user_id, payload)))
+        await s.start()
+        s.schedule_in("a", "ping", 0.15, 1)
+        s.schedule_in("b", "ping", 0.05, 2)
+        s.schedule_in("c", "ping", 0.1, 3)
+        s.cancel("c", "ping")
+        await asyncio.sleep(0.5)
+        await s.stop()
+
+    _run(scenario())
+    assert fired == [("b", 2), ("a", 1)]
+
+
+# ===== 알람 =====
+
+def test_retry_only_after_ack(scheduler):
+    assert alarm_logic.trigger_alarm("u")["count"] == 1
+    assert scheduler.deadline("u", alarm_logic.ALARM_TIMER) is None
+
+    alarm_logic.ack_alarm("u")
+    assert alarm_logic.trigger_alarm("u")["count"] == 2
+    assert scheduler.deadline("u", alarm_logic.ALARM_TIMER) is not None
+
+    # 응답 없이 재시도 → 다음 단계, 최대 횟수를 넘으면 재시도 중단
+    for count in (3, 4):
+        alarm_logic._on_alarm_timer("u", None)
+        assert session_store.get_session_store().get("u")["alarm_counter"] == count
+    alarm_logic._on_alarm_timer("u", None)
+    assert scheduler.deadline("u", alarm_logic.ALARM_TIMER) is None
+    assert alarm_logic.trigger_alarm("u")["status"] == "sleep_mode_locked"
+
+
+def test_nap_timeout_locks_without_counting(scheduler):
+    alarm_logic._on_nap_end("u", None)
+    assert scheduler.deadline("u", alarm_logic.NAP_RESPONSE_TIMER) is not None
+
+    alarm_logic._on_nap_response_timeout("u", None)
+    state = session_store.get_session_store().get("u")
+    assert state["sleep_mode_locked"] is True
+    assert state["alarm_counter"] == 0
+    assert not alarm_logic.check_sleep_mode_allowed("u")
+
+
+def test_sqlite_store_adds_alarm_retry_column(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE alarm_sessions (user_id TEXT PRIMARY KEY, alarm_counter INTEGER NOT NULL, "
+        "sleep_mode_locked INTEGER NOT NULL, updated REAL NOT NULL)"
+    )
+    conn.execute("INSERT INTO alarm_sessions VALUES ('x', 2, 0, ?)", (time.time(),))
+    conn.commit()
+    conn.close()
+
+    store = SQLiteSessionStore(path)
+    assert store.get("x") == {"alarm_counter": 2, "sleep_mode_locked": False, "alarm_retry": False}
+    store.update("x", alarm_logic._enable_retry)
+    assert store.get("x")["alarm_retry"] is True
+
+
+def test_scheduler_notifications_skip_debounce(scheduler):
+    sink = StubSink()
+    old_dispatcher = notify_logic._dispatcher
+
+    async def scenario():
+        dispatcher = NotificationDispatcher([sink])
+        notify_logic.set_dispatcher(dispatcher)
+        await dispatcher.start()
+        # 졸음 샘플 알림 직후 낮잠 만료 → debounce 안이라도 기상 알림은 따로 보냄
+        dispatcher.submit("u", "DROWSY")
+        await asyncio.sleep(0.05)
+        await asyncio.to_thread(alarm_logic._on_nap_end, "u", None)
+        await dispatcher.stop()
+
+    try:
+        _run(scenario())
+    finally:
+        notify_logic.set_dispatcher(old_dispatcher)
+    assert [n["level"] for n in sink.sent] == ["DROWSY", "WARNING"]
+    assert sink.sent[1]["message"].startswith("일어날 시각")
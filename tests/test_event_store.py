@@ -0,0 +1,91 @@
+import pytest
+
+from storage.event_store import BufferFull, EventStore
+from storage.logger import get_store
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = EventStore(str(tmp_path / "events.db"), flush_size=50, flush_interval=0.05)
+    yield s
+    s.close()
+
+
+def _pages(fetch, limit):
+    """cursor 를 따라가며 전체 행 수집"""
+    rows, after = [], None
+    while True:
+        page = fetch(after, limit)
+        rows.extend(page)
+        if len(page) < limit:
+            return rows
+        after = (page[-1][1], page[-1][0])
+
+
+def test_pagination_visits_every_event_once(store):
+    # 같은 시각의 이벤트가 페이지 경계에 걸쳐도 (ts, id) 순서로 빠짐없이
+    events = [(1000.0 + i // 3, "u", "NORMAL", i / 100) for i in range(100)]
+    events += [(1000.0 + i, "other", "DROWSY", 1.0) for i in range(10)]
+    store.put(events)
+    assert store.flush(timeout=5)
+
+    for limit in (1, 7, 33, 100):
+        rows = _pages(lambda after, n: store.query_events("u", after=after, limit=n), limit)
+        assert [r[4] for r in rows] == [e[3] for e in events[:100]]
+        assert len({r[0] for r in rows}) == 100
+
+    rows = store.query_events("u", start=1005.0, end=1010.0, limit=1000)
+    assert [r[1] for r in rows] == [e[0] for e in events[:100] if 1005.0 <= e[0] < 1010.0]
+
+
+def test_rollups_aggregate_levels(store):
+    store.put([(3600.0 * 10 + i, "u", "WARNING", 0.5 + i / 100) for i in range(10)])
+    assert store.flush(timeout=5)
+    rows = store.query_rollups("u", "hour")
+    assert len(rows) == 1
+    bucket, count, level_sum, level_max, normal_s, warning_s, drowsy_s = rows[0]
+    assert count == 10
+    assert level_sum == pytest.approx(sum(0.5 + i / 100 for i in range(10)))
+    assert level_max == pytest.approx(0.59)
+    assert (normal_s, drowsy_s) == (0, 0)
+    assert warning_s == pytest.approx(9.0)
+
+
+def test_full_buffer_rejects(tmp_path):
+    s = EventStore(str(tmp_path / "full.db"), flush_size=10_000, flush_interval=60, max_buffer=5)
+    try:
+        s.put([(1.0, "u", "NORMAL", 0.0)] * 5)
+        with pytest.raises(BufferFull):
+            s.put([(2.0, "u", "NORMAL", 0.0)])
+        assert s.rejected == 1
+    finally:
+        s.close()
+    # close 가 버퍼에 남은 이벤트를 기록
+    reopened = EventStore(str(tmp_path / "full.db"))
+    try:
+        assert len(reopened.query_events("u")) == 5
+    finally:
+        reopened.close()
+
+
+def test_logs_endpoint_cursor(client):
+    samples = [
+        {"user_id": "paged", "state": "NORMAL", "drowsy_level": i / 100, "timestamp": 2000.0 + i // 2}
+        for i in range(25)
+    ]
+    assert client.post("/drowsy/batch", json=samples).json()["accepted"] == 25
+    assert get_store().flush(timeout=5)
+
+    levels, cursor = [], None
+    while True:
+        params = {"user_id": "paged", "limit": 10}
+        if cursor:
+            params["cursor"] = cursor
+        body = client.get("/drowsy/logs", params=params).json()
+        levels.extend(item["drowsy_level"] for item in body["items"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert levels == [s["drowsy_level"] for s in samples]
+
+    assert client.get("/drowsy/logs", params={"user_id": "paged", "cursor": "!!"}).status_code == 400
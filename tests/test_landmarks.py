@@ -0,0 +1,111 @@
+import math
+
+import numpy as np
+
+from my_frontend.algorithm.eye_detect import detect_eye_state
+from my_frontend.algorithm.head_pose import get_head_pose
+from my_frontend.algorithm.landmarks import (
+    LEFT_EYE,
+    RIGHT_EYE,
+    NOSE_TIP,
+    CHIN,
+    LEFT_EYE_OUTER,
+    RIGHT_EYE_OUTER,
+    EAR_THRESHOLD,
+    FEATURE_INDEX,
+    extract_features,
+    extract_features_batch,
+    as_points,
+    feature_points,
+    landmark_rows,
+    landmarks_to_array,
+)
+
+W, H = 640, 480
+N_LANDMARKS = 478
+
+
+class _Point:
+    def __init__(self, x, y, z):
+        self.x, self.y, self.z = x, y, z
+
+
+class _Landmarks:
+    """MediaPipe NormalizedLandmarkList 대신 (.landmark[i].x / .y / .z)"""
+
+    def __init__(self, points):
+        self.landmark = [_Point(*p) for p in points.tolist()]
+
+
+def _faces(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(0.2, 0.8, (n, N_LANDMARKS, 3)).astype(np.float32)
+
+
+# ===== 벡터화 전 계산 (랜드마크마다 속성 접근, 정수 변환 없이) =====
+
+def _ear_reference(lm, eye):
+    def dist(a, b):
+        return math.hypot((lm[a].x - lm[b].x) * W, (lm[a].y - lm[b].y) * H)
+
+    return (dist(eye[1], eye[5]) + dist(eye[2], eye[4])) / (2.0 * dist(eye[0], eye[3]))
+
+
+def _pose_reference(lm):
+    pitch = min(40.0, max(-40.0, (lm[CHIN].y * H - lm[NOSE_TIP].y * H - 80) * 0.5))
+    eye_center_x = (lm[LEFT_EYE_OUTER].x * W + lm[RIGHT_EYE_OUTER].x * W) / 2
+    yaw = min(40.0, max(-40.0, (lm[NOSE_TIP].x * W - eye_center_x) * 0.3))
+    return pitch, yaw
+
+
+def test_landmarks_to_array_feature_rows():
+    points = _faces(1)[0]
+    landmarks = _Landmarks(points)
+    np.testing.assert_array_equal(landmarks_to_array(landmarks), points)
+
+    compact = landmarks_to_array(landmarks, FEATURE_INDEX)
+    assert compact.shape == (len(FEATURE_INDEX), 3)
+    np.testing.assert_array_equal(compact, points[FEATURE_INDEX])
+    np.testing.assert_array_equal(feature_points(points), compact)
+    np.testing.assert_array_equal(compact[landmark_rows(compact, [CHIN, NOSE_TIP])], points[[CHIN, NOSE_TIP]])
+
+
+def test_as_points_converts_each_object_once():
+    first, second = (_Landmarks(p) for p in _faces(2, seed=2))
+    points = as_points(first)
+    assert as_points(first) is points
+    assert as_points(second) is not points
+    np.testing.assert_array_equal(as_points(first), points)
+
+
+def test_features_match_per_landmark_reference():
+    for points in _faces(50):
+        landmarks = _Landmarks(points)
+        lm = landmarks.landmark
+        ear = (_ear_reference(lm, LEFT_EYE) + _ear_reference(lm, RIGHT_EYE)) / 2.0
+        pitch, yaw = _pose_reference(lm)
+
+        eye_state, got_ear, got_pitch, got_yaw = extract_features(landmarks, W, H)
+        assert math.isclose(got_ear, ear, rel_tol=1e-5)
+        assert math.isclose(got_pitch, pitch, rel_tol=1e-5, abs_tol=1e-3)
+        assert math.isclose(got_yaw, yaw, rel_tol=1e-5, abs_tol=1e-3)
+        assert eye_state == ("CLOSED" if got_ear < EAR_THRESHOLD else "OPEN")
+
+        # 기존 함수도 같은 계산 (객체 / 배열 모두)
+        assert detect_eye_state(landmarks, W, H) == (eye_state, got_ear)
+        assert detect_eye_state(points, W, H) == (eye_state, got_ear)
+        assert get_head_pose(points, W, H) == (got_pitch, got_yaw)
+        assert get_head_pose(landmarks, W, H) == (got_pitch, got_yaw)
+        assert extract_features(points, W, H) == (eye_state, got_ear, got_pitch, got_yaw)
+
+
+def test_batch_matches_single_frame():
+    faces = _faces(20, seed=1)
+    batch = extract_features_batch(faces, W, H)
+    for i, points in enumerate(faces):
+        eye_state, ear, pitch, yaw = extract_features(points, W, H)
+        assert math.isclose(batch["ear"][i], ear, rel_tol=1e-6)
+        assert batch["eye_closed"][i] == (eye_state == "CLOSED")
+        assert math.isclose(batch["pitch"][i], pitch, rel_tol=1e-6, abs_tol=1e-5)
+        assert math.isclose(batch["yaw"][i], yaw, rel_tol=1e-6, abs_tol=1e-5)
+    np.testing.assert_allclose((batch["left_ear"] + batch["right_ear"]) / 2, batch["ear"], rtol=1e-6)
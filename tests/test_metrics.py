@@ -0,0 +1,30 @@
+from core import escalation, notify_logic, scoring_engine, session_store
+from storage import logger
+
+# (모듈, singleton 변수, 만드는 함수, 그 값을 읽는 metric)
+SINGLETONS = (
+    (logger, "_store", logger.get_store, "drowsy_ingested_events_total"),
+    (scoring_engine, "_engine", scoring_engine.get_engine, "drowsy_scoring_sessions"),
+    (session_store, "_store", session_store.get_session_store, "drowsy_alarm_sessions"),
+    (notify_logic, "_dispatcher", notify_logic.get_dispatcher, "drowsy_notifications_total"),
+    (escalation, "_scheduler", escalation.get_scheduler, "drowsy_escalation_timers_pending"),
+)
+
+
+def test_metrics_do_not_create_singletons(client, monkeypatch):
+    for module, name, _, _ in SINGLETONS:
+        monkeypatch.setattr(module, name, None)
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    for module, name, _, metric in SINGLETONS:
+        assert getattr(module, name) is None, f"{module.__name__}.{name}"
+        assert metric not in r.text
+
+
+def test_metrics_read_existing_singletons(client):
+    for _, _, get, _ in SINGLETONS:
+        get()
+    text = client.get("/metrics").text
+    for _, _, _, metric in SINGLETONS:
+        assert f"# TYPE {metric} " in text
@@ -0,0 +1,71 @@
+import numpy as np
+
+from my_frontend.algorithm.drowsiness import DrowsinessDetector
+from my_frontend.algorithm.landmarks import LEFT_EYE_OUTER, RIGHT_EYE_OUTER, extract_features
+from my_frontend.algorithm.multi_face import FaceTracker, MultiFaceScorer
+
+W, H = 640, 480
+
+
+def _face(cx, size, seed=0):
+    """중심 (cx, 0.5), 두 눈 바깥 사이 거리 size 인 가짜 랜드마크"""
+    rng = np.random.default_rng(seed)
+    points = np.zeros((478, 3), dtype=np.float32)
+    points[:, 0] = cx + rng.normal(0, size / 4, 478)
+    points[:, 1] = 0.5 + rng.normal(0, size / 4, 478)
+    points[LEFT_EYE_OUTER, :2] = (cx + size / 2, 0.45)
+    points[RIGHT_EYE_OUTER, :2] = (cx - size / 2, 0.45)
+    return points
+
+
+def test_tracker_keeps_ids_and_expires():
+    tracker = FaceTracker(max_age=1.0)
+    ids, expired = tracker.update(np.array([[0.3, 0.5], [0.7, 0.5]]), np.array([0.1, 0.1]), 0.0)
+    assert expired == []
+    # 조금 움직이고 순서가 바뀌어도 같은 id
+    moved, _ = tracker.update(np.array([[0.71, 0.5], [0.31, 0.5]]), np.array([0.1, 0.1]), 0.1)
+    assert moved == [ids[1], ids[0]]
+    # 한 얼굴만 계속 보이면 다른 얼굴은 max_age 후 삭제
+    tracker.update(np.array([[0.31, 0.5]]), np.array([0.1]), 0.5)
+    _, expired = tracker.update(np.array([[0.31, 0.5]]), np.array([0.1]), 1.2)
+    assert expired == [ids[1]]
+    # 멀리 떨어진 새 얼굴은 새 id
+    new, _ = tracker.update(np.array([[0.31, 0.5], [0.9, 0.5]]), np.array([0.1, 0.1]), 1.3)
+    assert new[0] == ids[0] and new[1] not in ids
+
+
+def test_driver_scores_match_single_detector():
+    driver, passenger = _face(0.3, 0.2, seed=1), _face(0.7, 0.1, seed=2)
+    scorer = MultiFaceScorer(passenger_every=3)
+    detector = DrowsinessDetector(start_time=0.0)
+
+    for i in range(90):
+        ts = i / 30
+        results = scorer.update(np.stack([passenger, driver]), W, H, ts)
+        out = scorer.driver_output(results)
+        eye_state, ear, pitch, _ = extract_features(driver, W, H)
+        want = detector.update(ear, eye_state, pitch, ts)
+        assert out["state"] == want["state"]
+        assert np.isclose(out["score"], want["score"])
+        assert np.isclose(out["perclos"], want["perclos"])
+        assert len(results) == 2 and results[0][2]["driver"]
+
+
+def test_driver_kept_while_track_alive():
+    big, small = _face(0.3, 0.2, seed=1), _face(0.7, 0.1, seed=2)
+    scorer = MultiFaceScorer()
+    scorer.update(np.stack([big, small]), W, H, 0.0)
+    driver_id = scorer.driver_id
+
+    # 운전자가 잠깐 안 보여도 승객이 운전자가 되지 않음 (그동안 운전자 결과 없음)
+    results = scorer.update(np.stack([small]), W, H, 0.5)
+    assert scorer.driver_id == driver_id
+    assert scorer.driver_output(results) is None
+    assert not results[0][2]["driver"]
+
+    # 트랙이 만료되면 남은 얼굴 중에서 다시 선택, detector 상태도 삭제
+    results = scorer.update(np.stack([small]), W, H, 3.0)
+    assert scorer.driver_id != driver_id
+    assert scorer.driver_output(results) is not None
+    assert driver_id not in scorer.bank
+    assert len(scorer.bank) == 1
@@ -0,0 +1,92 @@
+import json
+import math
+
+import pytest
+
+from core.scoring_engine import ScoringEngine, RESULT_KEYS
+
+
+def _reject_constant(constant):
+    pytest.fail(f"JSON 이 아닌 값: {constant}")
+
+
+def _frames(user_id, n, ear=0.3, start=1000.0, fps=30.0):
+    return [(user_id, ear, "OPEN", 0.0, start + i / fps) for i in range(n)]
+
+
+def test_missing_ear_is_none_not_nan():
+    engine = ScoringEngine()
+    results = engine.score(_frames("u", 5, ear=None))
+    for out in results:
+        assert set(out) == set(RESULT_KEYS)
+        assert out["ear"] is None
+        assert out["avg_ear"] is None
+        assert not any(isinstance(v, float) and math.isnan(v) for v in out.values())
+        json.dumps(out, allow_nan=False)
+
+
+def test_avg_ear_after_min_samples():
+    engine = ScoringEngine()
+    out = engine.score(_frames("u", 30))[-1]
+    assert math.isclose(out["avg_ear"], 0.3)
+    # 얼굴이 사라져도 avg_ear 는 유지, ear 만 None
+    out = engine.score([("u", None, "OPEN", 0.0, 1002.0)])[0]
+    assert out["ear"] is None
+    assert math.isclose(out["avg_ear"], 0.3)
+
+
+def test_sessions_are_independent():
+    engine = ScoringEngine()
+    frames = _frames("a", 40) + _frames("b", 10, ear=0.2)
+    results = engine.score(frames)
+    assert results[39]["avg_ear"] is not None
+    assert results[-1]["avg_ear"] is None
+    assert len(engine) == 2
+
+
+def test_max_sessions_evicts_oldest():
+    engine = ScoringEngine(max_sessions=2)
+    for user_id in ("a", "b", "c"):
+        engine.score(_frames(user_id, 1))
+    assert len(engine) == 2
+    assert engine.evicted == 1
+    assert "a" not in engine.bank
+
+
+def test_frames_endpoint_accepts_null_ear(client):
+    r = client.post("/drowsy/frames", json=[
+        {"user_id": "null-ear", "ear": None, "eye_state": "OPEN", "pitch": 0.0},
+        {"user_id": "null-ear", "ear": None, "eye_state": "CLOSED", "pitch": 0.0},
+    ])
+    assert r.status_code == 200
+    body = json.loads(r.text)
+    out = body["results"]["null-ear"]
+    assert out["ear"] is None
+    assert out["avg_ear"] is None
+
+
+def test_ws_frame_with_null_ear_is_valid_json(client):
+    with client.websocket_connect("/ws/drowsy?user_id=ws-null-ear") as ws:
+        ws.send_json({"type": "frame", "ear": None, "eye_state": "OPEN", "pitch": 0.0})
+        message = json.loads(ws.receive_text(), parse_constant=_reject_constant)
+        assert message["type"] == "score"
+        assert message["ear"] is None
+
+
+def test_burst_without_timestamps_does_not_grow_bank():
+    """timestamp 없는 프레임은 모두 같은 시각 → 세션 하나가 몰아서 보내도 링버퍼 용량은 그대로"""
+    engine = ScoringEngine(capacity=2)
+    engine.score(_frames("other", 10))
+    rings = (engine.bank.blink_times, engine.bank.perclos_window, engine.bank.ear_history)
+    capacities = [ring.capacity for ring in rings]
+
+    burst = [("u", 0.3 if i % 2 else 0.1, "CLOSED" if i % 2 else "OPEN", 0.0, None) for i in range(10_000)]
+    out = engine.score(burst)[-1]
+    assert [ring.capacity for ring in rings] == capacities
+    row = engine.bank._slots["u"]
+    assert engine.bank.perclos_window.size[row] == engine.bank.perclos_window.capacity
+    assert 0.0 <= out["perclos"] <= 1.0
+
+    # 다른 세션은 영향 없음 (모두 뜬 눈)
+    out = engine.score([("other", 0.3, "OPEN", 0.0, 1000.5)])[0]
+    assert out["perclos"] == 0.0 and out["blink_count"] == 0
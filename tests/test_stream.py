@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from core import alarm_logic, escalation, session_store
+from core.escalation import EscalationScheduler
+from core.session_store import MemorySessionStore
+from core.stream_logic import ALARM_REPEAT, LiveSession
+
+
+@pytest.fixture
+def scheduler():
+    """시작하지 않은 scheduler + 메모리 세션 저장소로 교체 (테스트 후 원래대로)"""
+    old_scheduler, old_store = escalation._scheduler, session_store._store
+    s = EscalationScheduler()
+    alarm_logic.register_timers(s)
+    escalation.set_scheduler(s)
+    session_store.set_session_store(MemorySessionStore())
+    yield s
+    escalation.set_scheduler(old_scheduler)
+    session_store.set_session_store(old_store)
+
+
+def _feed(session, states):
+    async def scenario():
+        for state in states:
+            session.on_sample(state)
+            await asyncio.gather(*session._tasks)
+
+    asyncio.run(scenario())
+
+
+def test_drowsy_stream_escalates_through_scheduler(scheduler):
+    session = LiveSession("u")
+    _feed(session, ["NORMAL", "DROWSY", "DROWSY", "DROWSY"])
+
+    # DROWSY 가 계속돼도 샘플마다 알람을 올리지 않음, 단계 상승은 재시도 타이머 하나
+    assert session_store.get_session_store().get("u")["alarm_counter"] == 1
+    deadline = scheduler.deadline("u", alarm_logic.ALARM_TIMER)
+    assert deadline is not None
+
+    alarm_logic._on_alarm_timer("u", {"retry_after": ALARM_REPEAT})
+    assert session_store.get_session_store().get("u")["alarm_counter"] == 2
+    assert scheduler.deadline("u", alarm_logic.ALARM_TIMER) >= deadline
+
+    # DROWSY 에서 벗어나면 재시도 취소, 다시 들어가면 바로 다음 단계
+    _feed(session, ["NORMAL"])
+    assert scheduler.deadline("u", alarm_logic.ALARM_TIMER) is None
+    _feed(session, ["DROWSY"])
+    assert session_store.get_session_store().get("u")["alarm_counter"] == 3
+    assert [m["type"] for m in session.outbox._items] == ["alarm", "clear", "alarm"]
+
+    session.close()
+    assert scheduler.deadline("u", alarm_logic.ALARM_TIMER) is None
@@ -0,0 +1,107 @@
+import math
+import random
+
+import pytest
+
+from core.timer_wheel import TimerWheel
+
+
+class _NaiveTimers:
+    """dict 하나에 모든 타이머를 두고 매번 전부 확인하는 기준 구현 (TimerWheel 과 같은 tick 규칙)"""
+
+    def __init__(self, resolution, now):
+        self.resolution = resolution
+        self.timers = {}  # key → (만료 tick, deadline, payload)
+        self.tick = self._to_tick(now) - 1
+
+    def _to_tick(self, t):
+        return math.floor(t / self.resolution)
+
+    def schedule(self, key, deadline, payload):
+        tick = max(self._to_tick(deadline) + 1, self.tick + 1)
+        self.timers[key] = (tick, deadline, payload)
+
+    def cancel(self, key):
+        return self.timers.pop(key, None) is not None
+
+    def advance(self, now):
+        target = self._to_tick(now)
+        self.tick = max(self.tick, target)
+        due = sorted(
+            ((deadline, key, payload) for key, (tick, deadline, payload) in self.timers.items()
+             if tick <= target),
+            key=lambda item: item[0],
+        )
+        for _, key, _ in due:
+            del self.timers[key]
+        return due
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_naive_model(seed):
+    rng = random.Random(seed)
+    resolution = 0.1
+    now = 1000.0
+    # 단계를 작게 → cascade / overflow 를 자주 거침
+    wheel = TimerWheel(resolution, now, slots=(8, 4, 4))
+    model = _NaiveTimers(resolution, now)
+
+    for step in range(20_000):
+        op = rng.random()
+        key = rng.randrange(500)
+        if op < 0.45:
+            # 지난 시각, 가까운 시각, 맨 위 단계를 넘는 먼 시각 섞어서
+            delay = rng.choice([rng.uniform(-5, 0), rng.uniform(0, 3), rng.uniform(3, 40), rng.uniform(40, 400)])
+            wheel.schedule(key, now + delay, step)
+            model.schedule(key, now + delay, step)
+        elif op < 0.6:
+            assert wheel.cancel(key) == model.cancel(key)
+        else:
+            now += rng.choice([0.0, rng.uniform(0, 0.3), rng.uniform(0, 5), rng.uniform(0, 60)])
+            got = wheel.advance(now)
+            want = model.advance(now)
+            assert sorted(got, key=lambda item: (item[1], item[0])) == sorted(
+                ((key, deadline, payload) for deadline, key, payload in want),
+                key=lambda item: (item[1], item[0]),
+            )
+            # deadline 전에는 실행하지 않고, 늦어도 한 tick 안에
+            for _, deadline, _ in got:
+                assert deadline < now + 1e-9 or math.floor(deadline / resolution) < math.floor(now / resolution)
+
+        assert len(wheel) == len(model.timers)
+        if key in model.timers:
+            assert wheel.deadline(key) == model.timers[key][1]
+        else:
+            assert key not in wheel and wheel.deadline(key) is None
+
+    assert sorted(k for k, _, _ in wheel.items()) == sorted(model.timers)
+
+
+def test_next_tick_time_never_skips_a_timer():
+    rng = random.Random(7)
+    wheel = TimerWheel(0.1, 0.0, slots=(8, 4, 4))
+    deadlines = {}
+    for key in range(200):
+        deadlines[key] = rng.uniform(0, 500)
+        wheel.schedule(key, deadlines[key])
+
+    fired = {}
+    now = 0.0
+    while len(wheel):
+        # scheduler 처럼 next_tick_time 까지만 잠들었다가 advance
+        now = wheel.next_tick_time()
+        for key, deadline, _ in wheel.advance(now):
+            fired[key] = now
+            assert deadline <= now
+            assert now - deadline <= 0.1 + 1e-9
+
+    assert set(fired) == set(deadlines)
+
+
+def test_reschedule_replaces_existing_timer():
+    wheel = TimerWheel(0.1, 0.0)
+    wheel.schedule("a", 5.0, "old")
+    wheel.schedule("a", 1.0, "new")
+    assert len(wheel) == 1
+    assert wheel.advance(2.0) == [("a", 1.0, "new")]
+    assert wheel.advance(10.0) == []
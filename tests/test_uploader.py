@@ -0,0 +1,135 @@
+import gzip
+import json
+import os
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from my_frontend.algorithm import uploader as uploader_module
+from my_frontend.algorithm.uploader import Uploader, default_spool_dir
+
+
+class _Backend:
+    """/drowsy/batch 를 받는 로컬 서버 (status 를 바꿔서 503 등 흉내)"""
+
+    def __init__(self, port=0):
+        self.samples = []
+        self.status = 200
+        backend = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                if self.headers.get("Content-Encoding") == "gzip":
+                    body = gzip.decompress(body)
+                if backend.status == 200:
+                    backend.samples.extend(json.loads(line) for line in body.splitlines())
+                self.send_response(backend.status)
+                if backend.status == 503:
+                    self.send_header("Retry-After", "30")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def backend():
+    b = _Backend()
+    yield b
+    b.close()
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _submit(up, start, n):
+    for i in range(start, start + n):
+        up.submit({"state": "NORMAL", "score": i / 1000}, 1000.0 + i)
+
+
+def test_sends_everything_in_order(backend, tmp_path):
+    up = Uploader(backend.url, user_id="bus", batch_size=50, max_delay=0.05, spool_dir=str(tmp_path))
+    _submit(up, 0, 520)
+    up.close()
+    assert [s["timestamp"] for s in backend.samples] == [1000.0 + i for i in range(520)]
+    assert {s["user_id"] for s in backend.samples} == {"bus"}
+    assert up.stats()["sent"] == 520 and up.stats()["spooled"] == 0
+
+
+def test_offline_close_spools_and_next_run_replays(tmp_path):
+    port = _free_port()
+    spool = str(tmp_path / "spool")
+    up = Uploader(f"http://127.0.0.1:{port}", batch_size=40, max_delay=0.05, spool_dir=spool, timeout=0.5)
+    _submit(up, 0, 100)
+    started = time.monotonic()
+    up.close(timeout=0.5)
+    # close 는 timeout + 진행 중이던 전송 하나 안에 끝남 (남은 큐는 spool)
+    assert time.monotonic() - started < 0.5 + up._post_budget() + 1.0
+    assert up.stats()["sent"] == 0
+    assert sum(int(name.split("-")[1].split(".")[0]) for name in os.listdir(spool)) == 100
+
+    # 다시 연결되면 spool 부터 오래된 순서로 보낸 뒤 새 샘플
+    backend = _Backend(port)
+    try:
+        up = Uploader(backend.url, batch_size=40, max_delay=0.05, spool_dir=spool)
+        _submit(up, 100, 30)
+        up.close()
+    finally:
+        backend.close()
+    assert [s["timestamp"] for s in backend.samples] == [1000.0 + i for i in range(130)]
+    assert os.listdir(spool) == []
+
+
+def test_server_busy_spools_batches(backend, tmp_path):
+    backend.status = 503
+    up = Uploader(backend.url, batch_size=10, max_delay=0.05, spool_dir=str(tmp_path))
+    _submit(up, 0, 30)
+    up.close(timeout=0.2)
+    stats = up.stats()
+    assert stats["sent"] == 0
+    assert stats["spool_files"] == 3 and stats["spooled"] == 3
+
+
+def test_orphaned_temp_files_are_removed(tmp_path):
+    (tmp_path / "000000000003-10.batch.tmp").write_bytes(b"partial")
+    (tmp_path / "000000000002-5.batch").write_bytes(b"x" * 7)
+    up = Uploader(f"http://127.0.0.1:{_free_port()}", spool_dir=str(tmp_path), timeout=0.2)
+    try:
+        assert sorted(os.listdir(tmp_path)) == ["000000000002-5.batch"]
+        assert up.stats()["spool_files"] == 1 and up.stats()["spool_bytes"] == 7
+        assert up._seq == 3
+    finally:
+        up.close(timeout=0.1)
+
+
+def test_spool_disabled_drops_failed_batches(tmp_path):
+    up = Uploader(f"http://127.0.0.1:{_free_port()}", batch_size=10, max_delay=0.05, spool_dir="", timeout=0.2)
+    assert up.spool_dir is None
+    _submit(up, 0, 10)
+    up.close(timeout=0.2)
+    assert up.stats()["spool_dropped"] == 1
+
+
+def test_default_spool_dir_per_user(monkeypatch, tmp_path):
+    monkeypatch.setattr(uploader_module, "SPOOL_ROOT", str(tmp_path))
+    assert default_spool_dir("bus-17") == os.path.join(str(tmp_path), "bus-17")
+    assert default_spool_dir("../etc/passwd") == os.path.join(str(tmp_path), ".._etc_passwd")
+    assert default_spool_dir("") == os.path.join(str(tmp_path), "_")
@@ -0,0 +1,95 @@
+import math
+from collections import deque
+
+import numpy as np
+
+from drowsy_common.window_stats import RESYNC_POPS, TimeWindow, WindowedPerclos
+
+
+class _NaiveWindow:
+    """deque 에 모두 보관하고 매번 다시 합산하는 기준 구현"""
+
+    def __init__(self, window):
+        self.window = window
+        self.items = deque()
+
+    def push(self, ts, value):
+        self.items.append((ts, value))
+
+    def expire(self, now):
+        while self.items and now - self.items[0][0] > self.window:
+            self.items.popleft()
+
+    def sum(self):
+        return math.fsum(v for _, v in self.items)
+
+
+def _check(window, naive):
+    assert len(window) == len(naive.items)
+    assert math.isclose(window.sum, naive.sum(), rel_tol=1e-9, abs_tol=1e-9)
+    if naive.items:
+        assert math.isclose(window.mean(), naive.sum() / len(naive.items), rel_tol=1e-9)
+    else:
+        assert window.mean() is None
+
+
+def test_matches_naive_window():
+    rng = np.random.default_rng(0)
+    window, naive = TimeWindow(2.0, max_rate=30), _NaiveWindow(2.0)
+    ts = 0.0
+    for _ in range(20_000):
+        # 입력 간격이 들쭉날쭉 (가끔 긴 공백 → 윈도우가 빔)
+        ts += rng.exponential(1 / 30) if rng.random() > 0.001 else 5.0
+        value = rng.uniform(0.1, 0.4)
+        window.push(ts, value)
+        naive.push(ts, value)
+        window.expire(ts)
+        naive.expire(ts)
+        _check(window, naive)
+
+
+def test_grows_instead_of_dropping_above_max_rate():
+    window, naive = TimeWindow(1.0, max_rate=10), _NaiveWindow(1.0)
+    capacity = window.capacity
+    for i in range(500):
+        ts = i / 200.0  # max_rate 의 20배
+        window.push(ts, float(i))
+        naive.push(ts, float(i))
+        window.expire(ts)
+        naive.expire(ts)
+        _check(window, naive)
+    assert window.capacity > capacity
+    assert len(window) == 201
+
+
+def test_resync_clears_rounding_drift():
+    window = TimeWindow(1.0, max_rate=100)
+    for i in range(RESYNC_POPS + 150):
+        ts = i / 100.0
+        # 크기가 크게 다른 값을 섞어 누적 뺄셈 오차를 만듦
+        window.push(ts, 1e8 if i % 7 == 0 else 0.1)
+        window.expire(ts)
+    values = [1e8 if i % 7 == 0 else 0.1 for i in range(RESYNC_POPS + 150)][-len(window):]
+    assert window._pops < RESYNC_POPS
+    assert math.isclose(window.sum, math.fsum(values), rel_tol=1e-12)
+
+
+def test_clear_and_empty_window_reset_sum():
+    window = TimeWindow(1.0)
+    window.push(0.0, 0.3)
+    window.expire(5.0)
+    assert len(window) == 0 and window.sum == 0.0 and window.mean() is None
+    window.push(5.0, 0.2)
+    window.clear()
+    assert len(window) == 0 and window.sum == 0.0
+
+
+def test_windowed_perclos():
+    perclos = WindowedPerclos(10.0, max_rate=10)
+    for i in range(100):
+        value = perclos.update(i / 10.0, i % 4 == 0)
+    assert math.isclose(value, 25 / 100)
+    # 윈도우 밖으로 밀려난 프레임은 비율에서 빠짐
+    for i in range(100, 200):
+        value = perclos.update(i / 10.0, False)
+    assert value == 0.0